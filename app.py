@@ -3,39 +3,60 @@ import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
-from datetime import datetime, timedelta, time
+from datetime import datetime, time
+import io
+import importlib.util
 
 # === Strategy Functions ===
-from strategies.sma_crossover_strategy import generate_signals as sma_signals
-from strategies.rsi_bollinger_strategy import generate_signals as rsi_signals
-from strategies.macd_strategy import generate_signals as macd_signals
-from strategies.ewma_crossover_strategy import generate_signals as ewma_signals
-from strategies.atr_breakout_strategy import generate_signals as atr_signals
-from utils.metrics import calculate_metrics
-from utils.data import load_price_data
+from strategies import REGISTRY, warmup_bars
+from utils.metrics import rolling_metrics
+from utils.data import load_price_data, load_many, load_with_warmup, warmup_start
+from utils.sweep import sweep_crossover
+from utils.walkforward import walk_forward
+from utils.backtest import run_all_strategies
+from utils.universe import universe_backtest
+from utils.portfolio import portfolio_backtest, WEIGHTINGS, REBALANCE_FREQUENCIES, VOL_WINDOW
+from utils.bootstrap import bootstrap_metrics
+from utils.trades import trade_ledger, trade_stats, export_ledger
+from utils.results import ResultStore, SUMMARY_METRICS, is_closed, price_fingerprint
+from strategies import PARAM_GRIDS
+from utils import compiled, profiling
 from utils.charts import *
 
 # === Page Setup ===
 st.set_page_config(page_title='Strategy Backtester', layout='wide')
 st.title('Interactive Strategy Backtester')
 
+# === Performance Tracing ===
+# Decided before anything runs, so every stage of this rerun lands in one trace. The trace belongs
+# to this session's script run only, other sessions keep their own setting.
+profile_col1, profile_col2 = st.columns(2)
+with profile_col1:
+    record_trace = st.checkbox('Record performance trace', value=False,
+                               help='Time each pipeline stage (load, signals, trim, metrics, charts) on this run.')
+with profile_col2:
+    trace_memory = st.checkbox('Track peak memory', value=False, disabled=not record_trace,
+                               help='Uses tracemalloc, which slows the run down (for every session while it is on).')
+if record_trace:
+    trace = profiling.enable(track_memory=trace_memory)
+else:
+    profiling.disable()
+
+# === Signal Kernels ===
+# Compiled (Numba) and NumPy kernels give identical results, so cached results stay valid across a switch.
+# The choice applies to this session's runs only (compiled.use_backend), never the process-wide default.
+kernel_backend = st.selectbox('Signal kernel backend', ['auto'] + compiled.available_backends(),
+                              help='auto uses the compiled Numba kernels when Numba is installed.')
+
 # === User Inputs ===
 col1, col2 = st.columns(2)
 
 with col1:
     ticker = st.text_input('Enter Ticker Symbol', value='AAPL')
     strategy = st.selectbox('Choose a Strategy',
-                             ['SMA', 'EWMA', 'MACD', 'RSI', 'ATR'],
+                             list(REGISTRY),
                              help='Select a trading strategy to backtest and visualize.')
-
-    strategy_descriptions = {
-    'SMA': 'Simple Moving Average crossover: Buy when short SMA crosses above long SMA; sell when it crosses below.',
-    'EWMA': 'Exponentially Weighted MA crossover: Like SMA, but with more recent prices weighted heavier.',
-    'MACD': 'Moving Average Convergence Divergence: Momentum strategy using EWMA crossovers and a signal line.',
-    'RSI': 'Relative Strength Index: Measures overbought/oversold conditions. Buy when RSI < 30 & price hits lower band.',
-    'ATR': 'Average True Range breakout: Volatility-based breakout strategy using ATR and 20-day highs/lows.'
-    }
-    st.markdown(f'**Strategy Summary:** {strategy_descriptions[strategy]}')
+    st.markdown(f'**Strategy Summary:** {REGISTRY[strategy].description}')
 
 
 with col2:
@@ -47,117 +68,95 @@ start_date = datetime.combine(start_date, time.min)
 end_date = datetime.combine(end_date, time.min)
 
 # === Strategy-Specific Inputs ===
-if strategy == 'SMA':
-    st.subheader('SMA Parameters')
-    short_window = st.slider('Short Window', min_value=5, max_value=50, value=20,
-                             help='The period for the short-term moving average. Used to generate entry/exit signals.')
-    long_window = st.slider('Long Window', min_value=10, max_value=200, value=50,
-                            help='The period for the long-term moving average. Signals are generated when the short MA crosses this.')
-elif strategy == 'EWMA':
-    st.subheader('EWMA Parameters')
-    short_window = st.slider('Short Window', min_value=5, max_value=50, value=20,
-                             help='The short EWMA emphasizes recent prices more heavily for responsiveness.')
-    long_window = st.slider('Long Window', min_value=10, max_value=200, value=50,
-                            help='The long EWMA provides smoother signals and serves as the baseline trend.')
-elif strategy == 'MACD':
-    st.subheader('MACD Parameters')
-    short_window = st.slider('Short EMA Window', 5, 20, 12,
-                             help='Fast EWMA used in MACD calculation (default 12).')
-    long_window = st.slider('Long EMA Window', 10, 50, 26,
-                            help='Slow EWMA used in MACD calculation (default 26).')
-    signal_window = st.slider('Signal Line Window', 5, 20, 9,
-                              help='EWMA of the MACD line, used to generate buy/sell signals.')
-elif strategy == 'RSI':
-    st.subheader('RSI Parameters')
-    rsi_period = st.slider('RSI Period', min_value=5, max_value=30, value=14,
-                           help='The lookback period for RSI. Common default is 14 days.')
-elif strategy == 'ATR':
-    st.subheader('ATR Breakout Parameters')
-    atr_window = st.slider('ATR Window', 5, 50, 14,
-                           help='ATR period defines the volatility baseline. Higher values = smoother breakout levels.')
-    breakout_window = st.slider('Breakout Window', 10, 50, 20,
-                                help='Period over which recent highs/lows are tracked for breakout logic.')
-    scale_factor = st.slider('Scale Factor', 0.1, 3.0, 0.5, step=0.1,
-                             help='Multiplier applied to ATR for adjusting breakout thresholds.')
-
-# === Wrapper Helper ===
-def trim_warmup(df, warmup_window, start_date):
-    # Find the first row after warmup_window periods from the start of the DataFrame
-    warmup_idx = df.index[df['Date'] >= start_date][0]
-    return df.loc[warmup_idx:].copy()
-
-# === Strategy Wrappers ===
-def run_sma_backtest(ticker, start, end, short_w, long_w):
-    warmup_window = max(short_w, long_w)
-    start_extended = start - timedelta(days=warmup_window * 2)
-    df = load_price_data(ticker, start_extended, end)
-    df, warmup = sma_signals(df, short_w, long_w)
-    df = trim_warmup(df, warmup_window, start)
-    df, metrics_df = calculate_metrics(df)
-    return df, metrics_df
-
-def run_ewma_backtest(ticker, start, end, short_w, long_w):
-    warmup_window = max(short_w, long_w)
-    start_extended = start - timedelta(days=warmup_window * 2)
-    df = load_price_data(ticker, start_extended, end)
-    df, warmup = ewma_signals(df, short_w, long_w)
-    df = trim_warmup(df, warmup_window, start)
-    df, metrics_df = calculate_metrics(df)
-    return df, metrics_df
-
-def run_macd_backtest(ticker, start, end, short_w, long_w, signal_w):
-    warmup_window = max(short_w, long_w, signal_w)
-    start_extended = start - timedelta(days=warmup_window * 2)
-    df = load_price_data(ticker, start_extended, end)
-    df, warmup = macd_signals(df, short_w, long_w, signal_w)
-    df = trim_warmup(df, warmup_window, start)
-    df, metrics_df = calculate_metrics(df)
-    return df, metrics_df
-
-def run_rsi_backtest(ticker, start, end, rsi_period):
-    bollinger_window = 20
-    warmup_window = max(rsi_period, bollinger_window)
-    start_extended = start - timedelta(days=warmup_window * 2)
-    df = load_price_data(ticker, start_extended, end)
-    df, warmup = rsi_signals(df, rsi_period)
-    df = trim_warmup(df, warmup_window, start)
-    df, metrics_df = calculate_metrics(df)
-    return df, metrics_df
-
-def run_atr_backtest(ticker, start, end, atr_w, breakout_w, scale):
-    warmup_window = max(atr_w, breakout_w)
-    start_extended = start - timedelta(days=warmup_window * 2)
-    df = load_price_data(ticker, start_extended, end)
-    df, warmup = atr_signals(df, scale, atr_w, breakout_w)
-    df = trim_warmup(df, warmup_window, start)
-    df, metrics_df = calculate_metrics(df)
-    return df, metrics_df
+# One slider per registered parameter
+st.subheader(f'{REGISTRY[strategy].title} Parameters')
+strategy_params = {param.name: st.slider(param.label, param.min, param.max, param.default, step=param.step,
+                                         help=param.help)
+                   for param in REGISTRY[strategy].params}
+
+# === Result Caching ===
+# Shared by all sessions on the server: each cached function keeps its most recent
+# CACHE_MAX_ENTRIES results (least recently used are evicted first) for CACHE_TTL seconds
+CACHE_MAX_ENTRIES = 64
+CACHE_TTL = 60 * 60
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def cached_price_data(ticker, start, end):
+    return load_price_data(ticker, start, end)
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def cached_many(tickers, start, end):
+    return load_many(list(tickers), start, end)
+
+@st.cache_resource
+def result_store():
+    # Persistent run store (utils.results), shared by every session and kept across restarts
+    return ResultStore()
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL, show_spinner='Running backtest...')
+def cached_backtest(ticker, start, end, strategy, params):
+    # Served from the result store when these inputs already ran on the current code; otherwise loads
+    # exactly the strategy's warmup bars ahead of start, through the cached loader
+    return result_store().get_or_run(ticker, strategy, params, start, end, load=cached_price_data)
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL, show_spinner='Bootstrapping metrics...')
+def cached_bootstrap(df, n_resamples, block_size, method):
+    return bootstrap_metrics(df, n_resamples, block_size, method)
+
+# === Chart Settings ===
+full_resolution = st.checkbox('Full-resolution charts', value=False,
+                              help=f'Charts keep about {MAX_POINTS} points per line (shape-preserving downsampling). '
+                                   'Buy/sell markers are always exact.')
+max_points = None if full_resolution else MAX_POINTS
+
+def show_chart(fig):
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption(f'Chart payload: {payload_size(fig) / 1024:,.0f} KB')
+
+# === Rolling Metrics Settings ===
+rolling_window = st.slider('Rolling Metrics Window (bars)', 20, 504, 126, step=21,
+                           help='Window for the rolling Sharpe, Sortino, volatility, beta and drawdown charts.')
+
+# === Bootstrap Settings ===
+with st.expander('Bootstrap Confidence Intervals'):
+    bootstrap_resamples = st.number_input('Resamples', min_value=0, max_value=20000, value=2000, step=500,
+                                          help='Set to 0 to skip the confidence intervals.')
+    bootstrap_block = st.number_input('Mean Block Length (bars)', min_value=1, max_value=252, value=20,
+                                      help='Longer blocks keep more of the autocorrelation in returns.')
+    bootstrap_method = st.selectbox('Resampling', ['stationary', 'block'])
 
 # === Run Backtest ===
+# Results live in session state, so other widgets can rerun the script without recomputing them
 if st.button('Run Backtest'):
-    if strategy == 'SMA':
-        df, metrics = run_sma_backtest(ticker, start_date, end_date, short_window, long_window)
-    elif strategy == 'EWMA':
-        df, metrics = run_ewma_backtest(ticker, start_date, end_date, short_window, long_window)
-    elif strategy == 'MACD':
-        df, metrics = run_macd_backtest(ticker, start_date, end_date, short_window, long_window, signal_window)
-    elif strategy == 'RSI':
-        df, metrics = run_rsi_backtest(ticker, start_date, end_date, rsi_period)
-    elif strategy == 'ATR':
-        df, metrics = run_atr_backtest(ticker, start_date, end_date, atr_window, breakout_window, scale_factor)
+    with compiled.use_backend(kernel_backend):
+        st.session_state['backtest'] = (ticker, strategy, strategy_params,
+                                        cached_backtest(ticker, start_date, end_date, strategy, strategy_params))
+
+if 'backtest' in st.session_state:
+    bt_ticker, bt_strategy, bt_params, (df, metrics) = st.session_state['backtest']
+    if (bt_ticker, bt_strategy, bt_params) != (ticker, strategy, strategy_params):
+        st.info(f'Showing the last run ({bt_ticker}, {bt_strategy} {bt_params}). '
+                'Press Run Backtest to apply the new inputs.')
+    if df.attrs.get('incomplete_bars'):
+        st.warning(f"{bt_ticker} has less than {warmup_bars(bt_strategy, bt_params)} bars of history before the "
+                   f"start date, so its first {df.attrs['incomplete_bars']} bars were skipped.")
 
     # === Plot Results ===
     st.subheader('Cumulative Returns')
     st.markdown('**Compare the cumulative performance of the strategy vs. the overall market.**')
-    st.plotly_chart(plot_cumulative_returns(df), use_container_width=True)
+    show_chart(plot_cumulative_returns(df, max_points))
 
     st.subheader('Strategy Visualization')
     st.markdown('**Visualize buy/sell signals and technical indicators specific to the selected strategy.**')
-    st.plotly_chart(plot_strategy_dashboard(df, strategy), use_container_width=True)
+    show_chart(plot_strategy_dashboard(df, bt_strategy, max_points))
     
     st.subheader('Drawdown Over Time')
     st.markdown('**Track the peak-to-trough declines in strategy value over time.**')
-    st.plotly_chart(plot_drawdown(df), use_container_width=True)
+    show_chart(plot_drawdown(df, max_points))
+
+    st.subheader('Rolling Metrics')
+    st.markdown('**Follow how risk-adjusted performance, volatility, market exposure and drawdown change over time.**')
+    show_chart(plot_rolling_metrics(rolling_metrics(df, rolling_window), rolling_window, max_points))
 
     st.subheader('Daily Return Distribution')
     st.markdown('**Examine the distribution of daily strategy returns to assess volatility and skew.**')
@@ -165,4 +164,185 @@ if st.button('Run Backtest'):
 
     st.subheader('Performance Metrics')
     st.markdown('**Key statistics summarizing return, risk, and efficiency of the selected strategy.**')
-    st.dataframe(metrics.style.format({'Value': '{:.3f}'}))
\ No newline at end of file
+    st.dataframe(metrics.style.format({'Value': '{:.3f}'}))
+
+    st.subheader('Trade Log')
+    st.markdown('**Every round trip with its holding period, return and worst/best excursion.**')
+    ledger = trade_ledger(df)
+    st.dataframe(trade_stats(ledger).style.format({'Value': '{:.2f}'}))
+    st.dataframe(ledger.style.format(precision=2), use_container_width=True)
+
+    export_formats = ['csv'] + (['parquet'] if importlib.util.find_spec('pyarrow') else [])
+    for fmt, col in zip(export_formats, st.columns(len(export_formats))):
+        with col:
+            st.download_button(f'Download Trades ({fmt.upper()})',
+                               data=export_ledger(ledger, io.BytesIO(), fmt).getvalue(),
+                               file_name=f'{bt_ticker}_{bt_strategy}_trades.{fmt}')
+
+    if bootstrap_resamples:
+        st.subheader('Metric Confidence Intervals')
+        st.markdown(f'**{bootstrap_method.capitalize()} bootstrap over {int(bootstrap_resamples)} resamples of the '
+                    'daily returns (95% intervals).**')
+        intervals = cached_bootstrap(df, int(bootstrap_resamples), int(bootstrap_block), bootstrap_method)
+        st.dataframe(intervals.style.format(precision=3), use_container_width=True)
+
+# === Strategy Comparison ===
+st.subheader('Compare All Strategies')
+st.markdown('**Run all five strategies on one data load and overlay their equity curves.** '
+            'The selected strategy uses the parameters above, the others use their defaults.')
+if st.button('Compare All Strategies'):
+    warmup = max(warmup_bars(name, strategy_params if name == strategy else None) for name in REGISTRY)
+    df = load_with_warmup(ticker, start_date, end_date, warmup, load=cached_price_data)
+    with compiled.use_backend(kernel_backend):
+        st.session_state['comparison'] = run_all_strategies(df, start_date, {strategy: strategy_params})
+
+if 'comparison' in st.session_state:
+    results = st.session_state['comparison']
+    show_chart(plot_strategy_comparison(results, max_points))
+    comparison = pd.DataFrame({name: metrics.set_index('Metric')['Value'] for name, (_, metrics) in results.items()})
+    st.dataframe(comparison.style.format('{:.2f}'), use_container_width=True)
+
+# === Parameter Sweep ===
+if strategy in ('SMA', 'EWMA'):
+    st.subheader(f'{strategy} Parameter Sweep')
+    st.markdown('**Evaluate every short/long window pair at once and compare them on a heatmap.**')
+    sweep_metric = st.selectbox('Sweep Metric', ['Sharpe', 'Return', 'Max Drawdown'],
+                                help='Metric shown on the heatmap. Return and drawdown are in %.')
+    short_range = st.slider('Short Window Range', 5, 50, (5, 50))
+    long_range = st.slider('Long Window Range', 10, 200, (10, 200))
+
+    if st.button('Run Sweep'):
+        warmup = warmup_bars(strategy, {'short_window': short_range[1], 'long_window': long_range[1]})
+        df = load_with_warmup(ticker, start_date, end_date, warmup, load=cached_price_data)
+        with compiled.use_backend(kernel_backend):
+            sweep = sweep_crossover(df, strategy, range(short_range[0], short_range[1] + 1),
+                                    range(long_range[0], long_range[1] + 1), start_date=start_date)
+        # Every pair of a closed range stays queryable under Saved Runs
+        if is_closed(end_date):
+            result_store().put_sweep(ticker, strategy, start_date, end_date, price_fingerprint(df, start_date), sweep)
+        st.session_state['sweep'] = (strategy, sweep)
+
+    # The heatmap metric can be switched without re-running the sweep
+    if st.session_state.get('sweep', (None,))[0] == strategy:
+        grid = st.session_state['sweep'][1][sweep_metric]
+        best = grid.stack().idxmin() if sweep_metric == 'Max Drawdown' else grid.stack().idxmax()
+        st.markdown(f'**Best pair by {sweep_metric}:** short={best[0]}, long={best[1]} '
+                    f'({grid.loc[best]:.2f})')
+        st.plotly_chart(plot_sweep_heatmap(grid, sweep_metric), use_container_width=True)
+
+# === Walk-Forward Validation ===
+st.subheader('Walk-Forward Validation')
+st.markdown('**Re-optimize parameters on rolling train windows and trade them on the following, unseen test window.**')
+wf_col1, wf_col2, wf_col3 = st.columns(3)
+with wf_col1:
+    train_bars = st.number_input('Train Window (bars)', min_value=60, max_value=2520, value=504, step=21)
+with wf_col2:
+    test_bars = st.number_input('Test Window (bars)', min_value=5, max_value=504, value=63, step=21)
+with wf_col3:
+    wf_metric = st.selectbox('Optimize For', ['Sharpe', 'Return', 'Max Drawdown'])
+
+if st.button('Run Walk-Forward'):
+    # Warmup grows with every window, so the grid's largest values bound it
+    warmup = warmup_bars(strategy, {name: max(values) for name, values in PARAM_GRIDS[strategy].items()})
+    df = load_with_warmup(ticker, start_date, end_date, warmup, load=cached_price_data)
+    try:
+        with compiled.use_backend(kernel_backend):
+            st.session_state['walk_forward'] = walk_forward(df, strategy, int(train_bars), int(test_bars),
+                                                            metric=wf_metric)
+    except ValueError as e:
+        st.session_state.pop('walk_forward', None)
+        st.warning(f'{e}. Widen the date range or shorten the windows.')
+
+if 'walk_forward' in st.session_state:
+    wf_df, wf_metrics, folds = st.session_state['walk_forward']
+    show_chart(plot_cumulative_returns(wf_df, max_points))
+    st.dataframe(folds, use_container_width=True)
+    st.dataframe(wf_metrics.style.format({'Value': '{:.3f}'}))
+
+# === Universe Screen ===
+st.subheader('Universe Screen')
+st.markdown('**Run the selected strategy across a list of tickers in one pass and rank them.**')
+universe_input = st.text_area('Tickers (comma or whitespace separated)', value='AAPL MSFT GOOGL AMZN META NVDA')
+rank_by = st.selectbox('Rank By', ['Sharpe', 'Return', 'Max Drawdown'])
+
+if st.button('Run Universe Screen'):
+    universe = [t.strip().upper() for t in universe_input.replace(',', ' ').split() if t.strip()]
+    # One load range for the whole universe, reaching back far enough for every ticker
+    warmup = warmup_bars(strategy, strategy_params)
+    start_extended = min((warmup_start(t, start_date, warmup) for t in universe), default=start_date)
+    prices = cached_many(tuple(universe), start_extended, end_date)
+    with compiled.use_backend(kernel_backend):
+        st.session_state['universe'], _ = universe_backtest(prices, strategy, strategy_params, start_date,
+                                                            rank_by=rank_by)
+
+if 'universe' in st.session_state:
+    st.dataframe(st.session_state['universe'].style.format(precision=2), use_container_width=True)
+
+# === Portfolio Backtest ===
+st.subheader('Portfolio Backtest')
+st.markdown('**Combine the selected strategy\'s signals on the universe tickers above into one rebalanced book.**')
+pf_col1, pf_col2, pf_col3 = st.columns(3)
+with pf_col1:
+    weighting = st.selectbox('Weighting', WEIGHTINGS,
+                             help='equal: same size per open position; inverse_vol: sized by 1 / trailing '
+                                  'volatility; signal: sized by signal strength.')
+with pf_col2:
+    rebalance = st.selectbox('Rebalance', REBALANCE_FREQUENCIES, index=REBALANCE_FREQUENCIES.index('M'),
+                             help='Trade back to target weights on the first bar of each day, week, month, '
+                                  'quarter or year; weights drift with prices in between.')
+with pf_col3:
+    cost_bps = st.number_input('Cost (bps of turnover)', min_value=0.0, max_value=100.0, value=5.0, step=1.0)
+long_only = st.checkbox('Long only', value=False, help='Treat short positions as flat.')
+
+if st.button('Run Portfolio Backtest'):
+    universe = [t.strip().upper() for t in universe_input.replace(',', ' ').split() if t.strip()]
+    # Inverse-volatility weights also need a full volatility window before the first rebalance
+    warmup = max(warmup_bars(strategy, strategy_params), VOL_WINDOW + 1 if weighting == 'inverse_vol' else 0)
+    start_extended = min((warmup_start(t, start_date, warmup) for t in universe), default=start_date)
+    prices = cached_many(tuple(universe), start_extended, end_date)
+    with compiled.use_backend(kernel_backend):
+        st.session_state['portfolio'] = portfolio_backtest(prices, strategy, strategy_params, start_date,
+                                                           weighting, rebalance, cost_bps, long_only)
+
+if 'portfolio' in st.session_state:
+    pf_df, pf_metrics, pf_weights = st.session_state['portfolio']
+    st.dataframe(pf_metrics, use_container_width=True)
+    show_chart(plot_cumulative_returns(pf_df, max_points))
+    show_chart(plot_drawdown(pf_df, max_points))
+    st.markdown('**Target weights by rebalance date**')
+    st.dataframe(pf_weights.style.format(precision=3), use_container_width=True)
+    st.download_button('Download Portfolio (CSV)', data=pf_df.to_csv(index=False), file_name='portfolio.csv')
+
+# === Saved Runs ===
+st.subheader('Saved Runs')
+st.markdown('**Rank every stored backtest and sweep result computed by the current code.**')
+saved_col1, saved_col2, saved_col3 = st.columns(3)
+with saved_col1:
+    saved_strategy = st.selectbox('Strategy', ['All'] + list(REGISTRY), key='saved_strategy')
+    saved_tickers = st.text_input('Tickers (blank for all)', value='', key='saved_tickers')
+with saved_col2:
+    saved_metric = st.selectbox('Rank By', list(SUMMARY_METRICS), index=list(SUMMARY_METRICS).index('Sharpe'),
+                                key='saved_metric')
+    saved_limit = st.number_input('Top N', min_value=1, max_value=1000, value=50, key='saved_limit')
+with saved_col3:
+    saved_in_range = st.checkbox('Only runs inside the selected dates', value=False)
+    saved_sweeps = st.checkbox('Include sweep results', value=True)
+
+saved = result_store().query(None if saved_strategy == 'All' else saved_strategy,
+                             saved_tickers.replace(',', ' ').split() or None,
+                             start_date if saved_in_range else None, end_date if saved_in_range else None,
+                             saved_metric, saved_limit, include_sweeps=saved_sweeps)
+st.dataframe(saved.drop(columns='Key').style.format(precision=2), use_container_width=True)
+
+# === Performance Panel ===
+if record_trace:
+    with st.expander('Performance', expanded=True):
+        st.markdown('**Wall time, rows and memory per stage of this run.** '
+                    'Cached results skip their stages, so only work done on this rerun appears.')
+        st.dataframe(trace.summary().style.format(precision=2), use_container_width=True)
+        st.dataframe(trace.to_frame().style.format(precision=2), use_container_width=True)
+        trace_col1, trace_col2 = st.columns(2)
+        with trace_col1:
+            st.download_button('Download Trace (JSON)', data=trace.to_json(), file_name='trace.json')
+        with trace_col2:
+            st.download_button('Download Trace (CSV)', data=trace.to_csv(), file_name='trace.csv')
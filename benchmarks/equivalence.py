@@ -0,0 +1,344 @@
+"""
+Fast paths vs the pandas reference implementation.
+
+Each check runs an optimized path and the reference generate_signals /
+calculate_metrics pipeline on the same synthetic prices. It reports the number
+of Signal/Position mismatches (must be 0) and the largest absolute difference
+in any float output (must be within tolerance).
+
+    python -m benchmarks.equivalence [--bars 5000] [--seed 0] [--tolerance 1e-8]
+"""
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import synthetic_prices
+from strategies import STRATEGIES
+from utils.backtest import run_strategy
+from utils.metrics import calculate_metrics, metrics_kernel, rolling_metrics
+
+DEFAULT_TOLERANCE = 1e-8
+WARMUP_BARS = 300
+
+# Parameter sets checked for every strategy: defaults plus one short-window set
+CASES = {
+    'SMA': [{}, {'short_window': 5, 'long_window': 10}],
+    'EWMA': [{}, {'short_window': 3, 'long_window': 40}],
+    'MACD': [{}, {'short_window': 5, 'long_window': 13, 'signal_window': 4}],
+    'RSI': [{}, {'rsi_window': 5}],
+    'ATR': [{}, {'scale_factor': 0.1, 'atr_window': 5, 'breakout_window': 10}],
+}
+
+
+def reference_metrics(df):
+    """
+    The original pandas calculate_metrics arithmetic, unrounded, in METRIC_NAMES order.
+    """
+    df = df.copy()
+    df['Market_Returns'] = df['Close'].pct_change()
+    df['Strategy_Returns'] = df['Market_Returns'] * df['Position'].shift(1)
+    df['Cumulative_Market'] = (1 + df['Market_Returns']).cumprod()
+    df['Cumulative_Strategy'] = (1 + df['Strategy_Returns']).cumprod()
+    df = df.dropna(subset=['Market_Returns', 'Strategy_Returns'])
+
+    strategy, market = df['Strategy_Returns'], df['Market_Returns']
+    drawdown = df['Cumulative_Strategy'] / df['Cumulative_Strategy'].cummax() - 1
+    downside = strategy[strategy < 0]
+    losses = downside.sum()
+    return np.array([
+        (df['Cumulative_Strategy'].iloc[-1] - 1) * 100,
+        (df['Cumulative_Market'].iloc[-1] - 1) * 100,
+        np.std(strategy) * np.sqrt(252) * 100,
+        np.std(market) * np.sqrt(252) * 100,
+        abs(drawdown.min() * 100),
+        np.mean(strategy) / np.std(strategy) * np.sqrt(252),
+        np.mean(market) / np.std(market) * np.sqrt(252),
+        np.mean(strategy) / np.std(downside) * np.sqrt(252),
+        strategy[strategy > 0].sum() / abs(losses) if losses != 0 else np.inf,
+    ])
+
+
+def _reference(prices, strategy, params):
+    return run_strategy(prices.copy(), strategy, params, prices['Date'].iloc[WARMUP_BARS])
+
+
+def _diff(a, b):
+    a, b = np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)
+    both_nan = np.isnan(a) & np.isnan(b)
+    same_inf = np.isinf(a) & (a == b)
+    diff = np.where(both_nan | same_inf, 0.0, np.abs(a - b))
+    return float(np.nanmax(np.where(np.isnan(diff), np.inf, diff))) if diff.size else 0.0
+
+
+def check_metrics_kernel(prices):
+    # calculate_metrics (fused kernel) vs the original pandas arithmetic
+    mismatches, max_diff = 0, 0.0
+    for strategy, cases in CASES.items():
+        for params in cases:
+            signals, _ = STRATEGIES[strategy](prices.copy(), **params)
+            signals = signals.loc[signals['Date'] >= prices['Date'].iloc[WARMUP_BARS]]
+            expected = reference_metrics(signals)
+            df, metrics = calculate_metrics(signals.copy())
+            values = metrics_kernel(df['Strategy_Returns'].to_numpy(), df['Market_Returns'].to_numpy())
+            max_diff = max(max_diff, _diff(values[2:4], expected[2:4]), _diff(values[5:], expected[5:]))
+            mismatches += int((metrics['Value'].to_numpy() != np.round(expected, 2)).sum())
+    return {'mismatches': mismatches, 'max_diff': max_diff}
+
+
+def check_sweep(prices):
+    # Batched SMA/EWMA position matrix vs generate_signals per parameter set
+    from utils.sweep import position_matrix
+
+    mismatches = 0
+    for strategy in ('SMA', 'EWMA'):
+        param_list = [{'short_window': s, 'long_window': l} for s in (3, 5, 20) for l in (10, 50, 120)]
+        positions, _ = position_matrix(prices, strategy, param_list)
+        for row, params in zip(positions, param_list):
+            signals, _ = STRATEGIES[strategy](prices.copy(), **params)
+            mismatches += int((row != signals['Position'].to_numpy()).sum())
+    return {'mismatches': mismatches, 'max_diff': 0.0}
+
+
+def check_universe(prices):
+    # Dates x tickers universe pass vs one pandas pipeline per ticker
+    from utils.universe import universe_backtest
+
+    universe = {f'T{i}': synthetic_prices(len(prices), seed=i) for i in range(3)}
+    start = prices['Date'].iloc[WARMUP_BARS]
+    mismatches, max_diff = 0, 0.0
+    for strategy, cases in CASES.items():
+        for params in cases:
+            table, positions = universe_backtest(universe, strategy, params, start)
+            for ticker, ticker_prices in universe.items():
+                df, _ = run_strategy(ticker_prices.copy(), strategy, params, start)
+                mismatches += int((positions[ticker].loc[df['Date']].to_numpy() != df['Position'].to_numpy()).sum())
+                expected = metrics_kernel(df['Strategy_Returns'].to_numpy())[5]
+                max_diff = max(max_diff, _diff(table.loc[ticker, 'Sharpe'], expected))
+    return {'mismatches': mismatches, 'max_diff': max_diff}
+
+
+def check_streaming(prices):
+    # Bar-at-a-time streams vs batch generate_signals
+    from strategies.streaming import STREAMS, replay
+
+    mismatches = 0
+    for strategy, cases in CASES.items():
+        for params in cases:
+            signals, _ = STRATEGIES[strategy](prices.copy(), **params)
+            signal, position = replay(prices, STREAMS[strategy](**params))
+            mismatches += int((signal != signals['Signal'].to_numpy()).sum())
+            mismatches += int((position != signals['Position'].to_numpy()).sum())
+    return {'mismatches': mismatches, 'max_diff': 0.0}
+
+
+def check_incremental(prices):
+    # Extending a backtest bar by bar vs a full rerun
+    from utils.incremental import ExtendableBacktest
+
+    split = len(prices) - len(prices) // 5
+    start = prices['Date'].iloc[WARMUP_BARS]
+    mismatches, max_diff = 0, 0.0
+    for strategy in CASES:
+        backtest = ExtendableBacktest.run(prices.iloc[:split].copy(), strategy, start_date=start)
+        backtest.extend(prices.iloc[split:])
+        df, metrics = _reference(prices, strategy, {})
+        mismatches += int((backtest.frame['Position'].to_numpy() != df['Position'].to_numpy()).sum())
+        max_diff = max(max_diff, _diff(backtest.frame['Cumulative_Strategy'], df['Cumulative_Strategy']))
+        mismatches += int((backtest.metrics['Value'].to_numpy() != metrics['Value'].to_numpy()).sum())
+    return {'mismatches': mismatches, 'max_diff': max_diff}
+
+
+def check_rolling(prices):
+    # Running-sum rolling metrics vs metrics_kernel on a few explicit windows
+    df, _ = _reference(prices, 'SMA', {})
+    window = 63
+    rolling = rolling_metrics(df, window)
+    strategy, market = df['Strategy_Returns'].to_numpy(), df['Market_Returns'].to_numpy()
+    max_diff = 0.0
+    for end in np.linspace(window - 1, len(df) - 1, 10).astype(int):
+        values = metrics_kernel(strategy[end - window + 1:end + 1], market[end - window + 1:end + 1])
+        row = rolling.iloc[end]
+        max_diff = max(max_diff, _diff([row['Rolling_Sharpe'], row['Rolling_Sortino'], row['Rolling_Volatility'],
+                                        row['Rolling_Max_Drawdown']], values[[5, 7, 2, 4]]))
+    return {'mismatches': 0, 'max_diff': max_diff}
+
+
+def check_lean(prices):
+    # Lean array pipeline (float64 storage) vs run_strategy
+    from utils.lean import run_lean
+
+    start = prices['Date'].iloc[WARMUP_BARS]
+    mismatches, max_diff = 0, 0.0
+    for strategy, cases in CASES.items():
+        for params in cases:
+            df, metrics = _reference(prices, strategy, params)
+            lean, lean_metrics = run_lean(prices, strategy, params, start, dtype=np.float64)
+            mismatches += int((lean['Position'].to_numpy() != df['Position'].to_numpy()).sum())
+            mismatches += int((lean_metrics['Value'].to_numpy() != metrics['Value'].to_numpy()).sum())
+            max_diff = max(max_diff, _diff(lean['Cumulative_Strategy'], df['Cumulative_Strategy']))
+    return {'mismatches': mismatches, 'max_diff': max_diff}
+
+
+def check_trades(prices):
+    # Vectorized trade ledger compounds back to the equity curve
+    from utils.trades import trade_ledger
+
+    max_diff = 0.0
+    for strategy in CASES:
+        df, _ = _reference(prices, strategy, {})
+        ledger = trade_ledger(df)
+        held = np.prod(1 + ledger['Return (%)'].to_numpy() / 100)
+        equity = df['Cumulative_Strategy'].iloc[-1] / df['Cumulative_Strategy'].iloc[0]
+        max_diff = max(max_diff, _diff(held, equity))
+    return {'mismatches': 0, 'max_diff': max_diff}
+
+
+def check_chunked(prices):
+    # Out-of-core chunks over a memory-mapped store vs one in-memory run
+    import tempfile
+
+    from utils.chunked import chunked_backtest
+    from utils.store import ColumnStore
+
+    start = prices['Date'].iloc[WARMUP_BARS]
+    mismatches, max_diff = 0, 0.0
+    with tempfile.TemporaryDirectory() as root:
+        store = ColumnStore(root)
+        bounds = np.linspace(0, len(prices), 5).astype(int)
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            store.append('SYN', prices.iloc[lo:hi])
+        series = store.open('SYN')
+        for strategy, cases in CASES.items():
+            for params in cases:
+                df, metrics = _reference(prices, strategy, params)
+                chunks = []
+                chunked_metrics = chunked_backtest(series, strategy, params, start, chunk_rows=len(prices) // 7,
+                                                   on_chunk=chunks.append)
+                chunked = pd.concat(chunks)
+                mismatches += int((chunked['Position'].to_numpy() != df['Position'].to_numpy()).sum())
+                # Indicators continue exactly across chunks, so every value must match, not just to tolerance
+                for column in df.columns.drop('Date'):
+                    a, b = chunked[column].to_numpy(dtype=np.float64), df[column].to_numpy(dtype=np.float64)
+                    mismatches += int(((a != b) & ~(np.isnan(a) & np.isnan(b))).sum())
+                mismatches += int((chunked_metrics['Value'].to_numpy() != metrics['Value'].to_numpy()).sum())
+                max_diff = max(max_diff, _diff(chunked['Cumulative_Strategy'], df['Cumulative_Strategy']))
+    return {'mismatches': mismatches, 'max_diff': max_diff}
+
+
+def check_kernels(prices):
+    # Every kernel backend vs the NumPy one, and the NumPy position fill vs pandas' forward fill
+    from utils.compiled import available_backends, use_backend
+
+    mismatches, max_diff = 0, 0.0
+    for strategy, cases in CASES.items():
+        for params in cases:
+            with use_backend('numpy'):
+                expected, _ = STRATEGIES[strategy](prices.copy(), **params)
+            signal = expected['Signal']
+            filled = signal.mask(signal == 0).ffill().fillna(0).astype(signal.dtype)
+            mismatches += int((expected['Position'] != filled).sum())
+            for backend in available_backends():
+                with use_backend(backend):
+                    df, _ = STRATEGIES[strategy](prices.copy(), **params)
+                mismatches += int((df['Signal'] != expected['Signal']).sum())
+                mismatches += int((df['Position'] != expected['Position']).sum())
+                for column in df.columns.drop(['Date', 'Signal', 'Position']):
+                    max_diff = max(max_diff, _diff(df[column], expected[column]))
+    return {'mismatches': mismatches, 'max_diff': max_diff}
+
+
+def _reference_book(close, target, cost_bps):
+    # Bar-by-bar share holdings: trade to the targets at each rebalance close, pay costs, hold
+    first = int(close.index.searchsorted(target.index[0]))
+    prices = np.nan_to_num(close.ffill().to_numpy()[first:])
+    rebalances = dict(zip(target.index, target.to_numpy()))
+    value, shares, cash, returns = 1.0, np.zeros(prices.shape[1]), 1.0, []
+    for date, price in zip(close.index[first:], prices):
+        previous, value = value, cash + shares @ price
+        returns.append(value / previous - 1)
+        if date in rebalances:
+            weights = rebalances[date]
+            turnover = np.abs(weights - shares * price / value).sum()
+            # The cost is paid now but shows in the next bar's return, as in portfolio_backtest
+            after_costs = value * (1 - turnover * cost_bps / 10_000)
+            shares = np.divide(weights * after_costs, price, out=np.zeros_like(price), where=price > 0)
+            cash = after_costs - shares @ price
+    return np.array(returns[1:])
+
+
+def check_portfolio(prices):
+    # Vectorized rebalanced book vs run_strategy (one ticker, daily) and vs holding shares bar by bar
+    from utils.portfolio import portfolio_backtest
+    from utils.universe import align_prices
+
+    start = prices['Date'].iloc[WARMUP_BARS]
+    mismatches, max_diff = 0, 0.0
+    for strategy, cases in CASES.items():
+        for params in cases:
+            df, metrics = _reference(prices, strategy, params)
+            book, book_metrics, _ = portfolio_backtest({'SYN': prices}, strategy, params, start, rebalance='D')
+            mismatches += int((book_metrics['Value'].to_numpy()[:len(metrics)] != metrics['Value'].to_numpy()).sum())
+            max_diff = max(max_diff, _diff(book['Strategy_Returns'], df['Strategy_Returns']))
+
+    universe = {f'T{i}': synthetic_prices(len(prices), seed=i) for i in range(4)}
+    universe['T3'] = universe['T3'].iloc[WARMUP_BARS * 2:]
+    dates, tickers, matrices = align_prices(universe)
+    close = pd.DataFrame(matrices['Close'], index=dates, columns=tickers)
+    for weighting in ('equal', 'inverse_vol', 'signal'):
+        for rebalance in ('M', 10):
+            book, _, target = portfolio_backtest(universe, 'MACD', {}, start, weighting, rebalance, cost_bps=20)
+            expected = _reference_book(close, target, 20)
+            max_diff = max(max_diff, _diff(book['Cumulative_Strategy'], np.cumprod(1 + expected)))
+    return {'mismatches': mismatches, 'max_diff': max_diff}
+
+
+# Check name -> function(prices) returning {'mismatches': int, 'max_diff': float}.
+# New fast paths add an entry here.
+CHECKS = {
+    'metrics_kernel': check_metrics_kernel,
+    'sweep': check_sweep,
+    'universe': check_universe,
+    'streaming': check_streaming,
+    'incremental': check_incremental,
+    'rolling_metrics': check_rolling,
+    'trade_ledger': check_trades,
+    'lean': check_lean,
+    'chunked': check_chunked,
+    'kernels': check_kernels,
+    'portfolio': check_portfolio,
+}
+
+
+def run_checks(n_bars=5000, seed=0, tolerance=DEFAULT_TOLERANCE, checks=None):
+    """
+    Run the equivalence checks on one synthetic series.
+
+    Returns:
+        DataFrame: 'Check', 'Mismatches', 'Max Diff', 'Passed'.
+    """
+    prices = synthetic_prices(n_bars, seed=seed)[['Date', 'High', 'Low', 'Close']]
+    rows = []
+    for name in checks or CHECKS:
+        result = CHECKS[name](prices)
+        rows.append({'Check': name, 'Mismatches': result['mismatches'], 'Max Diff': result['max_diff'],
+                     'Passed': result['mismatches'] == 0 and result['max_diff'] <= tolerance})
+    return pd.DataFrame(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check fast paths against the pandas reference implementation.')
+    parser.add_argument('--bars', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument('--check', action='append', choices=list(CHECKS), help='run only these checks')
+    args = parser.parse_args(argv)
+
+    results = run_checks(args.bars, args.seed, args.tolerance, args.check)
+    print(results.to_string(index=False))
+    return 0 if results['Passed'].all() else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
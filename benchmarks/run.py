@@ -0,0 +1,187 @@
+"""
+Timing benchmarks on synthetic prices, compared against a stored baseline.
+
+    python -m benchmarks.run                          # default sizes, compare to baseline.json
+    python -m benchmarks.run --sizes 1000 10000000    # custom sizes (10M bars needs several GB)
+    python -m benchmarks.run --save-baseline          # record this machine's numbers as the baseline
+    python -m benchmarks.run --kernels numpy          # time the NumPy fallback instead of Numba
+
+Each benchmark is timed as the best of --repeat runs (bars/sec from that time)
+and then run once more under tracemalloc for its peak memory. A benchmark is a
+regression when it is more than --tolerance slower than the baseline at the
+same size; the exit status is 1 if any is.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import synthetic_prices
+from strategies import STRATEGIES
+from utils import charts, compiled
+from utils.lean import run_lean
+from utils.metrics import calculate_metrics
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+DEFAULT_REPEAT = 3
+DEFAULT_TOLERANCE = 0.25
+# Chart builders are only timed up to this many bars
+MAX_CHART_BARS = 1_000_000
+
+CHARTS = {
+    'plot_cumulative_returns': charts.plot_cumulative_returns,
+    'plot_drawdown': charts.plot_drawdown,
+    'plot_return_histogram': charts.plot_return_histogram,
+}
+
+
+def _time(func, repeat):
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _peak_mb(func):
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 2 ** 20
+    finally:
+        tracemalloc.stop()
+
+
+def benchmarks_for(prices):
+    """
+    Benchmark name -> zero-argument callable, for one price series.
+    """
+    cases = {}
+    for name, generate_signals in STRATEGIES.items():
+        cases[f'{name}.generate_signals'] = lambda f=generate_signals: f(prices.copy())
+
+        signals, _ = generate_signals(prices.copy())
+        cases[f'{name}.calculate_metrics'] = lambda s=signals: calculate_metrics(s.copy())
+        cases[f'{name}.run_lean'] = lambda n=name: run_lean(prices, n)
+
+    result, _ = calculate_metrics(STRATEGIES['SMA'](prices.copy())[0])
+    if len(prices) <= MAX_CHART_BARS:
+        for name, plot in CHARTS.items():
+            cases[f'charts.{name}'] = lambda p=plot: p(result)
+        cases['charts.plot_strategy_dashboard'] = lambda: charts.plot_strategy_dashboard(result, 'SMA')
+    return cases
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, repeat=DEFAULT_REPEAT, memory=True, only=None, log=print):
+    """
+    Returns:
+        DataFrame: 'Benchmark', 'Bars', 'Seconds', 'Bars/sec', 'Peak Memory (MB)'.
+    """
+    rows = []
+    for n_bars in sizes:
+        prices = synthetic_prices(n_bars)[['Date', 'High', 'Low', 'Close']]
+        for name, func in benchmarks_for(prices).items():
+            if only and not any(pattern in name for pattern in only):
+                continue
+            seconds = _time(func, repeat)
+            rows.append({
+                'Benchmark': name,
+                'Bars': n_bars,
+                'Seconds': seconds,
+                'Bars/sec': n_bars / seconds,
+                'Peak Memory (MB)': _peak_mb(func) if memory else np.nan,
+            })
+            log(f'{name:<40} {n_bars:>10,} bars  {seconds * 1000:10.2f} ms  {n_bars / seconds:14,.0f} bars/s')
+    return pd.DataFrame(rows)
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'kernels': compiled.get_backend(),
+    }
+
+
+def save_baseline(results, path=BASELINE_PATH):
+    with open(path, 'w') as f:
+        json.dump({'environment': environment(), 'results': results.to_dict(orient='records')}, f, indent=2)
+
+
+def load_baseline(path=BASELINE_PATH):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Join results with the baseline on (Benchmark, Bars).
+
+    Returns:
+        DataFrame: results plus 'Baseline Seconds', 'Ratio' (current / baseline)
+        and 'Regression' (Ratio above 1 + tolerance).
+    """
+    reference = pd.DataFrame(baseline['results'])[['Benchmark', 'Bars', 'Seconds']]
+    merged = results.merge(reference.rename(columns={'Seconds': 'Baseline Seconds'}),
+                           on=['Benchmark', 'Bars'], how='left')
+    merged['Ratio'] = merged['Seconds'] / merged['Baseline Seconds']
+    merged['Regression'] = merged['Ratio'] > 1 + tolerance
+    return merged
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the backtest pipeline on synthetic prices.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='series lengths in bars')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help='timed runs per benchmark (best is kept)')
+    parser.add_argument('--only', nargs='+', help='only benchmarks whose name contains one of these')
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc peak-memory pass')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='baseline JSON to compare with or save to')
+    parser.add_argument('--save-baseline', action='store_true', help='write the results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='allowed slowdown vs the baseline (0.25 = 25%%)')
+    parser.add_argument('--output', help='also write the results to this .csv or .json file')
+    parser.add_argument('--kernels', choices=['auto'] + compiled.BACKENDS, default='auto',
+                        help='signal kernel backend (auto = Numba when installed)')
+    args = parser.parse_args(argv)
+
+    compiled.set_backend(args.kernels)
+    print(f'Kernel backend: {compiled.get_backend()}')
+
+    results = run_benchmarks(args.sizes, args.repeat, not args.no_memory, args.only)
+    if args.output:
+        if args.output.endswith('.json'):
+            results.to_json(args.output, orient='records', indent=2)
+        else:
+            results.to_csv(args.output, index=False)
+
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+        print(f'Baseline written to {args.baseline}')
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f'No baseline at {args.baseline}, run with --save-baseline first')
+        return 0
+
+    compared = compare(results, load_baseline(args.baseline), args.tolerance)
+    regressions = compared[compared['Regression']]
+    if regressions.empty:
+        print(f'No regressions beyond {args.tolerance:.0%} of the baseline')
+        return 0
+    print('Regressions:')
+    print(regressions[['Benchmark', 'Bars', 'Seconds', 'Baseline Seconds', 'Ratio']].to_string(index=False))
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
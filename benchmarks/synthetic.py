@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+# Longest series laid out on business days; longer ones use minute bars so the
+# dates stay inside pandas' timestamp range
+MAX_DAILY_BARS = 50_000
+
+
+def synthetic_prices(n_bars, seed=0, mu=0.05, sigma=0.2, start_price=100.0, start='2000-01-03', freq=None):
+    """
+    Offline OHLC series from geometric Brownian motion.
+
+    Each bar opens at the previous close plus a small gap and closes on the GBM
+    path. High/Low extend past both open and close by a random intrabar range,
+    so Low <= min(Open, Close) <= max(Open, Close) <= High always holds.
+
+    Args:
+        n_bars (int): number of bars.
+        seed (int): random seed, the same seed gives the same series.
+        mu (float): annual drift.
+        sigma (float): annual volatility.
+        freq (str): bar frequency (default='B' up to MAX_DAILY_BARS bars, 'min' above).
+
+    Returns:
+        DataFrame: 'Date', 'Open', 'High', 'Low', 'Close'.
+    """
+    freq = freq or ('B' if n_bars <= MAX_DAILY_BARS else 'min')
+    periods_per_year = 252 if freq == 'B' else 252 * 390
+    dt = 1.0 / periods_per_year
+    rng = np.random.default_rng(seed)
+
+    log_returns = (mu - 0.5 * sigma ** 2) * dt + sigma * np.sqrt(dt) * rng.standard_normal(n_bars)
+    close = start_price * np.exp(np.cumsum(log_returns))
+    prev_close = np.concatenate(([start_price], close[:-1]))
+    open_ = prev_close * np.exp(0.1 * sigma * np.sqrt(dt) * rng.standard_normal(n_bars))
+
+    intrabar = sigma * np.sqrt(dt) * np.abs(rng.standard_normal((2, n_bars)))
+    high = np.maximum(open_, close) * np.exp(intrabar[0])
+    low = np.minimum(open_, close) * np.exp(-intrabar[1])
+
+    return pd.DataFrame({
+        'Date': pd.date_range(start, periods=n_bars, freq=freq),
+        'Open': open_,
+        'High': high,
+        'Low': low,
+        'Close': close,
+    })
@@ -0,0 +1,247 @@
+"""
+Headless batch runner: strategies x tickers from a JSON config, results written to disk.
+
+    python cli.py config.json [--output-dir results] [--offline] [--trace trace.json]
+
+Exit status is 0 on success, 1 on a bad config and 2 if some tickers could not be loaded or some
+runs failed; the rest of the batch is still written.
+
+Example config:
+
+    {
+        "tickers": ["AAPL", "MSFT"],
+        "start_date": "2018-01-01",
+        "end_date": "2023-01-01",
+        "strategies": {"SMA": {"short_window": 20, "long_window": 50}, "RSI": {}},
+        "output_dir": "results",
+        "format": "csv",
+        "lean": false,
+        "dtype": "float64",
+        "kernels": "auto",
+        "portfolio": {"weighting": "inverse_vol", "rebalance": "M", "cost_bps": 5},
+        "results": true
+    }
+
+"strategies" may also be a list of names (default parameters) and defaults to all
+five. "lean": true runs utils.lean.run_lean instead of the standard pipeline
+(fewer columns, no frame copies) and stores float columns as "dtype".
+"kernels" picks the signal kernel backend: "numba" (compiled, if installed),
+"numpy", or "auto" (Numba when available); results are identical either way.
+"portfolio" also runs each strategy as one rebalanced book over all loaded
+tickers (utils.portfolio.portfolio_backtest keyword arguments: "weighting",
+"rebalance", "cost_bps", "long_only", "vol_window").
+"results" keeps every standard run in the persistent result store
+(utils.results; true for the default location or a directory path): runs
+already stored for the same inputs and code are read back instead of
+recomputed. Stored runs use exactly their own strategy's warmup, as in the
+app, so the two share results.
+Only pandas/NumPy and the backtest modules are imported, and only once a run
+starts; streamlit and plotly are never loaded, and yfinance only if data is fetched.
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+DEFAULT_OUTPUT_DIR = 'results'
+EQUITY_COLUMNS = ['Date', 'Close', 'Position', 'Cumulative_Strategy', 'Cumulative_Market', 'Drawdown']
+
+
+def load_config(path):
+    with open(path) as f:
+        config = json.load(f)
+    for key in ('tickers', 'start_date', 'end_date'):
+        if key not in config:
+            raise ValueError(f"Config is missing '{key}'")
+    return config
+
+
+def _strategy_params(config):
+    from strategies import STRATEGIES
+
+    strategies = config.get('strategies', list(STRATEGIES))
+    if isinstance(strategies, list):
+        strategies = {name: {} for name in strategies}
+    unknown = set(strategies) - set(STRATEGIES)
+    if unknown:
+        raise ValueError(f"Unknown strategies {sorted(unknown)}, expected some of {list(STRATEGIES)}")
+    return {name: params or {} for name, params in strategies.items()}
+
+
+def _portfolio_options(config):
+    options = config.get('portfolio')
+    if options is None:
+        return None
+    allowed = {'weighting', 'rebalance', 'cost_bps', 'long_only', 'vol_window'}
+    unknown = set(options) - allowed
+    if unknown:
+        raise ValueError(f"Unknown portfolio options {sorted(unknown)}, expected some of {sorted(allowed)}")
+    return options
+
+
+def _write_frame(df, path, fmt):
+    if fmt == 'parquet':
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+
+
+def run_config(config, output_dir=None, offline=None, log=print):
+    """
+    Run every configured strategy on every ticker and write the results.
+
+    Writes one equity curve per (ticker, strategy) under output_dir/equity/ and a
+    summary table with one row per run to output_dir/metrics.<format>. With a
+    "portfolio" section, each strategy's book and rebalance weights also go under
+    output_dir/portfolio/, and its metrics to output_dir/portfolio_metrics.<format>.
+
+    Args:
+        config (dict): see the module docstring.
+        output_dir (str): overrides config['output_dir'].
+        offline (bool): serve prices from the local cache only (default=BACKTESTER_OFFLINE).
+        log (callable): progress messages (default=print).
+
+    Returns:
+        DataFrame: the summary table (Ticker, Strategy, Params, then one column per metric),
+        with what failed in summary.attrs['failed']: tickers that could not be loaded and
+        'TICKER STRATEGY' runs and 'portfolio STRATEGY' books that raised.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    import pandas as pd
+
+    from strategies import warmup_bars
+    from utils.backtest import run_strategy
+    from utils.compiled import use_backend
+    from utils.data import frame_loader, load_with_warmup, MAX_WORKERS
+    from utils.indicators import IndicatorCache
+    from utils.lean import run_lean, memory_report
+    from utils.metrics import METRIC_NAMES
+    from utils.portfolio import portfolio_backtest, VOL_WINDOW
+    from utils.profiling import carry
+    from utils.results import ResultStore
+
+    strategies = _strategy_params(config)
+    portfolio = _portfolio_options(config)
+    results = config.get('results')
+    store = ResultStore(results if isinstance(results, str) else None) if results else None
+    lean = config.get('lean', False)
+    dtype = config.get('dtype', 'float64')
+    output_dir = output_dir or config.get('output_dir', DEFAULT_OUTPUT_DIR)
+    fmt = config.get('format', 'csv')
+    start_date = datetime.fromisoformat(config['start_date'])
+    end_date = datetime.fromisoformat(config['end_date'])
+
+    # One load per ticker covers the longest warmup of any configured strategy
+    warmup = max(warmup_bars(name, params) for name, params in strategies.items())
+    if portfolio and portfolio.get('weighting') == 'inverse_vol':
+        warmup = max(warmup, portfolio.get('vol_window', VOL_WINDOW) + 1)
+
+    # A ticker that fails to load is reported and skipped, the rest of the batch still runs
+    def load(ticker):
+        try:
+            return load_with_warmup(ticker, start_date, end_date, warmup, offline=offline)
+        except Exception as e:
+            return e
+
+    tickers = list(dict.fromkeys(config['tickers']))
+    with ThreadPoolExecutor(max_workers=max(1, min(MAX_WORKERS, len(tickers)))) as pool:
+        prices = dict(zip(tickers, pool.map(carry(load), tickers)))
+
+    os.makedirs(os.path.join(output_dir, 'equity'), exist_ok=True)
+    rows, failed = [], []
+    with use_backend(config.get('kernels')):
+        for ticker, df in prices.items():
+            if isinstance(df, Exception) or df.empty:
+                log(f'{ticker}: skipped ({df if isinstance(df, Exception) else "no data"})')
+                failed.append(ticker)
+                continue
+            indicators = IndicatorCache(df)
+            for name, params in strategies.items():
+                # A run that fails (e.g. no bars left after warmup) is reported like a failed load
+                try:
+                    if lean:
+                        result, metrics = run_lean(df, name, params, start_date, dtype=dtype, keep_indicators=False)
+                    elif store is not None:
+                        # run_backtest over the shared load: the same warmup trim and incomplete_bars as in the app
+                        result, metrics = store.get_or_run(ticker, name, params, start_date, end_date,
+                                                           load=frame_loader(df))
+                    else:
+                        result, metrics = run_strategy(df.copy(), name, params, start_date, indicators)
+                except Exception as e:
+                    log(f'{ticker} {name}: failed ({type(e).__name__}: {e})')
+                    failed.append(f'{ticker} {name}')
+                    continue
+                equity_path = os.path.join(output_dir, 'equity', f'{ticker}_{name}.{fmt}')
+                _write_frame(result[EQUITY_COLUMNS], equity_path, fmt)
+                rows.append({'Ticker': ticker, 'Strategy': name, 'Params': json.dumps(params, sort_keys=True),
+                             **dict(zip(metrics['Metric'], metrics['Value']))})
+                if lean:
+                    report = memory_report(result, df, name, params)
+                    log(f"{ticker} {name}: done, {report['Lean (MB)']:.1f} MB "
+                        f"({report['Saved (MB)']:.1f} MB / {report['Saved (%)']:.0f}% saved)")
+                else:
+                    log(f'{ticker} {name}: done')
+
+    loaded = {ticker: df for ticker, df in prices.items() if not isinstance(df, Exception) and not df.empty}
+    if portfolio and loaded:
+        os.makedirs(os.path.join(output_dir, 'portfolio'), exist_ok=True)
+        book_rows = []
+        with use_backend(config.get('kernels')):
+            for name, params in strategies.items():
+                try:
+                    book, book_metrics, weights = portfolio_backtest(loaded, name, params, start_date, **portfolio)
+                except Exception as e:
+                    log(f'portfolio {name}: failed ({type(e).__name__}: {e})')
+                    failed.append(f'portfolio {name}')
+                    continue
+                _write_frame(book, os.path.join(output_dir, 'portfolio', f'{name}.{fmt}'), fmt)
+                _write_frame(weights.reset_index(), os.path.join(output_dir, 'portfolio', f'{name}_weights.{fmt}'),
+                             fmt)
+                book_rows.append({'Strategy': name, 'Params': json.dumps(params, sort_keys=True),
+                                  **dict(zip(book_metrics['Metric'], book_metrics['Value']))})
+                log(f'portfolio {name}: done ({len(loaded)} tickers, {len(weights)} rebalances)')
+        _write_frame(pd.DataFrame(book_rows), os.path.join(output_dir, f'portfolio_metrics.{fmt}'), fmt)
+
+    summary = pd.DataFrame(rows, columns=['Ticker', 'Strategy', 'Params'] + list(METRIC_NAMES))
+    _write_frame(summary, os.path.join(output_dir, f'metrics.{fmt}'), fmt)
+    summary.attrs['failed'] = failed
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run backtests from a JSON config without the Streamlit app.')
+    parser.add_argument('config', help='path to the JSON config')
+    parser.add_argument('--output-dir', help=f"output directory (default: config 'output_dir' or '{DEFAULT_OUTPUT_DIR}')")
+    parser.add_argument('--offline', action='store_true', help='use cached prices only')
+    parser.add_argument('--quiet', action='store_true', help='only report errors')
+    parser.add_argument('--trace', help='write a per-stage timing trace to this .json or .csv file')
+    parser.add_argument('--trace-memory', action='store_true', help='include peak memory in the trace (slower)')
+    args = parser.parse_args(argv)
+
+    if args.trace:
+        from utils import profiling
+        trace = profiling.enable(track_memory=args.trace_memory)
+
+    try:
+        config = load_config(args.config)
+        summary = run_config(config, args.output_dir, offline=args.offline or None,
+                             log=(lambda message: None) if args.quiet else print)
+        if args.trace:
+            trace.save(args.trace)
+    except (OSError, ValueError) as e:
+        print(f'error: {e}', file=sys.stderr)
+        return 1
+
+    failed = summary.attrs['failed']
+    if not args.quiet:
+        print(f'{len(summary)} runs written to {args.output_dir or config.get("output_dir", DEFAULT_OUTPUT_DIR)}')
+    if failed:
+        print(f'failed: {", ".join(failed)}', file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
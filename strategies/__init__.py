@@ -0,0 +1,17 @@
+from strategies.registry import REGISTRY, Param, StrategySpec, warmup_bars, ui_defaults
+from utils.profiling import profiled
+
+# Strategy name (as shown in the app) -> generate_signals, each call timed as a
+# 'generate_signals[<name>]' stage when profiling is enabled
+STRATEGIES = {name: profiled(f'generate_signals[{name}]')(spec.generate_signals) for name, spec in REGISTRY.items()}
+
+# Default optimization grids over the app's slider ranges (coarser steps for the 3-parameter strategies)
+PARAM_GRIDS = {
+    'SMA': {'short_window': list(range(5, 51, 5)), 'long_window': list(range(10, 201, 10))},
+    'EWMA': {'short_window': list(range(5, 51, 5)), 'long_window': list(range(10, 201, 10))},
+    'MACD': {'short_window': list(range(5, 21, 3)), 'long_window': list(range(10, 51, 5)),
+             'signal_window': list(range(5, 21, 3))},
+    'RSI': {'rsi_window': list(range(5, 31))},
+    'ATR': {'atr_window': list(range(5, 51, 5)), 'breakout_window': list(range(10, 51, 5)),
+            'scale_factor': [round(0.1 * i, 1) for i in range(1, 31, 3)]},
+}
@@ -3,7 +3,10 @@
 import pandas as pd
 import numpy as np
 
-def generate_signals(df, scale_factor=0.5, atr_window=14, breakout_window=20):
+from utils.indicators import IndicatorCache
+from utils.kernels import breakout_signals, ffill_position
+
+def generate_signals(df, scale_factor=0.5, atr_window=14, breakout_window=20, indicators=None):
     """
     Generate ATR Breakout trading signals.
 
@@ -11,45 +14,42 @@ def generate_signals(df, scale_factor=0.5, atr_window=14, breakout_window=20):
     - df: DataFrame with 'High', 'Low', 'Close' prices
     - atr_window: period for ATR calculation (default=14)
     - breakout_window: period for recent high/low breakout (default=20)
+    - indicators: shared IndicatorCache for this price series (default=new cache)
 
     Returns:
     - df: DataFrame with added columns ['ATR', 'Upper_Breakout', 'Lower_Breakout', 'Signal', 'Position']
     - warmup_window: int, maximum window needed for indicators to warm up
     """
 
+    indicators = indicators or IndicatorCache(df)
+
     # True Range components
     df['High_Low'] = df['High'] - df['Low']
     df['High_Close_Prev'] = np.abs(df['High'] - df['Close'].shift(1))
     df['Low_Close_Prev'] = np.abs(df['Low'] - df['Close'].shift(1))
 
     # True Range
-    df['TR'] = df[['High_Low', 'High_Close_Prev', 'Low_Close_Prev']].max(axis=1)
+    true_range = indicators.key('true_range', None)
+    df['TR'] = indicators.series(true_range)
 
     # Average True Range (ATR)
-    df['ATR'] = df['TR'].rolling(window=atr_window, min_periods=atr_window).mean()
+    df['ATR'] = indicators.get('sma', true_range, window=atr_window, min_periods=atr_window)
 
     # 20-Day Highs and Lows
-    df['20D_High'] = df['Close'].rolling(window=breakout_window).max()
-    df['20D_Low'] = df['Close'].rolling(window=breakout_window).min()
+    df['20D_High'] = indicators.get('rolling_max', 'Close', window=breakout_window)
+    df['20D_Low'] = indicators.get('rolling_min', 'Close', window=breakout_window)
 
     # Breakout Levels
     df['Upper_Breakout'] = df['20D_High'] + scale_factor * df['ATR']
     df['Lower_Breakout'] = df['20D_Low'] - scale_factor * df['ATR']
 
-    # Initialize Signals
-    df['Signal'] = 0
-
     # Buy Signal: today's Close > yesterday's Upper Breakout, yesterday's Close <= two days ago's Upper Breakout
-    buy_condition = (df['Close'] > df['Upper_Breakout'].shift(1)) & (df['Close'].shift(1) <= df['Upper_Breakout'].shift(2))
-    df.loc[buy_condition, 'Signal'] = 1
-
     # Sell Signal: today's Close < yesterday's Lower Breakout, yesterday's Close >= two days ago's Lower Breakout
-    sell_condition = (df['Close'] < df['Lower_Breakout'].shift(1)) & (df['Close'].shift(1) >= df['Lower_Breakout'].shift(2))
-    df.loc[sell_condition, 'Signal'] = -1
-
+    df['Signal'] = breakout_signals(df['Close'].to_numpy(), df['Upper_Breakout'].to_numpy(),
+                                    df['Lower_Breakout'].to_numpy()).astype(np.int64)
 
     # Position (carry forward)
-    df['Position'] = df['Signal'].replace(to_replace=0, method='ffill')
+    df['Position'] = ffill_position(df['Signal'].to_numpy())
 
     # Determine Warmup Window
     warmup_window = max(atr_window, breakout_window)
@@ -2,7 +2,10 @@
 
 import pandas as pd
 
-def generate_signals(df, short_window=12, long_window=26):
+from utils.indicators import IndicatorCache
+from utils.kernels import ffill_position
+
+def generate_signals(df, short_window=12, long_window=26, indicators=None):
     """
     EWMA Crossover Strategy:
     Buy when short-term EWMA crosses above long-term EWMA.
@@ -12,14 +15,17 @@ def generate_signals(df, short_window=12, long_window=26):
         df (DataFrame): must contain a 'Close' price column.
         short_window (int): periods for short EWMA (default=12).
         long_window (int): periods for long EWMA (default=26).
+        indicators (IndicatorCache): shared indicator cache for this price series (default=new cache).
 
     Returns:
         DataFrame: original df with 'Signal' and 'Position' columns added.
     """
 
+    indicators = indicators or IndicatorCache(df)
+
     # Calculate EWMAs
-    df['EWMA_Short'] = df['Close'].ewm(span=short_window, adjust=False).mean()
-    df['EWMA_Long'] = df['Close'].ewm(span=long_window, adjust=False).mean()
+    df['EWMA_Short'] = indicators.get('ema', 'Close', span=short_window)
+    df['EWMA_Long'] = indicators.get('ema', 'Close', span=long_window)
 
     # Initialize Signal column
     df['Signal'] = 0
@@ -32,7 +38,7 @@ def generate_signals(df, short_window=12, long_window=26):
     df.loc[sell_signal, 'Signal'] = -1
 
     # Build Position column by forward-filling signals
-    df['Position'] = df['Signal'].replace(to_replace=0, method='ffill')
+    df['Position'] = ffill_position(df['Signal'].to_numpy())
 
     # Define warm-up window for plotting purposes
     warmup_window = max(short_window, long_window)
@@ -3,7 +3,10 @@
 import pandas as pd
 import numpy as np
 
-def generate_signals(df, short_window=12, long_window=26, signal_window=9):
+from utils.indicators import IndicatorCache
+from utils.kernels import ffill_position
+
+def generate_signals(df, short_window=12, long_window=26, signal_window=9, indicators=None):
     """
     Generate MACD crossover trading signals.
 
@@ -12,21 +15,25 @@ def generate_signals(df, short_window=12, long_window=26, signal_window=9):
     - short_window: period for the short-term EMA (default=12)
     - long_window: period for the long-term EMA (default=26)
     - signal_window: period for the MACD Signal line (default=9)
+    - indicators: shared IndicatorCache for this price series (default=new cache)
 
     Returns:
     - df: DataFrame with added columns ['MACD', 'Signal_Line', 'Position', 'Signal']
     - warmup_window: int, maximum window needed for indicators to warm up
     """
 
+    indicators = indicators or IndicatorCache(df)
+
     # Short EMA and Long EMA
-    df['Short_EMA'] = df['Close'].ewm(span=short_window, adjust=False).mean()
-    df['Long_EMA'] = df['Close'].ewm(span=long_window, adjust=False).mean()
+    df['Short_EMA'] = indicators.get('ema', 'Close', span=short_window)
+    df['Long_EMA'] = indicators.get('ema', 'Close', span=long_window)
 
     # MACD Line
-    df['MACD'] = df['Short_EMA'] - df['Long_EMA']
+    macd = indicators.key('macd', 'Close', short_span=short_window, long_span=long_window)
+    df['MACD'] = indicators.series(macd)
 
     # Signal Line
-    df['Signal_Line'] = df['MACD'].ewm(span=signal_window, adjust=False).mean()
+    df['Signal_Line'] = indicators.get('ema', macd, span=signal_window)
 
     # Create Signal Column
     df['Signal'] = 0
@@ -34,7 +41,7 @@ def generate_signals(df, short_window=12, long_window=26, signal_window=9):
     df.loc[(df['MACD'] < df['Signal_Line']) & (df['MACD'].shift(1) >= df['Signal_Line'].shift(1)), 'Signal'] = -1
 
     # Position (for cumulative returns)
-    df['Position'] = df['Signal'].replace(to_replace=0, method='ffill')
+    df['Position'] = ffill_position(df['Signal'].to_numpy())
 
     # Calculate warmup window
     warmup_window = max(short_window, long_window, signal_window)
@@ -0,0 +1,91 @@
+import inspect
+from collections import namedtuple
+
+from strategies.sma_crossover_strategy import generate_signals as sma_signals
+from strategies.ewma_crossover_strategy import generate_signals as ewma_signals
+from strategies.macd_strategy import generate_signals as macd_signals
+from strategies.rsi_bollinger_strategy import generate_signals as rsi_signals
+from strategies.atr_breakout_strategy import generate_signals as atr_signals
+
+# One tunable parameter: generate_signals keyword, slider label, range, UI default, step and help text
+Param = namedtuple('Param', ['name', 'label', 'min', 'max', 'default', 'step', 'help'])
+
+# title: long name for headings. indicators: the chart columns generate_signals adds.
+# warmup: full params dict -> trading bars of history needed before the first traded bar
+StrategySpec = namedtuple('StrategySpec', ['generate_signals', 'title', 'description', 'params', 'indicators',
+                                           'warmup'])
+
+REGISTRY = {
+    'SMA': StrategySpec(
+        sma_signals, 'SMA',
+        'Simple Moving Average crossover: Buy when short SMA crosses above long SMA; sell when it crosses below.',
+        [Param('short_window', 'Short Window', 5, 50, 20, 1,
+               'The period for the short-term moving average. Used to generate entry/exit signals.'),
+         Param('long_window', 'Long Window', 10, 200, 50, 1,
+               'The period for the long-term moving average. Signals are generated when the short MA crosses this.')],
+        ['SMA_Short', 'SMA_Long'],
+        # Both averages defined on the bar before the first one, for the crossover test
+        lambda p: max(p['short_window'], p['long_window'])),
+    'EWMA': StrategySpec(
+        ewma_signals, 'EWMA',
+        'Exponentially Weighted MA crossover: Like SMA, but with more recent prices weighted heavier.',
+        [Param('short_window', 'Short Window', 5, 50, 20, 1,
+               'The short EWMA emphasizes recent prices more heavily for responsiveness.'),
+         Param('long_window', 'Long Window', 10, 200, 50, 1,
+               'The long EWMA provides smoother signals and serves as the baseline trend.')],
+        ['EWMA_Short', 'EWMA_Long'],
+        # EWMAs are defined from the first bar; one span of history lets them settle
+        lambda p: max(p['short_window'], p['long_window'])),
+    'MACD': StrategySpec(
+        macd_signals, 'MACD',
+        'Moving Average Convergence Divergence: Momentum strategy using EWMA crossovers and a signal line.',
+        [Param('short_window', 'Short EMA Window', 5, 20, 12, 1, 'Fast EWMA used in MACD calculation (default 12).'),
+         Param('long_window', 'Long EMA Window', 10, 50, 26, 1, 'Slow EWMA used in MACD calculation (default 26).'),
+         Param('signal_window', 'Signal Line Window', 5, 20, 9, 1,
+               'EWMA of the MACD line, used to generate buy/sell signals.')],
+        ['MACD', 'Signal_Line'],
+        # The signal line smooths the MACD line, so it settles a signal span after the slow EWMA
+        lambda p: max(p['short_window'], p['long_window']) + p['signal_window']),
+    'RSI': StrategySpec(
+        rsi_signals, 'RSI',
+        'Relative Strength Index: Measures overbought/oversold conditions. Buy when RSI < 30 & price hits lower band.',
+        [Param('rsi_window', 'RSI Period', 5, 30, 14, 1,
+               'The lookback period for RSI. Common default is 14 days.')],
+        ['RSI', 'Upper_Band', 'Lower_Band'],
+        # RSI averages rsi_window price changes (one more bar), both defined on the bar before the first one
+        lambda p: max(p['rsi_window'] + 1, p['bollinger_window'])),
+    'ATR': StrategySpec(
+        atr_signals, 'ATR Breakout',
+        'Average True Range breakout: Volatility-based breakout strategy using ATR and 20-day highs/lows.',
+        [Param('atr_window', 'ATR Window', 5, 50, 14, 1,
+               'ATR period defines the volatility baseline. Higher values = smoother breakout levels.'),
+         Param('breakout_window', 'Breakout Window', 10, 50, 20, 1,
+               'Period over which recent highs/lows are tracked for breakout logic.'),
+         Param('scale_factor', 'Scale Factor', 0.1, 3.0, 0.5, 0.1,
+               'Multiplier applied to ATR for adjusting breakout thresholds.')],
+        ['Upper_Breakout', 'Lower_Breakout'],
+        # Entries compare against breakout levels one and two bars back
+        lambda p: max(p['atr_window'], p['breakout_window']) + 1),
+}
+
+
+def signal_defaults(strategy):
+    # generate_signals keyword defaults, including those without a slider
+    return {name: p.default for name, p in inspect.signature(REGISTRY[strategy].generate_signals).parameters.items()
+            if p.default is not inspect.Parameter.empty and name != 'indicators'}
+
+
+def ui_defaults(strategy):
+    # Slider starting values
+    return {param.name: param.default for param in REGISTRY[strategy].params}
+
+
+def warmup_bars(strategy, params=None):
+    """
+    Trading bars of history a strategy needs before its first traded bar, so
+    every indicator and signal is fully defined from that bar on.
+
+    Args:
+        params (dict): generate_signals keyword arguments (missing ones take their defaults).
+    """
+    return REGISTRY[strategy].warmup({**signal_defaults(strategy), **(params or {})})
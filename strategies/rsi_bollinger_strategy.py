@@ -3,7 +3,10 @@
 import pandas as pd
 import numpy as np
 
-def generate_signals(df, rsi_window=14, bollinger_window=20, num_std_dev=2):
+from utils.indicators import IndicatorCache
+from utils.kernels import ffill_position, transition_signals
+
+def generate_signals(df, rsi_window=14, bollinger_window=20, num_std_dev=2, indicators=None):
     """
     RSI + Bollinger Bands Strategy:
     Buy when RSI is oversold AND price touches/below Lower Band.
@@ -14,48 +17,36 @@ def generate_signals(df, rsi_window=14, bollinger_window=20, num_std_dev=2):
         rsi_window (int): periods for RSI (default=14).
         bollinger_window (int): periods for Bollinger Bands SMA (default=20).
         num_std_dev (float): number of standard deviations for Bollinger Bands (default=2).
+        indicators (IndicatorCache): shared indicator cache for this price series (default=new cache).
 
     Returns:
         DataFrame: original df with 'Signal' and 'Position' columns added.
     """
 
+    indicators = indicators or IndicatorCache(df)
+
     # Calculate Bollinger Bands
-    df['SMA'] = df['Close'].rolling(window=bollinger_window).mean()
-    df['STDDEV'] = df['Close'].rolling(window=bollinger_window).std()
+    df['SMA'] = indicators.get('sma', 'Close', window=bollinger_window)
+    df['STDDEV'] = indicators.get('std', 'Close', window=bollinger_window)
     df['Upper_Band'] = df['SMA'] + (num_std_dev * df['STDDEV'])
     df['Lower_Band'] = df['SMA'] - (num_std_dev * df['STDDEV'])
 
     # Calculate RSI
-    delta = df['Close'].diff()
-    gain = delta.clip(lower=0)
-    loss = -delta.clip(upper=0)
-
-    avg_gain = gain.rolling(window=rsi_window, min_periods=rsi_window).mean()
-    avg_loss = loss.rolling(window=rsi_window, min_periods=rsi_window).mean()
+    avg_gain = indicators.get('sma', indicators.key('gain', 'Close'), window=rsi_window, min_periods=rsi_window)
+    avg_loss = indicators.get('sma', indicators.key('loss', 'Close'), window=rsi_window, min_periods=rsi_window)
 
     rs = avg_gain / avg_loss
     df['RSI'] = 100 - (100 / (1 + rs))
 
-    # Initialize Signal column
-    df['Signal'] = 0
-
-    # First create neutral Signals
-    df['Signal'] = 0
-
     # Buy when Buy Condition becomes newly true
     buy_signal = (df['RSI'] < 30) & (df['Close'] <= df['Lower_Band'])
     sell_signal = (df['RSI'] > 70) & (df['Close'] >= df['Upper_Band'])
 
-    # Entry only on transition
-    df.loc[(buy_signal) & (~(buy_signal.shift(1).fillna(False))), 'Signal'] = 1
-    df.loc[(sell_signal) & (~(sell_signal.shift(1).fillna(False))), 'Signal'] = -1
-
-    # Forward fill Position
-    df['Position'] = df['Signal']
-    df['Position'] = df['Position'].ffill()
+    # Entry only on transition (sell wins if both become true on the same bar)
+    df['Signal'] = transition_signals(buy_signal.to_numpy(), sell_signal.to_numpy()).astype(np.int64)
 
     # Build Position column by forward-filling signals
-    df['Position'] = df['Signal'].replace(to_replace=0, method='ffill')
+    df['Position'] = ffill_position(df['Signal'].to_numpy())
 
     # Define warm-up window for plotting purposes
     warmup_window = max(rsi_window, bollinger_window)
@@ -2,7 +2,10 @@
 
 import pandas as pd
 
-def generate_signals(df, short_window=20, long_window=50):
+from utils.indicators import IndicatorCache
+from utils.kernels import ffill_position
+
+def generate_signals(df, short_window=20, long_window=50, indicators=None):
     """
     SMA Crossover Strategy:
     Buy when short-term SMA crosses above long-term SMA.
@@ -12,14 +15,17 @@ def generate_signals(df, short_window=20, long_window=50):
         df (DataFrame): must contain a 'Close' price column.
         short_window (int): periods for short SMA.
         long_window (int): periods for long SMA.
+        indicators (IndicatorCache): shared indicator cache for this price series (default=new cache).
 
     Returns:
         DataFrame: original df with 'Signal' and 'Position' columns added.
     """
 
+    indicators = indicators or IndicatorCache(df)
+
     # Calculate SMAs
-    df['SMA_Short'] = df['Close'].rolling(window=short_window).mean()
-    df['SMA_Long'] = df['Close'].rolling(window=long_window).mean()
+    df['SMA_Short'] = indicators.get('sma', 'Close', window=short_window)
+    df['SMA_Long'] = indicators.get('sma', 'Close', window=long_window)
 
     # Initialize Signal column
     df['Signal'] = 0
@@ -32,7 +38,7 @@ def generate_signals(df, short_window=20, long_window=50):
     df.loc[sell_signal, 'Signal'] = -1
 
     # Build Position column by forward-filling signals
-    df['Position'] = df['Signal'].replace(to_replace=0, method='ffill')
+    df['Position'] = ffill_position(df['Signal'].to_numpy())
 
     # Define warm-up window for plotting purposes
     warmup_window = max(short_window, long_window)
@@ -0,0 +1,362 @@
+# strategies/streaming.py
+
+import copy
+import math
+from collections import deque
+
+import numpy as np
+
+# Bar-at-a-time versions of the strategies. Every indicator updates in O(1) per bar
+# (O(1) amortized for rolling max/min) and reproduces the pandas arithmetic used by
+# generate_signals, so Signal/Position match the batch functions bar for bar.
+# Each strategy stream's `indicators` holds the latest values under the batch column names.
+
+NAN = float('nan')
+
+
+class StreamingState:
+    """Snapshot/restore support shared by the indicators and strategy streams."""
+
+    def snapshot(self):
+        return copy.deepcopy(self.__dict__)
+
+    def restore(self, state):
+        self.__dict__.update(copy.deepcopy(state))
+        return self
+
+
+class RollingMean(StreamingState):
+    """pandas rolling(window, min_periods).mean(): Kahan-compensated running sum."""
+
+    def __init__(self, window, min_periods=None):
+        self.window = window
+        self.min_periods = window if min_periods is None else min_periods
+        self.values = deque()
+        self.nobs = 0
+        self.sum = 0.0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.neg_count = 0
+        self.same_count = 0
+        self.prev = None
+
+    def update(self, value):
+        if len(self.values) == self.window:
+            old = self.values.popleft()
+            if old == old:
+                self.nobs -= 1
+                y = -old - self.comp_remove
+                t = self.sum + y
+                self.comp_remove = t - self.sum - y
+                self.sum = t
+                if old < 0:
+                    self.neg_count -= 1
+        self.values.append(value)
+
+        if value == value:
+            self.nobs += 1
+            y = value - self.comp_add
+            t = self.sum + y
+            self.comp_add = t - self.sum - y
+            self.sum = t
+            if value < 0:
+                self.neg_count += 1
+            self.same_count = self.same_count + 1 if value == self.prev else 1
+            self.prev = value
+
+        if self.nobs < self.min_periods or self.nobs == 0:
+            return NAN
+        result = self.sum / self.nobs
+        if self.same_count >= self.nobs:
+            result = self.prev
+        if self.neg_count == 0 and result < 0:
+            result = 0.0
+        elif self.neg_count == self.nobs and result > 0:
+            result = 0.0
+        return result
+
+
+class RollingStd(StreamingState):
+    """pandas rolling(window).std(): Welford running mean/variance with add/remove."""
+
+    def __init__(self, window, ddof=1):
+        self.window = window
+        self.ddof = ddof
+        self.values = deque()
+        self.nobs = 0
+        self.mean = 0.0
+        self.ssqdm = 0.0
+        self.comp = 0.0
+        self.same_count = 0
+        self.prev = None
+
+    def update(self, value):
+        if len(self.values) == self.window:
+            old = self.values.popleft()
+            if old == old:
+                self.nobs -= 1
+                if self.nobs:
+                    prev_mean = self.mean - self.comp
+                    y = old - self.comp
+                    t = y - self.mean
+                    self.comp = t + self.mean - y
+                    self.mean -= t / self.nobs
+                    self.ssqdm -= (old - prev_mean) * (old - self.mean)
+                else:
+                    self.mean = 0.0
+                    self.ssqdm = 0.0
+        self.values.append(value)
+
+        if value == value:
+            self.same_count = self.same_count + 1 if value == self.prev else 1
+            self.prev = value
+            self.nobs += 1
+            prev_mean = self.mean - self.comp
+            y = value - self.comp
+            t = y - self.mean
+            self.comp = t + self.mean - y
+            self.mean += t / self.nobs
+            self.ssqdm += (value - prev_mean) * (value - self.mean)
+
+        if self.nobs < self.window or self.nobs <= self.ddof:
+            return NAN
+        if self.nobs == 1 or self.same_count >= self.nobs:
+            return 0.0
+        return math.sqrt(max(self.ssqdm / (self.nobs - self.ddof), 0.0))
+
+
+class RollingExtreme(StreamingState):
+    """Rolling max (or min) over a full window using a monotonic deque of (index, value)."""
+
+    def __init__(self, window, mode='max'):
+        self.window = window
+        self.sign = 1.0 if mode == 'max' else -1.0
+        self.candidates = deque()
+        self.count = 0
+
+    def update(self, value):
+        i = self.count
+        self.count += 1
+        while self.candidates and self.candidates[0][0] <= i - self.window:
+            self.candidates.popleft()
+        if value == value:
+            keyed = self.sign * value
+            while self.candidates and self.sign * self.candidates[-1][1] <= keyed:
+                self.candidates.pop()
+            self.candidates.append((i, value))
+        if self.count < self.window or not self.candidates:
+            return NAN
+        return self.candidates[0][1]
+
+
+class EWMA(StreamingState):
+    """pandas ewm(span=span, adjust=False).mean()."""
+
+    def __init__(self, span):
+        com = (span - 1) / 2.0
+        self.alpha = 1.0 / (1.0 + com)
+        self.old_wt_factor = 1.0 - self.alpha
+        self.weighted = NAN
+
+    def update(self, value):
+        if self.weighted != self.weighted:
+            self.weighted = value
+        elif value == value and self.weighted != value:
+            self.weighted = (self.old_wt_factor * self.weighted + self.alpha * value) / (self.old_wt_factor + self.alpha)
+        return self.weighted
+
+
+class Position(StreamingState):
+    """Signal carry-forward: the last non-zero signal, 0 before the first one."""
+
+    def __init__(self):
+        self.position = 0
+
+    def update(self, signal):
+        if signal != 0:
+            self.position = signal
+        return self.position
+
+
+class CrossoverStream(StreamingState):
+    """Shared crossover logic of the SMA and EWMA strategies."""
+
+    # Batch column names of the fast/slow averages
+    columns = ('Fast', 'Slow')
+
+    def __init__(self, fast, slow):
+        self.fast = fast
+        self.slow = slow
+        self.indicators = {}
+        self.prev_above = False
+        self.prev_below = False
+        self.position = Position()
+
+    def update(self, high, low, close):
+        fast = self.fast.update(close)
+        slow = self.slow.update(close)
+        self.indicators = {self.columns[0]: fast, self.columns[1]: slow}
+        above, below = fast > slow, fast < slow
+
+        signal = 0
+        if above and not self.prev_above:
+            signal = 1
+        if below and not self.prev_below:
+            signal = -1
+        self.prev_above, self.prev_below = above, below
+        return signal, self.position.update(signal)
+
+
+class SMACrossoverStream(CrossoverStream):
+    columns = ('SMA_Short', 'SMA_Long')
+
+    def __init__(self, short_window=20, long_window=50):
+        super().__init__(RollingMean(short_window), RollingMean(long_window))
+
+
+class EWMACrossoverStream(CrossoverStream):
+    columns = ('EWMA_Short', 'EWMA_Long')
+
+    def __init__(self, short_window=12, long_window=26):
+        super().__init__(EWMA(short_window), EWMA(long_window))
+
+
+class MACDStream(StreamingState):
+    def __init__(self, short_window=12, long_window=26, signal_window=9):
+        self.short_ema = EWMA(short_window)
+        self.long_ema = EWMA(long_window)
+        self.signal_line = EWMA(signal_window)
+        self.prev_macd = NAN
+        self.prev_signal_line = NAN
+        self.position = Position()
+        self.indicators = {}
+
+    def update(self, high, low, close):
+        short_ema = self.short_ema.update(close)
+        long_ema = self.long_ema.update(close)
+        macd = short_ema - long_ema
+        signal_line = self.signal_line.update(macd)
+        self.indicators = {'Short_EMA': short_ema, 'Long_EMA': long_ema, 'MACD': macd, 'Signal_Line': signal_line}
+
+        signal = 0
+        if macd > signal_line and self.prev_macd <= self.prev_signal_line:
+            signal = 1
+        if macd < signal_line and self.prev_macd >= self.prev_signal_line:
+            signal = -1
+        self.prev_macd, self.prev_signal_line = macd, signal_line
+        return signal, self.position.update(signal)
+
+
+class RSIBollingerStream(StreamingState):
+    def __init__(self, rsi_window=14, bollinger_window=20, num_std_dev=2):
+        self.num_std_dev = num_std_dev
+        self.sma = RollingMean(bollinger_window)
+        self.std = RollingStd(bollinger_window)
+        self.avg_gain = RollingMean(rsi_window)
+        self.avg_loss = RollingMean(rsi_window)
+        self.prev_close = NAN
+        self.prev_buy = False
+        self.prev_sell = False
+        self.position = Position()
+        self.indicators = {}
+
+    def update(self, high, low, close):
+        sma = self.sma.update(close)
+        std = self.std.update(close)
+        upper = sma + self.num_std_dev * std
+        lower = sma - self.num_std_dev * std
+
+        delta = close - self.prev_close
+        self.prev_close = close
+        avg_gain = self.avg_gain.update(max(delta, 0.0) if delta == delta else NAN)
+        avg_loss = self.avg_loss.update(-min(delta, 0.0) if delta == delta else NAN)
+        rsi = _rsi(avg_gain, avg_loss)
+        self.indicators = {'SMA': sma, 'STDDEV': std, 'Upper_Band': upper, 'Lower_Band': lower, 'RSI': rsi}
+
+        buy = rsi < 30 and close <= lower
+        sell = rsi > 70 and close >= upper
+
+        signal = 0
+        if buy and not self.prev_buy:
+            signal = 1
+        if sell and not self.prev_sell:
+            signal = -1
+        self.prev_buy, self.prev_sell = buy, sell
+        return signal, self.position.update(signal)
+
+
+def _rsi(avg_gain, avg_loss):
+    # Same float semantics as 100 - (100 / (1 + avg_gain / avg_loss)) on Series
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = np.float64(avg_gain) / np.float64(avg_loss)
+    return float(100 - (100 / (1 + rs)))
+
+
+class ATRBreakoutStream(StreamingState):
+    def __init__(self, scale_factor=0.5, atr_window=14, breakout_window=20):
+        self.scale_factor = scale_factor
+        self.atr = RollingMean(atr_window)
+        self.high = RollingExtreme(breakout_window, 'max')
+        self.low = RollingExtreme(breakout_window, 'min')
+        self.prev_close = NAN
+        # Breakout levels one and two bars back
+        self.upper_1 = self.upper_2 = NAN
+        self.lower_1 = self.lower_2 = NAN
+        self.position = Position()
+        self.indicators = {}
+
+    def update(self, high, low, close):
+        high_low = high - low
+        high_close_prev = abs(high - self.prev_close)
+        low_close_prev = abs(low - self.prev_close)
+        true_range = high_low
+        if self.prev_close == self.prev_close:
+            true_range = max(high_low, high_close_prev, low_close_prev)
+
+        atr = self.atr.update(true_range)
+        rolling_high = self.high.update(close)
+        rolling_low = self.low.update(close)
+        upper = rolling_high + self.scale_factor * atr
+        lower = rolling_low - self.scale_factor * atr
+        self.indicators = {
+            'High_Low': high_low, 'High_Close_Prev': high_close_prev, 'Low_Close_Prev': low_close_prev,
+            'TR': true_range, 'ATR': atr, '20D_High': rolling_high, '20D_Low': rolling_low,
+            'Upper_Breakout': upper, 'Lower_Breakout': lower,
+        }
+
+        signal = 0
+        if close > self.upper_1 and self.prev_close <= self.upper_2:
+            signal = 1
+        if close < self.lower_1 and self.prev_close >= self.lower_2:
+            signal = -1
+
+        self.upper_2, self.upper_1 = self.upper_1, upper
+        self.lower_2, self.lower_1 = self.lower_1, lower
+        self.prev_close = close
+        return signal, self.position.update(signal)
+
+
+# Strategy name (as in strategies.STRATEGIES) -> stream class, same keyword arguments as generate_signals
+STREAMS = {
+    'SMA': SMACrossoverStream,
+    'EWMA': EWMACrossoverStream,
+    'MACD': MACDStream,
+    'RSI': RSIBollingerStream,
+    'ATR': ATRBreakoutStream,
+}
+
+
+def replay(df, stream):
+    """
+    Feed a price frame through a stream bar by bar.
+
+    Returns:
+        (ndarray, ndarray): Signal and Position arrays aligned with df.
+    """
+    n = len(df)
+    signals = np.zeros(n, dtype=np.int64)
+    positions = np.zeros(n, dtype=np.int64)
+    bars = zip(df['High'].to_numpy(), df['Low'].to_numpy(), df['Close'].to_numpy())
+    for i, (high, low, close) in enumerate(bars):
+        signals[i], positions[i] = stream.update(float(high), float(low), float(close))
+    return signals, positions
@@ -0,0 +1,79 @@
+"""
+On-disk price cache (utils/cache.py): incremental gap filling, offline mode and coverage.
+"""
+import os
+
+import pandas as pd
+
+from utils.cache import cached_load, read_cache, write_cache
+
+
+def _prices(start, end):
+    dates = pd.bdate_range(start, end, inclusive='left')
+    close = pd.Series(range(len(dates)), dtype='float64') + 100
+    return pd.DataFrame({'Date': dates, 'High': close + 1, 'Low': close - 1, 'Close': close})
+
+
+class RecordingFetch:
+    # fetch(ticker, start, end) over one fixed history, remembering every requested range
+    def __init__(self):
+        self.history = _prices('2019-01-01', '2021-01-01')
+        self.calls = []
+
+    def __call__(self, ticker, start, end):
+        self.calls.append((pd.Timestamp(start), pd.Timestamp(end)))
+        dates = self.history['Date']
+        return self.history[(dates >= start) & (dates < end)].reset_index(drop=True)
+
+
+def test_only_missing_segments_are_fetched(tmp_path):
+    fetch = RecordingFetch()
+    first = cached_load('AAA', '2020-03-01', '2020-06-01', fetch, cache_dir=tmp_path)
+    assert fetch.calls == [(pd.Timestamp('2020-03-01'), pd.Timestamp('2020-06-01'))]
+
+    # A wider range fetches only the two gaps around what is cached
+    wider = cached_load('AAA', '2020-01-01', '2020-09-01', fetch, cache_dir=tmp_path)
+    assert fetch.calls[1:] == [(pd.Timestamp('2020-01-01'), pd.Timestamp('2020-03-01')),
+                               (pd.Timestamp('2020-06-01'), pd.Timestamp('2020-09-01'))]
+
+    # Anything inside the coverage is served from disk
+    inside = cached_load('AAA', '2020-02-01', '2020-08-01', fetch, cache_dir=tmp_path)
+    assert len(fetch.calls) == 3
+
+    dates = fetch.history['Date']
+    expected = fetch.history[(dates >= '2020-01-01') & (dates < '2020-09-01')].reset_index(drop=True)
+    pd.testing.assert_frame_equal(wider, expected)
+    assert inside['Date'].is_monotonic_increasing and inside['Date'].is_unique
+    assert first['Date'].min() >= pd.Timestamp('2020-03-01') and first['Date'].max() < pd.Timestamp('2020-06-01')
+
+
+def test_offline_never_fetches(tmp_path):
+    fetch = RecordingFetch()
+    assert cached_load('AAA', '2020-01-01', '2020-02-01', fetch, cache_dir=tmp_path, offline=True).empty
+    cached_load('AAA', '2020-01-01', '2020-02-01', fetch, cache_dir=tmp_path)
+    served = cached_load('AAA', '2019-01-01', '2020-12-01', fetch, cache_dir=tmp_path, offline=True)
+    assert len(fetch.calls) == 1
+    assert served['Date'].min() >= pd.Timestamp('2020-01-01') and served['Date'].max() < pd.Timestamp('2020-02-01')
+
+
+def test_coverage_stops_at_today(tmp_path):
+    today = pd.Timestamp.today().normalize()
+    fetch = RecordingFetch()
+    cached_load('AAA', '2020-01-01', today + pd.Timedelta(days=30), fetch, cache_dir=tmp_path)
+    _, coverage = read_cache('AAA', tmp_path)
+    assert coverage == (pd.Timestamp('2020-01-01'), today)
+
+    # Today's bar may still change, so asking again refetches from today on
+    cached_load('AAA', '2020-01-01', today + pd.Timedelta(days=30), fetch, cache_dir=tmp_path)
+    assert fetch.calls[-1][0] == today
+
+
+def test_write_cache_leaves_no_temp_files(tmp_path):
+    prices = _prices('2020-01-01', '2020-02-01')
+    coverage = (pd.Timestamp('2020-01-01'), pd.Timestamp('2020-02-01'))
+    write_cache('AAA', prices, coverage, tmp_path)
+    write_cache('AAA', prices, coverage, tmp_path)
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+    cached, read_coverage = read_cache('AAA', tmp_path)
+    pd.testing.assert_frame_equal(cached, prices)
+    assert read_coverage == coverage
@@ -0,0 +1,71 @@
+"""
+Out-of-core backtests (utils/chunked.py) against one in-memory run_strategy, at awkward chunk boundaries.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import synthetic_prices
+from utils.backtest import run_strategy
+from utils.chunked import chunked_backtest
+from utils.store import ColumnStore
+
+PRICES = synthetic_prices(700, seed=3)[['Date', 'High', 'Low', 'Close']]
+
+
+@pytest.fixture(scope='module')
+def series(tmp_path_factory):
+    store = ColumnStore(str(tmp_path_factory.mktemp('store')))
+    for lo, hi in [(0, 250), (250, 251), (251, 700)]:
+        store.append('SYN', PRICES.iloc[lo:hi])
+    return store.open('SYN')
+
+
+def _assert_matches(series, strategy, params, start, chunk_rows, history_start=None, end=None):
+    prices = PRICES
+    if history_start is not None:
+        prices = prices[prices['Date'] >= history_start]
+    if end is not None:
+        prices = prices[prices['Date'] <= end]
+    expected, expected_metrics = run_strategy(prices.reset_index(drop=True), strategy, params, start)
+
+    chunks = []
+    metrics = chunked_backtest(series, strategy, params, start, end, history_start, chunk_rows=chunk_rows,
+                               on_chunk=chunks.append)
+    chunked = pd.concat(chunks)
+    # Chunks are contiguous store rows, each bar reported once
+    assert (np.diff(chunked.index) == 1).all()
+    assert list(chunked['Date']) == list(expected['Date'])
+    for column in expected.columns.drop('Date'):
+        np.testing.assert_array_equal(chunked[column].to_numpy(dtype=np.float64),
+                                      expected[column].to_numpy(dtype=np.float64), err_msg=column)
+    np.testing.assert_array_equal(metrics['Value'].to_numpy(), expected_metrics['Value'].to_numpy())
+
+
+@pytest.mark.parametrize('strategy, params', [
+    ('SMA', {'short_window': 5, 'long_window': 20}),
+    ('EWMA', {'short_window': 3, 'long_window': 15}),
+    ('MACD', {'short_window': 5, 'long_window': 13, 'signal_window': 4}),
+    ('RSI', {'rsi_window': 5}),
+    ('ATR', {'scale_factor': 0.1, 'atr_window': 5, 'breakout_window': 10}),
+])
+@pytest.mark.parametrize('chunk_rows', [7, 64, 1000])
+def test_matches_in_memory_run(series, strategy, params, chunk_rows):
+    _assert_matches(series, strategy, params, PRICES['Date'].iloc[100], chunk_rows)
+
+
+def test_single_bar_chunks(series):
+    dates = PRICES['Date']
+    _assert_matches(series, 'MACD', {'short_window': 5, 'long_window': 13, 'signal_window': 4}, dates.iloc[300], 1,
+                    history_start=dates.iloc[200], end=dates.iloc[380])
+
+
+def test_start_inside_a_chunk_and_bounded_history(series):
+    dates = PRICES['Date']
+    _assert_matches(series, 'SMA', {'short_window': 5, 'long_window': 20}, dates.iloc[333], 50,
+                    history_start=dates.iloc[120], end=dates.iloc[640])
+
+
+def test_no_bars_in_range(series):
+    with pytest.raises(ValueError):
+        chunked_backtest(series, 'SMA', {}, '2100-01-01', chunk_rows=50)
@@ -0,0 +1,85 @@
+"""
+Exit status of the headless batch runner (cli.py): 0 on success, 1 on a bad config,
+2 if some ticker could not be loaded or some run failed.
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import synthetic_prices
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    directory = tmp_path / 'data'
+    directory.mkdir()
+    for seed, ticker in enumerate(['AAA', 'BBB']):
+        synthetic_prices(600, seed=seed, start='2018-01-01')[['Date', 'High', 'Low', 'Close']].to_csv(
+            directory / f'{ticker}.csv', index=False)
+    # Too few bars for any strategy: loads fine, every run fails
+    synthetic_prices(8, seed=9, start='2019-06-03')[['Date', 'High', 'Low', 'Close']].to_csv(
+        directory / 'SHORT.csv', index=False)
+    return directory
+
+
+def _run(tmp_path, data_dir, config):
+    path = tmp_path / 'config.json'
+    path.write_text(config if isinstance(config, str) else json.dumps(config))
+    env = dict(os.environ, BACKTESTER_DATA_DIR=str(data_dir))
+    return subprocess.run([sys.executable, os.path.join(ROOT, 'cli.py'), str(path),
+                           '--output-dir', str(tmp_path / 'out'), '--quiet'],
+                          cwd=ROOT, env=env, capture_output=True, text=True)
+
+
+def _config(tickers, **overrides):
+    return {'tickers': tickers, 'start_date': '2018-06-01', 'end_date': '2020-01-01',
+            'strategies': {'SMA': {'short_window': 10, 'long_window': 30}}, **overrides}
+
+
+def test_success(tmp_path, data_dir):
+    result = _run(tmp_path, data_dir, _config(['AAA', 'BBB']))
+    assert result.returncode == 0, result.stderr
+    assert result.stderr == ''
+    summary = pd.read_csv(tmp_path / 'out' / 'metrics.csv')
+    assert list(summary['Ticker']) == ['AAA', 'BBB']
+    assert (tmp_path / 'out' / 'equity' / 'AAA_SMA.csv').exists()
+
+
+@pytest.mark.parametrize('config', [
+    '{"tickers": ["AAA"',
+    {'tickers': ['AAA'], 'start_date': '2018-06-01'},
+    _config(['AAA'], strategies=['NOPE']),
+    _config(['AAA'], portfolio={'leverage': 2}),
+])
+def test_bad_config(tmp_path, data_dir, config):
+    result = _run(tmp_path, data_dir, config)
+    assert result.returncode == 1
+    assert result.stderr.startswith('error:')
+
+
+def test_missing_config_file(tmp_path, data_dir):
+    env = dict(os.environ, BACKTESTER_DATA_DIR=str(data_dir))
+    result = subprocess.run([sys.executable, os.path.join(ROOT, 'cli.py'), str(tmp_path / 'missing.json')],
+                            cwd=ROOT, env=env, capture_output=True, text=True)
+    assert result.returncode == 1
+
+
+def test_missing_ticker(tmp_path, data_dir):
+    result = _run(tmp_path, data_dir, _config(['AAA', 'ZZZ']))
+    assert result.returncode == 2
+    assert 'failed: ZZZ' in result.stderr
+    # The rest of the batch is still written
+    assert list(pd.read_csv(tmp_path / 'out' / 'metrics.csv')['Ticker']) == ['AAA']
+
+
+def test_failed_run(tmp_path, data_dir):
+    result = _run(tmp_path, data_dir, _config(['SHORT', 'AAA']))
+    assert result.returncode == 2
+    assert 'SHORT SMA' in result.stderr
+    assert list(pd.read_csv(tmp_path / 'out' / 'metrics.csv')['Ticker']) == ['AAA']
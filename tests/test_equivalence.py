@@ -0,0 +1,15 @@
+"""
+The fast-path equivalence checks (benchmarks/equivalence.py), one test per check.
+
+    python -m pytest tests
+"""
+import pytest
+
+from benchmarks.equivalence import CHECKS, DEFAULT_TOLERANCE, run_checks
+
+
+@pytest.mark.parametrize('check', list(CHECKS))
+def test_matches_reference(check):
+    result = run_checks(checks=[check]).iloc[0]
+    assert result['Mismatches'] == 0
+    assert result['Max Diff'] <= DEFAULT_TOLERANCE
@@ -0,0 +1,111 @@
+"""
+Stage tracing (utils/profiling.py): each context owns its trace, carry() hands it to pool workers.
+"""
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from utils import profiling
+from utils.profiling import carry, profiled, stage
+
+
+def _in_new_context(func):
+    # Run func in a fresh copy of the current context, so enable() inside it does not leak into the test
+    return contextvars.copy_context().run(func)
+
+
+def test_enable_is_scoped_to_the_context():
+    def run():
+        trace = profiling.enable()
+        with stage('inner'):
+            pass
+        return trace
+
+    trace = _in_new_context(run)
+    assert [record['Stage'] for record in trace.records] == ['inner']
+    assert profiling.current_trace() is None
+    with stage('outside'):
+        pass
+    assert len(trace.records) == 1
+
+
+def test_threads_do_not_share_traces():
+    started, checked = threading.Event(), threading.Event()
+    seen = {}
+
+    def profiled_thread():
+        seen['trace'] = profiling.enable()
+        started.set()
+        checked.wait(5)
+
+    def other_thread():
+        started.wait(5)
+        seen['other'] = profiling.is_enabled()
+        checked.set()
+
+    threads = [threading.Thread(target=profiled_thread), threading.Thread(target=other_thread)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert seen['trace'] is not None
+    assert seen['other'] is False
+
+
+def test_carry_records_pool_stages_in_the_callers_trace():
+    def work(i):
+        with stage('work', rows=i):
+            pass
+        return profiling.current_trace()
+
+    def run():
+        trace = profiling.enable()
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            carried = list(pool.map(carry(work), range(4)))
+            bare = list(pool.map(work, range(4)))
+        return trace, carried, bare
+
+    trace, carried, bare = _in_new_context(run)
+    assert all(worker_trace is trace for worker_trace in carried)
+    assert all(worker_trace is None for worker_trace in bare)
+    assert sorted(record['Rows'] for record in trace.records) == [0, 1, 2, 3]
+
+
+def test_disable_clears_the_trace():
+    def run():
+        trace = profiling.enable()
+        profiling.disable()
+        with stage('after'):
+            pass
+        return trace, profiling.is_enabled()
+
+    trace, enabled = _in_new_context(run)
+    assert not enabled
+    assert trace.records == []
+
+
+def test_profiled_records_rows_depth_and_footprint():
+    @profiled('outer')
+    def outer(df):
+        return inner(df)
+
+    @profiled()
+    def inner(df):
+        return df.copy()
+
+    def run():
+        trace = profiling.enable()
+        result = outer(pd.DataFrame({'x': range(10)}))
+        return trace, result
+
+    trace, result = _in_new_context(run)
+    assert len(result) == 10
+    frame = trace.to_frame()
+    assert list(frame['Stage']) == ['inner', 'outer']
+    assert list(frame['Depth']) == [1, 0]
+    assert list(frame['Rows']) == [10, 10]
+    assert (frame['Frame Memory (MB)'] > 0).all()
+    # Off again outside the context: the decorator just calls through
+    assert outer(pd.DataFrame({'x': range(3)})).shape == (3, 1)
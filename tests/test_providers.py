@@ -0,0 +1,87 @@
+"""
+Price providers (utils/providers.py) and the loaders built on them in utils/data.py.
+"""
+import threading
+
+import pandas as pd
+import pytest
+
+from utils.data import load_many, load_price_data
+from utils.providers import LocalFileProvider, YFinanceProvider, provider_from_env
+
+
+def _write_csv(directory, name, start='2020-01-01', end='2020-03-01'):
+    dates = pd.bdate_range(start, end, inclusive='left')
+    close = pd.Series(range(len(dates)), dtype='float64') + 50
+    # Unsorted rows and lower-case headers, as a hand-made dump might have them
+    df = pd.DataFrame({'date': dates, 'high': close + 1, 'low': close - 1, 'close': close})
+    df.iloc[::-1].to_csv(directory / f'{name}.csv', index=False)
+    return df
+
+
+def test_local_file_provider_normalizes_and_filters(tmp_path):
+    _write_csv(tmp_path, 'AAA')
+    df = LocalFileProvider(str(tmp_path)).fetch('AAA', '2020-01-15', '2020-02-03')
+    assert list(df.columns) == ['Date', 'High', 'Low', 'Close']
+    assert df['Date'].is_monotonic_increasing
+    assert df['Date'].iloc[0] == pd.Timestamp('2020-01-15')
+    # The end date is exclusive
+    assert df['Date'].iloc[-1] == pd.Timestamp('2020-01-31')
+    assert isinstance(df.index, pd.RangeIndex)
+
+
+def test_local_file_provider_matches_ticker_case(tmp_path):
+    _write_csv(tmp_path, 'AAA')
+    assert not LocalFileProvider(str(tmp_path)).fetch('aaa', '2020-01-01', '2020-03-01').empty
+
+
+def test_local_file_provider_missing_ticker(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        LocalFileProvider(str(tmp_path)).fetch('ZZZ', '2020-01-01', '2020-03-01')
+
+
+def test_provider_from_env(tmp_path, monkeypatch):
+    monkeypatch.setenv('BACKTESTER_DATA_DIR', str(tmp_path))
+    provider = provider_from_env()
+    assert isinstance(provider, LocalFileProvider) and provider.directory == str(tmp_path)
+
+    monkeypatch.delenv('BACKTESTER_DATA_DIR')
+    assert isinstance(provider_from_env(), YFinanceProvider)
+
+
+def test_local_files_skip_the_cache(tmp_path):
+    _write_csv(tmp_path, 'AAA')
+    cache_dir = tmp_path / 'cache'
+    load_price_data('AAA', '2020-01-01', '2020-03-01', provider=LocalFileProvider(str(tmp_path)),
+                    cache_dir=str(cache_dir))
+    assert not cache_dir.exists() or not any(cache_dir.iterdir())
+
+
+class CountingProvider(LocalFileProvider):
+    cacheable = False
+
+    def __init__(self, directory):
+        super().__init__(directory)
+        self.requested = []
+        self._lock = threading.Lock()
+
+    def fetch(self, ticker, start_date, end_date):
+        with self._lock:
+            self.requested.append(ticker)
+        return super().fetch(ticker, start_date, end_date)
+
+
+def test_load_many_dedupes_and_keeps_order(tmp_path):
+    for name in ('AAA', 'BBB', 'CCC'):
+        _write_csv(tmp_path, name)
+    provider = CountingProvider(str(tmp_path))
+    frames = load_many(['CCC', 'AAA', 'CCC', 'BBB', 'AAA'], '2020-01-01', '2020-03-01',
+                       max_workers=2, provider=provider)
+    assert list(frames) == ['CCC', 'AAA', 'BBB']
+    assert sorted(provider.requested) == ['AAA', 'BBB', 'CCC']
+    for ticker, df in frames.items():
+        pd.testing.assert_frame_equal(df, provider.fetch(ticker, '2020-01-01', '2020-03-01'))
+
+
+def test_load_many_empty():
+    assert load_many([], '2020-01-01', '2020-03-01') == {}
@@ -0,0 +1,105 @@
+"""
+Persistent result store (utils/results.py): run keys, what gets stored, ranked queries and pruning.
+"""
+import os
+
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import synthetic_prices
+from strategies.registry import signal_defaults
+from utils import results
+from utils.data import frame_loader
+from utils.results import ResultStore, is_closed, price_fingerprint, run_key
+
+START, END = '2016-01-01', '2018-01-01'
+PRICES = synthetic_prices(1000, seed=4, start='2014-01-01')[['Date', 'High', 'Low', 'Close']]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ResultStore(str(tmp_path / 'results'))
+
+
+@pytest.fixture
+def runs(monkeypatch):
+    # Count the backtests actually computed, as opposed to served from the store
+    calls = []
+    run_backtest = results.run_backtest
+
+    def counting(*args, **kwargs):
+        calls.append(args[:2])
+        return run_backtest(*args, **kwargs)
+    monkeypatch.setattr(results, 'run_backtest', counting)
+    return calls
+
+
+def test_stored_run_is_served_back(store, runs):
+    df, metrics = store.get_or_run('AAA', 'SMA', {}, START, END, load=frame_loader(PRICES))
+    again, again_metrics = store.get_or_run('aaa', 'SMA', {}, START, END, load=frame_loader(PRICES))
+    assert len(runs) == 1 and len(store) == 1
+    pd.testing.assert_frame_equal(again, df)
+    pd.testing.assert_frame_equal(again_metrics, metrics)
+
+
+def test_default_params_share_a_key():
+    fingerprint = price_fingerprint(PRICES, START)
+    assert (run_key('AAA', 'SMA', {}, START, END, fingerprint, 'v1')
+            == run_key('AAA', 'SMA', signal_defaults('SMA'), START, END, fingerprint, 'v1'))
+    assert (run_key('AAA', 'SMA', {}, START, END, fingerprint, 'v1')
+            != run_key('AAA', 'SMA', {}, START, END, fingerprint, 'v2'))
+
+
+def test_changed_prices_are_rerun(store, runs):
+    store.get_or_run('AAA', 'SMA', {}, START, END, load=frame_loader(PRICES))
+    revised = PRICES.copy()
+    revised.loc[revised['Date'] > pd.Timestamp('2017-06-01'), 'Close'] *= 1.01
+    assert price_fingerprint(revised, START) != price_fingerprint(PRICES, START)
+    store.get_or_run('AAA', 'SMA', {}, START, END, load=frame_loader(revised))
+    assert len(runs) == 2 and len(store) == 2
+
+
+def test_warmup_bars_do_not_change_the_fingerprint():
+    revised = PRICES.copy()
+    revised.loc[revised['Date'] < pd.Timestamp(START), 'Close'] *= 1.01
+    assert price_fingerprint(revised, START) == price_fingerprint(PRICES, START)
+
+
+def test_open_ranges_are_not_stored(store, runs):
+    end = pd.Timestamp.today().normalize() + pd.Timedelta(days=5)
+    assert not is_closed(end) and is_closed(END)
+    prices = synthetic_prices(300, seed=5, start=end - pd.Timedelta(days=420))[['Date', 'High', 'Low', 'Close']]
+    start = prices['Date'].iloc[150]
+    store.get_or_run('AAA', 'SMA', {}, start, end, load=frame_loader(prices))
+    store.get_or_run('AAA', 'SMA', {}, start, end, load=frame_loader(prices))
+    assert len(runs) == 2 and len(store) == 0
+
+
+def test_query_ranks_by_metric(store):
+    fingerprint = price_fingerprint(PRICES, START)
+    for short_window, long_window in [(5, 20), (10, 40), (20, 80), (30, 100)]:
+        params = {'short_window': short_window, 'long_window': long_window}
+        df, metrics = results.run_backtest('AAA', 'SMA', params, START, END, load=frame_loader(PRICES))
+        store.put('AAA', 'SMA', params, START, END, fingerprint, df, metrics)
+
+    top = store.query('SMA', ['aaa'], order_by='Sharpe', limit=3)
+    assert len(top) == 3
+    assert top['Strategy Sharpe Ratio'].is_monotonic_decreasing
+    assert store.query('SMA', order_by='Max Drawdown')['Max Drawdown (%)'].is_monotonic_increasing
+    assert store.query('RSI').empty and store.query('SMA', ['BBB']).empty
+    with pytest.raises(ValueError):
+        store.query(order_by='Nope')
+
+
+def test_prune_removes_other_versions_and_their_frames(store):
+    fingerprint = price_fingerprint(PRICES, START)
+    df, metrics = results.run_backtest('AAA', 'SMA', {}, START, END, load=frame_loader(PRICES))
+    old = store.put('AAA', 'SMA', {}, START, END, fingerprint, df, metrics, version='old')
+    current = store.put('AAA', 'SMA', {}, START, END, fingerprint, df, metrics)
+    assert old != current and old in store
+
+    assert store.prune() == 1
+    assert old not in store and current in store
+    frames = os.listdir(os.path.join(store.root, 'frames'))
+    assert [name.split('.')[0] for name in frames] == [current]
+    assert store.get(current) is not None
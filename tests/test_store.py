@@ -0,0 +1,98 @@
+"""
+Memory-mapped column store (utils/store.py): appends across parts, the day index and locate().
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import synthetic_prices
+from utils.store import ColumnStore
+
+PRICE_COLUMNS = ['Date', 'High', 'Low', 'Close']
+
+
+def _intraday(days=6, bars_per_day=5):
+    # A few bars per trading day, so appends can split a day between two parts
+    dates = [day + pd.Timedelta(hours=10 + hour) for day in pd.bdate_range('2021-03-01', periods=days)
+             for hour in range(bars_per_day)]
+    close = np.arange(len(dates), dtype='float64') + 10
+    return pd.DataFrame({'Date': dates, 'High': close + 0.5, 'Low': close - 0.5, 'Close': close})
+
+
+def test_appended_parts_read_back_as_one_series(tmp_path):
+    prices = synthetic_prices(1000)[PRICE_COLUMNS]
+    store = ColumnStore(str(tmp_path))
+    for lo, hi in [(0, 1), (1, 400), (400, 400), (400, 999), (999, 1000)]:
+        store.append('syn', prices.iloc[lo:hi])
+
+    series = store.open('SYN')
+    assert len(series) == 1000 and store.tickers() == ['SYN']
+    assert series.first_date == prices['Date'].iloc[0] and series.last_date == prices['Date'].iloc[-1]
+    pd.testing.assert_frame_equal(series.frame(), prices, check_freq=False)
+    part = series.frame(395, 405)
+    assert list(part.index) == list(range(395, 405))
+    pd.testing.assert_frame_equal(part.reset_index(drop=True), prices.iloc[395:405].reset_index(drop=True))
+    chunks = list(series.iter_frames(chunk_rows=300))
+    assert [len(chunk) for chunk in chunks] == [300, 300, 300, 100]
+
+
+def test_locate_across_a_day_split_between_appends(tmp_path):
+    prices = _intraday()
+    store = ColumnStore(str(tmp_path))
+    # The second part starts in the middle of the third day
+    store.append('AAA', prices.iloc[:12])
+    store.append('AAA', prices.iloc[12:])
+    series = store.open('AAA')
+    dates = prices['Date']
+
+    for start, end in [('2021-03-03', '2021-03-03 23:59'), ('2021-03-03 12:00', '2021-03-04 11:00'),
+                       ('2021-03-03 12:30', None), (None, '2021-03-01 10:00'), ('2021-03-06', '2021-03-07')]:
+        mask = pd.Series(True, index=dates.index)
+        if start is not None:
+            mask &= dates >= pd.Timestamp(start)
+        if end is not None:
+            mask &= dates <= pd.Timestamp(end)
+        rows = np.flatnonzero(mask)
+        expected = (rows[0], rows[-1] + 1) if len(rows) else None
+        lo, hi = series.locate(start, end)
+        if expected is None:
+            assert lo == hi
+        else:
+            assert (lo, hi) == expected
+    # Past the last bar
+    assert series.locate('2030-01-01') == (len(prices), len(prices))
+
+
+def test_append_rejects_out_of_order_bars(tmp_path):
+    prices = _intraday()
+    store = ColumnStore(str(tmp_path))
+    store.append('AAA', prices.iloc[:10])
+    with pytest.raises(ValueError):
+        store.append('AAA', prices.iloc[9:15])
+    with pytest.raises(ValueError):
+        store.append('BBB', prices.iloc[::-1])
+    # A rejected append leaves the stored rows untouched
+    assert len(store.open('AAA')) == 10
+    assert store.append('AAA', prices.iloc[10:]) == len(prices)
+
+
+def test_ingest_skips_stored_windows(tmp_path):
+    prices = synthetic_prices(300, start='2020-01-01')[PRICE_COLUMNS]
+    requested = []
+
+    def loader(ticker, start, end):
+        requested.append((start, end))
+        return prices[(prices['Date'] >= start) & (prices['Date'] < end)]
+
+    store = ColumnStore(str(tmp_path))
+    store.ingest('AAA', '2020-01-01', '2020-06-01', loader=loader, chunk_days=60)
+    first = len(requested)
+    rows = store.ingest('AAA', '2020-01-01', '2021-03-01', loader=loader, chunk_days=60)
+    assert requested[first][0] > pd.Timestamp('2020-05-29')
+    assert rows == len(prices[prices['Date'] < '2021-03-01'])
+    pd.testing.assert_frame_equal(store.open('AAA').frame(), prices.iloc[:rows], check_freq=False)
+
+
+def test_open_unknown_ticker(tmp_path):
+    with pytest.raises(KeyError):
+        ColumnStore(str(tmp_path)).open('ZZZ')
@@ -0,0 +1,79 @@
+import pandas as pd
+
+from strategies import STRATEGIES, warmup_bars
+from utils.compiled import use_backend
+from utils.data import load_with_warmup
+from utils.indicators import IndicatorCache
+from utils.metrics import calculate_metrics
+from utils.profiling import profiled
+
+@profiled()
+def trim_to_start(df, start_date):
+    # Drop the warmup rows loaded ahead of start_date
+    return df.loc[df['Date'] >= pd.Timestamp(start_date)].copy()
+
+def run_strategy(df, strategy, params=None, start_date=None, indicators=None, backend=None):
+    """
+    Run one strategy on an already-loaded price frame.
+
+    Args:
+        df (DataFrame): 'Date', 'High', 'Low', 'Close', including any warmup history.
+        strategy (str): key of strategies.STRATEGIES.
+        params (dict): keyword arguments for the strategy's generate_signals.
+        start_date (datetime): first date kept for metrics (default=keep everything).
+        indicators (IndicatorCache): shared indicators of this price series (default=new cache).
+        backend (str): kernel backend for this run, 'numpy' or 'numba' (default=utils.compiled's current one).
+
+    Returns:
+        (DataFrame, DataFrame): backtest frame and metrics table from calculate_metrics.
+    """
+    with use_backend(backend):
+        df, warmup = STRATEGIES[strategy](df, **(params or {}), indicators=indicators)
+    if start_date is not None:
+        df = trim_to_start(df, start_date)
+    return calculate_metrics(df)
+
+@profiled()
+def run_backtest(ticker, strategy, params, start_date, end_date, load=None, backend=None, **kwargs):
+    """
+    Load one ticker with exactly the warmup its strategy needs and backtest it.
+
+    The shared path behind the app and batch tools: prices come from
+    utils.data.load_with_warmup with strategies.warmup_bars(strategy, params)
+    trading bars ahead of start_date, then run_strategy.
+
+    Args:
+        params (dict): generate_signals keyword arguments (None = defaults).
+        start_date, end_date (datetime): traded range [start_date, end_date).
+        load (callable): (ticker, start, end) -> price DataFrame, e.g. a cached loader
+            (default=utils.data.load_price_data with **kwargs).
+        backend (str): kernel backend, as in run_strategy.
+
+    Returns:
+        (DataFrame, DataFrame): backtest frame and metrics table. The frame's
+        attrs['incomplete_bars'] counts traded bars dropped for undefined
+        indicators, non-zero only when the ticker's history is too short.
+    """
+    df = load_with_warmup(ticker, start_date, end_date, warmup_bars(strategy, params), load=load, **kwargs)
+    traded_bars = int((df['Date'] >= pd.Timestamp(start_date)).sum())
+    df, metrics = run_strategy(df, strategy, params, start_date, backend=backend)
+    # calculate_metrics always drops the first bar (no return yet); anything beyond that lacked history
+    df.attrs['incomplete_bars'] = max(0, traded_bars - 1 - len(df))
+    return df, metrics
+
+def run_all_strategies(df, start_date=None, params=None):
+    """
+    Run every strategy on one price load, sharing indicators through one IndicatorCache.
+
+    Args:
+        df (DataFrame): 'Date', 'High', 'Low', 'Close', including warmup history.
+        params (dict): strategy name -> generate_signals kwargs (default=strategy defaults).
+
+    Returns:
+        dict: strategy name -> (backtest frame, metrics table).
+    """
+    params = params or {}
+    prices = df[['Date', 'High', 'Low', 'Close']]
+    indicators = IndicatorCache(prices)
+    return {name: run_strategy(prices.copy(), name, params.get(name), start_date, indicators)
+            for name in STRATEGIES}
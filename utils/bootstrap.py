@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+from utils.metrics import METRIC_NAMES, metrics_kernel
+
+# Rough bytes per resampled bar: indices, two resampled series and the kernel's temporaries
+BYTES_PER_BAR = 64
+
+
+def stationary_indices(rng, n_resamples, n, block_size):
+    """
+    Politis-Romano stationary bootstrap: blocks start at random bars and have
+    geometric lengths with mean block_size, wrapping around the series.
+    """
+    new_block = rng.random((n_resamples, n)) < 1.0 / block_size
+    new_block[:, 0] = True
+    block_start = np.where(new_block, np.arange(n), 0)
+    np.maximum.accumulate(block_start, axis=1, out=block_start)
+
+    starts = rng.integers(0, n, size=(n_resamples, n))
+    offset = np.arange(n) - block_start
+    return (np.take_along_axis(starts, block_start, axis=1) + offset) % n
+
+
+def block_indices(rng, n_resamples, n, block_size):
+    """
+    Circular moving-block bootstrap: fixed-length blocks starting at random bars.
+    """
+    n_blocks = -(-n // block_size)
+    starts = rng.integers(0, n, size=(n_resamples, n_blocks, 1))
+    return ((starts + np.arange(block_size)) % n).reshape(n_resamples, -1)[:, :n]
+
+
+SAMPLERS = {
+    'stationary': stationary_indices,
+    'block': block_indices,
+}
+
+
+def bootstrap_metrics(df, n_resamples=2000, block_size=20, method='stationary', confidence=0.95,
+                      seed=0, max_memory_mb=256):
+    """
+    Confidence intervals for every metric in the calculate_metrics table.
+
+    Strategy and market returns are resampled with the same block indices (so
+    their pairing is kept) and each chunk of resamples is scored in one batched
+    metrics_kernel call.
+
+    Args:
+        df (DataFrame): frame returned by calculate_metrics.
+        n_resamples (int): number of bootstrap resamples (default=2000).
+        block_size (int): mean (stationary) or fixed (block) block length in bars (default=20).
+        method (str): 'stationary' or 'block'.
+        confidence (float): two-sided interval coverage (default=0.95).
+        seed (int): random seed.
+        max_memory_mb (int): rough cap on memory used per chunk of resamples.
+
+    Returns:
+        DataFrame: 'Metric', 'Value' (full sample), 'Lower', 'Upper', 'Std' per metric.
+    """
+    strategy_returns = df['Strategy_Returns'].to_numpy(dtype=np.float64)
+    market_returns = df['Market_Returns'].to_numpy(dtype=np.float64)
+    n = len(strategy_returns)
+
+    rng = np.random.default_rng(seed)
+    sampler = SAMPLERS[method]
+    chunk_size = max(1, int(max_memory_mb * 2 ** 20 // (BYTES_PER_BAR * max(n, 1))))
+
+    samples = np.empty((n_resamples, len(METRIC_NAMES)))
+    for lo in range(0, n_resamples, chunk_size):
+        hi = min(lo + chunk_size, n_resamples)
+        idx = sampler(rng, hi - lo, n, block_size)
+        samples[lo:hi] = metrics_kernel(strategy_returns[idx], market_returns[idx])
+
+    alpha = (1 - confidence) / 2
+    with np.errstate(invalid='ignore'):
+        # Profit factor is infinite on resamples without losses, keep those out of the spread
+        finite = np.where(np.isfinite(samples), samples, np.nan)
+        lower, upper = np.nanquantile(finite, [alpha, 1 - alpha], axis=0)
+        spread = np.nanstd(finite, axis=0)
+
+    return pd.DataFrame({
+        'Metric': METRIC_NAMES,
+        'Value': metrics_kernel(strategy_returns, market_returns),
+        'Lower': lower,
+        'Upper': upper,
+        'Std': spread,
+    })
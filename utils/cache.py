@@ -0,0 +1,147 @@
+import contextlib
+import json
+import os
+import tempfile
+
+import pandas as pd
+
+# Cached files live under ~/.cache/quant-backtester unless overridden
+CACHE_DIR = os.environ.get(
+    'BACKTESTER_CACHE_DIR',
+    os.path.join(os.path.expanduser('~'), '.cache', 'quant-backtester')
+)
+
+PRICE_COLUMNS = ['Date', 'High', 'Low', 'Close']
+
+
+def _parquet_available():
+    for engine in ('pyarrow', 'fastparquet'):
+        try:
+            __import__(engine)
+            return True
+        except ImportError:
+            continue
+    return False
+
+
+# Parquet when an engine is installed, pickle otherwise (both keep dtypes intact)
+CACHE_FORMAT = 'parquet' if _parquet_available() else 'pickle'
+
+
+def _cache_paths(ticker, cache_dir):
+    safe_ticker = ticker.upper().replace('/', '_').replace('^', '_')
+    extension = 'parquet' if CACHE_FORMAT == 'parquet' else 'pkl'
+    data_path = os.path.join(cache_dir, f'{safe_ticker}.{extension}')
+    meta_path = os.path.join(cache_dir, f'{safe_ticker}.json')
+    return data_path, meta_path
+
+
+def read_cache(ticker, cache_dir=None):
+    """
+    Read the cached price history for a ticker.
+
+    Returns:
+        (DataFrame, coverage): cached rows and the [start, end) range of dates
+        that has already been requested from the provider, or (None, None).
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    data_path, meta_path = _cache_paths(ticker, cache_dir)
+    if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+        return None, None
+
+    with open(meta_path) as f:
+        meta = json.load(f)
+
+    if CACHE_FORMAT == 'parquet':
+        df = pd.read_parquet(data_path)
+    else:
+        df = pd.read_pickle(data_path)
+
+    coverage = (pd.Timestamp(meta['start']), pd.Timestamp(meta['end']))
+    return df, coverage
+
+
+def _temp_path(path):
+    fd, tmp = tempfile.mkstemp(prefix=os.path.basename(path) + '.', suffix='.tmp', dir=os.path.dirname(path))
+    os.close(fd)
+    return tmp
+
+
+def write_cache(ticker, df, coverage, cache_dir=None):
+    cache_dir = cache_dir or CACHE_DIR
+    os.makedirs(cache_dir, exist_ok=True)
+    data_path, meta_path = _cache_paths(ticker, cache_dir)
+
+    # Write to temp files and swap in, so concurrent readers never see a partial file; the temp
+    # names are unique per writer, so concurrent writers of one ticker never share one
+    tmp_data, tmp_meta = _temp_path(data_path), _temp_path(meta_path)
+    try:
+        if CACHE_FORMAT == 'parquet':
+            df.to_parquet(tmp_data, index=False)
+        else:
+            df.to_pickle(tmp_data)
+        with open(tmp_meta, 'w') as f:
+            json.dump({'start': coverage[0].isoformat(), 'end': coverage[1].isoformat()}, f)
+
+        os.replace(tmp_data, data_path)
+        os.replace(tmp_meta, meta_path)
+    finally:
+        for path in (tmp_data, tmp_meta):
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+
+
+def _missing_segments(start, end, coverage):
+    if coverage is None:
+        return [(start, end)]
+
+    segments = []
+    if start < coverage[0]:
+        segments.append((start, coverage[0]))
+    if end > coverage[1]:
+        segments.append((coverage[1], end))
+    return segments
+
+
+def cached_load(ticker, start_date, end_date, fetch, cache_dir=None, offline=False):
+    """
+    Serve [start_date, end_date) for a ticker from the on-disk cache, calling
+    fetch(ticker, start, end) only for the leading/trailing segments that have
+    never been requested before.
+
+    Args:
+        fetch (callable): returns a DataFrame with 'Date', 'High', 'Low', 'Close'.
+        cache_dir (str): cache location (default=CACHE_DIR).
+        offline (bool): never call fetch, serve whatever is on disk.
+
+    Returns:
+        DataFrame: rows with start_date <= Date < end_date, sorted by Date.
+    """
+    start = pd.Timestamp(start_date).normalize()
+    end = pd.Timestamp(end_date).normalize()
+
+    cached, coverage = read_cache(ticker, cache_dir)
+    segments = [] if offline else _missing_segments(start, end, coverage)
+
+    if segments:
+        frames = [] if cached is None else [cached]
+        frames += [fetch(ticker, seg_start, seg_end) for seg_start, seg_end in segments]
+        frames = [frame for frame in frames if not frame.empty]
+        if frames:
+            cached = pd.concat(frames, ignore_index=True)
+            cached = cached.drop_duplicates(subset='Date', keep='last')
+            cached = cached.sort_values('Date').reset_index(drop=True)
+        else:
+            cached = pd.DataFrame(columns=PRICE_COLUMNS)
+
+        # Today's bar may still be forming, so coverage never extends past today
+        today = pd.Timestamp.today().normalize()
+        new_start = start if coverage is None else min(start, coverage[0])
+        new_end = min(end, today) if coverage is None else max(min(end, today), coverage[1])
+        write_cache(ticker, cached[PRICE_COLUMNS], (new_start, max(new_start, new_end)), cache_dir)
+
+    if cached is None:
+        return pd.DataFrame(columns=PRICE_COLUMNS)
+
+    mask = (cached['Date'] >= start) & (cached['Date'] < end)
+    return cached.loc[mask, PRICE_COLUMNS].reset_index(drop=True)
@@ -1,59 +1,120 @@
 import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
+import numpy as np
 
-def plot_cumulative_returns(df):
+from utils.profiling import profiled
+
+# Line traces longer than MAX_POINTS are downsampled (LTTB) to about the chart's pixel width;
+# pass max_points=None to ship every point. Traces still above WEBGL_THRESHOLD render with WebGL.
+MAX_POINTS = 2000
+WEBGL_THRESHOLD = 5000
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets: indices of n_out points that keep the visual shape of y(x).
+
+    The first and last points are kept; in between, each bucket keeps the point
+    forming the largest triangle with the previously kept point and the next
+    bucket's average.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    counts = np.diff(edges)
+    mean_x = np.add.reduceat(x[:n - 1], edges[:-1]) / counts
+    mean_y = np.add.reduceat(y[:n - 1], edges[:-1]) / counts
+    mean_x = np.append(mean_x[1:], x[-1])
+    mean_y = np.append(mean_y[1:], y[-1])
+
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs((x[a] - mean_x[i]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (mean_y[i] - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+def _scatter(x, y, max_points=MAX_POINTS, **kwargs):
+    # Line trace downsampled to max_points, as WebGL when it is still long
+    x, y = np.asarray(x), np.asarray(y, dtype=np.float64)
+    if max_points is not None and len(x) > max_points:
+        # Warmup NaNs are dropped before picking points, the rest of the line is kept in shape
+        finite = np.flatnonzero(np.isfinite(y))
+        x_numeric = x[finite].astype(np.int64 if np.issubdtype(x.dtype, np.datetime64) else np.float64)
+        keep = finite[lttb_indices(x_numeric.astype(np.float64), y[finite], max_points)]
+        x, y = x[keep], y[keep]
+    trace = go.Scattergl if len(x) > WEBGL_THRESHOLD else go.Scatter
+    return trace(x=x, y=y, **kwargs)
+
+def _markers(df, mask, column, **kwargs):
+    # Markers are never downsampled, every signal is shown
+    x, y = df['Date'].to_numpy()[mask], df[column].to_numpy()[mask]
+    trace = go.Scattergl if len(x) > WEBGL_THRESHOLD else go.Scatter
+    return trace(x=x, y=y, mode='markers', **kwargs)
+
+def payload_size(fig):
+    # Bytes of figure JSON sent to the browser
+    return len(fig.to_json())
+
+@profiled()
+def plot_cumulative_returns(df, max_points=MAX_POINTS):
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=df['Date'], y=df['Cumulative_Strategy'],
-                             mode='lines', name='Strategy', line=dict(color='green')))
-    fig.add_trace(go.Scatter(x=df['Date'], y=df['Cumulative_Market'],
-                             mode='lines', name='Market', line=dict(color='gray')))
+    fig.add_trace(_scatter(df['Date'], df['Cumulative_Strategy'], max_points,
+                           mode='lines', name='Strategy', line=dict(color='green')))
+    fig.add_trace(_scatter(df['Date'], df['Cumulative_Market'], max_points,
+                           mode='lines', name='Market', line=dict(color='gray')))
     fig.update_layout(title='Cumulative Returns', xaxis_title='Date', yaxis_title='Return',
                       hovermode='x unified')
     return fig
 
-def plot_strategy_dashboard(df, strategy_name):
+@profiled()
+def plot_strategy_dashboard(df, strategy_name, max_points=MAX_POINTS):
     if strategy_name == "MACD":
-        return plot_price_macd(df)
+        return plot_price_macd(df, max_points=max_points)
     elif strategy_name == "RSI":
-        return plot_price_rsi(df)
+        return plot_price_rsi(df, max_points=max_points)
     else:
-        return plot_signals(df)
+        return plot_signals(df, max_points=max_points)
     
-def plot_signals(df, show_signals=True, show_indicators=True):
+@profiled()
+def plot_signals(df, show_signals=True, show_indicators=True, max_points=MAX_POINTS):
     fig = go.Figure()
 
     # Close price
-    fig.add_trace(go.Scatter(
-        x=df['Date'], y=df['Close'],
+    fig.add_trace(_scatter(
+        df['Date'], df['Close'], max_points,
         mode='lines', name='Close Price',
         line=dict(color='blue')
     ))
 
     # Buy/Sell signals
     if show_signals:
-        fig.add_trace(go.Scatter(
-            x=df[df['Signal'] == 1]['Date'], y=df[df['Signal'] == 1]['Close'],
-            mode='markers', name='Buy',
+        signal = df['Signal'].to_numpy()
+        fig.add_trace(_markers(
+            df, signal == 1, 'Close', name='Buy',
             marker=dict(symbol='triangle-up', color='green', size=15)
         ))
-        fig.add_trace(go.Scatter(
-            x=df[df['Signal'] == -1]['Date'], y=df[df['Signal'] == -1]['Close'],
-            mode='markers', name='Sell',
+        fig.add_trace(_markers(
+            df, signal == -1, 'Close', name='Sell',
             marker=dict(symbol='triangle-down', color='red', size=15)
         ))
 
     # Technical indicators
     if show_indicators:
         if 'SMA_Short' in df.columns and 'SMA_Long' in df.columns:
-            fig.add_trace(go.Scatter(x=df['Date'], y=df['SMA_Short'], name='SMA Short', line=dict(color='cyan', dash='dot')))
-            fig.add_trace(go.Scatter(x=df['Date'], y=df['SMA_Long'], name='SMA Long', line=dict(color='orange', dash='dash')))
+            fig.add_trace(_scatter(df['Date'], df['SMA_Short'], max_points, name='SMA Short', line=dict(color='cyan', dash='dot')))
+            fig.add_trace(_scatter(df['Date'], df['SMA_Long'], max_points, name='SMA Long', line=dict(color='orange', dash='dash')))
         elif 'EWMA_Short' in df.columns and 'EWMA_Long' in df.columns:
-            fig.add_trace(go.Scatter(x=df['Date'], y=df['EWMA_Short'], name='EWMA Short', line=dict(color='cyan', dash='dot')))
-            fig.add_trace(go.Scatter(x=df['Date'], y=df['EWMA_Long'], name='EWMA Long', line=dict(color='orange', dash='dash')))
+            fig.add_trace(_scatter(df['Date'], df['EWMA_Short'], max_points, name='EWMA Short', line=dict(color='cyan', dash='dot')))
+            fig.add_trace(_scatter(df['Date'], df['EWMA_Long'], max_points, name='EWMA Long', line=dict(color='orange', dash='dash')))
         elif 'Upper_Breakout' in df.columns and 'Lower_Breakout' in df.columns:
-            fig.add_trace(go.Scatter(x=df['Date'], y=df['Upper_Breakout'], name='Upper Breakout', line=dict(color='green', dash='dot')))
-            fig.add_trace(go.Scatter(x=df['Date'], y=df['Lower_Breakout'], name='Lower Breakout', line=dict(color='red', dash='dot')))
+            fig.add_trace(_scatter(df['Date'], df['Upper_Breakout'], max_points, name='Upper Breakout', line=dict(color='green', dash='dot')))
+            fig.add_trace(_scatter(df['Date'], df['Lower_Breakout'], max_points, name='Lower Breakout', line=dict(color='red', dash='dot')))
 
     fig.update_layout(
         title="Price with Buy/Sell Signals",
@@ -64,34 +125,34 @@ def plot_signals(df, show_signals=True, show_indicators=True):
 
     return fig
 
-def plot_price_macd(df, show_signals=True):
+@profiled()
+def plot_price_macd(df, show_signals=True, max_points=MAX_POINTS):
     fig = make_subplots(
         rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.05,
         subplot_titles=("Price with Buy/Sell Signals", "MACD")
     )
 
     # Price
-    fig.add_trace(go.Scatter(
-        x=df["Date"], y=df["Close"], name="Close Price", line=dict(color="blue")
+    fig.add_trace(_scatter(
+        df["Date"], df["Close"], max_points, name="Close Price", line=dict(color="blue")
     ), row=1, col=1)
 
     if show_signals:
-        fig.add_trace(go.Scatter(
-            x=df[df["Signal"] == 1]["Date"], y=df[df["Signal"] == 1]["Close"],
-            mode="markers", name="Buy", marker=dict(symbol="triangle-up", color="green", size=15)
+        signal = df["Signal"].to_numpy()
+        fig.add_trace(_markers(
+            df, signal == 1, "Close", name="Buy", marker=dict(symbol="triangle-up", color="green", size=15)
         ), row=1, col=1)
-        fig.add_trace(go.Scatter(
-            x=df[df["Signal"] == -1]["Date"], y=df[df["Signal"] == -1]["Close"],
-            mode="markers", name="Sell", marker=dict(symbol="triangle-down", color="red", size=15)
+        fig.add_trace(_markers(
+            df, signal == -1, "Close", name="Sell", marker=dict(symbol="triangle-down", color="red", size=15)
         ), row=1, col=1)
 
     # MACD panel
-    fig.add_trace(go.Scatter(
-        x=df["Date"], y=df["MACD"], name="MACD", line=dict(color="purple")
+    fig.add_trace(_scatter(
+        df["Date"], df["MACD"], max_points, name="MACD", line=dict(color="purple")
     ), row=2, col=1)
 
-    fig.add_trace(go.Scatter(
-        x=df["Date"], y=df["Signal_Line"], name="Signal Line", line=dict(color="gray", dash="dot")
+    fig.add_trace(_scatter(
+        df["Date"], df["Signal_Line"], max_points, name="Signal Line", line=dict(color="gray", dash="dot")
     ), row=2, col=1)
 
     fig.update_layout(
@@ -105,30 +166,30 @@ def plot_price_macd(df, show_signals=True):
 
     return fig
 
-def plot_price_rsi(df, show_signals=True):
+@profiled()
+def plot_price_rsi(df, show_signals=True, max_points=MAX_POINTS):
     fig = make_subplots(
         rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.05,
         subplot_titles=("Price with Buy/Sell Signals", "RSI")
     )
 
     # Price
-    fig.add_trace(go.Scatter(
-        x=df["Date"], y=df["Close"], name="Close Price", line=dict(color="blue")
+    fig.add_trace(_scatter(
+        df["Date"], df["Close"], max_points, name="Close Price", line=dict(color="blue")
     ), row=1, col=1)
 
     if show_signals:
-        fig.add_trace(go.Scatter(
-            x=df[df["Signal"] == 1]["Date"], y=df[df["Signal"] == 1]["Close"],
-            mode="markers", name="Buy", marker=dict(symbol="triangle-up", color="green", size=15)
+        signal = df["Signal"].to_numpy()
+        fig.add_trace(_markers(
+            df, signal == 1, "Close", name="Buy", marker=dict(symbol="triangle-up", color="green", size=15)
         ), row=1, col=1)
-        fig.add_trace(go.Scatter(
-            x=df[df["Signal"] == -1]["Date"], y=df[df["Signal"] == -1]["Close"],
-            mode="markers", name="Sell", marker=dict(symbol="triangle-down", color="red", size=15)
+        fig.add_trace(_markers(
+            df, signal == -1, "Close", name="Sell", marker=dict(symbol="triangle-down", color="red", size=15)
         ), row=1, col=1)
 
     # RSI
-    fig.add_trace(go.Scatter(
-        x=df["Date"], y=df["RSI"], name="RSI", line=dict(color="orange")
+    fig.add_trace(_scatter(
+        df["Date"], df["RSI"], max_points, name="RSI", line=dict(color="orange")
     ), row=2, col=1)
 
     # Thresholds
@@ -146,14 +207,40 @@ def plot_price_rsi(df, show_signals=True):
 
     return fig
 
-def plot_drawdown(df):
+@profiled()
+def plot_drawdown(df, max_points=MAX_POINTS):
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=df['Date'], y=df['Drawdown'], mode='lines',
-                             name='Drawdown', line=dict(color='orange')))
+    fig.add_trace(_scatter(df['Date'], df['Drawdown'], max_points, mode='lines',
+                           name='Drawdown', line=dict(color='orange')))
     fig.update_layout(title='Drawdown Over Time', xaxis_title='Date', yaxis_title='Drawdown',
                       hovermode='x unified')
     return fig
 
+@profiled()
+def plot_rolling_metrics(rolling, window, max_points=MAX_POINTS):
+    fig = make_subplots(
+        rows=4, cols=1, shared_xaxes=True, vertical_spacing=0.04,
+        subplot_titles=("Sharpe / Sortino", "Volatility (%)", "Beta vs. Market", "Max Drawdown (%)")
+    )
+
+    fig.add_trace(_scatter(rolling['Date'], rolling['Rolling_Sharpe'], max_points, name='Sharpe',
+                           line=dict(color='green')), row=1, col=1)
+    fig.add_trace(_scatter(rolling['Date'], rolling['Rolling_Sortino'], max_points, name='Sortino',
+                           line=dict(color='teal', dash='dot')), row=1, col=1)
+    fig.add_trace(_scatter(rolling['Date'], rolling['Rolling_Volatility'], max_points, name='Volatility',
+                           line=dict(color='purple')), row=2, col=1)
+    fig.add_trace(_scatter(rolling['Date'], rolling['Rolling_Beta'], max_points, name='Beta',
+                           line=dict(color='blue')), row=3, col=1)
+    fig.add_trace(_scatter(rolling['Date'], rolling['Rolling_Max_Drawdown'], max_points, name='Max Drawdown',
+                           line=dict(color='orange')), row=4, col=1)
+
+    fig.add_hline(y=0, line=dict(dash='dash', color='gray'), row=1, col=1)
+    fig.add_hline(y=1, line=dict(dash='dash', color='gray'), row=3, col=1)
+
+    fig.update_layout(title=f'Rolling Metrics ({window}-Bar Window)', height=900, hovermode='x unified')
+    return fig
+
+@profiled()
 def plot_return_histogram(df):
     fig = px.histogram(
         df, x='Strategy_Returns', nbins=50,
@@ -163,3 +250,29 @@ def plot_return_histogram(df):
     )
     fig.update_layout(yaxis_title='Frequency')
     return fig
+
+@profiled()
+def plot_sweep_heatmap(grid, metric):
+    fig = go.Figure(go.Heatmap(
+        z=grid.values, x=grid.columns, y=grid.index,
+        colorscale='RdYlGn_r' if metric == 'Max Drawdown' else 'RdYlGn',
+        colorbar=dict(title=metric),
+        hovertemplate='Short: %{y}<br>Long: %{x}<br>' + metric + ': %{z:.2f}<extra></extra>'
+    ))
+    fig.update_layout(title=f'{metric} by Window Pair', xaxis_title=grid.columns.name,
+                      yaxis_title=grid.index.name, height=600)
+    return fig
+
+@profiled()
+def plot_strategy_comparison(results, max_points=MAX_POINTS):
+    fig = go.Figure()
+    for name, (df, metrics) in results.items():
+        fig.add_trace(_scatter(df['Date'], df['Cumulative_Strategy'], max_points, mode='lines', name=name))
+
+    # All strategies share one price load, so any frame carries the market curve
+    market = next(iter(results.values()))[0]
+    fig.add_trace(_scatter(market['Date'], market['Cumulative_Market'], max_points, mode='lines',
+                           name='Market', line=dict(color='gray', dash='dash')))
+    fig.update_layout(title='Cumulative Returns by Strategy', xaxis_title='Date', yaxis_title='Return',
+                      hovermode='x unified')
+    return fig
@@ -0,0 +1,182 @@
+import numpy as np
+import pandas as pd
+
+from strategies import STRATEGIES
+from utils.incremental import _mean_std, _merge_totals, _return_totals
+from utils.indicators import IndicatorCache
+from utils.kernels import ffill_position
+from utils.metrics import metrics_table
+from utils.profiling import profiled, stage
+from utils.store import CHUNK_ROWS
+from utils.sweep import grid_warmup
+
+# History bars re-read ahead of each chunk beyond the strategy's warmup: one for
+# diff/pct_change plus the two bars of lag in the breakout and crossover tests
+HALO_BARS = 3
+
+
+def _carried_cumprod(returns, carry):
+    # (1 + returns).cumprod() continued from carry, multiplying in the same order as one pass over the series
+    missing = np.isnan(returns)
+    cumulative = np.cumprod(np.concatenate(([carry], np.where(missing, 0.0, returns) + 1)))[1:]
+    last = cumulative[-1] if len(cumulative) else carry
+    cumulative[missing] = np.nan
+    return cumulative, last
+
+
+def _add_totals(totals, returns):
+    return _merge_totals(totals, _return_totals(returns))
+
+
+class _ChunkState:
+    # Everything a chunk inherits from the bars before it
+    def __init__(self):
+        self.seeds = {}
+        self.position = 0
+        self.cumulative_market = 1.0
+        self.cumulative_strategy = 1.0
+        self.rolling_max = -np.inf
+        self.min_drawdown = np.inf
+        self.last = None
+        self.totals = {name: _return_totals(np.empty(0)) for name in ('strategy', 'market', 'downside')}
+        self.gains = 0.0
+        self.losses = 0.0
+
+    def metrics(self):
+        strategy_mean, strategy_std = _mean_std(self.totals['strategy'])
+        market_mean, market_std = _mean_std(self.totals['market'])
+        _, downside_std = _mean_std(self.totals['downside'])
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return metrics_table([
+                (self.last['Cumulative_Strategy'] - 1) * 100,
+                (self.last['Cumulative_Market'] - 1) * 100,
+                strategy_std * np.sqrt(252) * 100,
+                market_std * np.sqrt(252) * 100,
+                abs(self.min_drawdown * 100),
+                np.float64(strategy_mean) / strategy_std * np.sqrt(252),
+                np.float64(market_mean) / market_std * np.sqrt(252),
+                np.float64(strategy_mean) / downside_std * np.sqrt(252),
+                self.gains / abs(self.losses) if self.losses != 0 else np.inf,
+            ])
+
+
+def _chunk_metrics(df, state):
+    # calculate_metrics on one chunk, continuing the cumulative columns from state
+    df['Market_Returns'] = df['Close'].pct_change()
+    df['Strategy_Returns'] = df['Market_Returns'] * df['Position'].shift(1)
+
+    df['Cumulative_Market'], state.cumulative_market = _carried_cumprod(
+        df['Market_Returns'].to_numpy(), state.cumulative_market)
+    df['Cumulative_Strategy'], state.cumulative_strategy = _carried_cumprod(
+        df['Strategy_Returns'].to_numpy(), state.cumulative_strategy)
+
+    df['Cumulative_Market_Percent'] = (df['Cumulative_Market'] - 1.0) * 100
+    df['Cumulative_Strategy_Percent'] = (df['Cumulative_Strategy'] - 1.0) * 100
+
+    df['Outperformance'] = df['Cumulative_Strategy'] - df['Cumulative_Market']
+    df['Daily_Outperformance'] = df['Strategy_Returns'] - df['Market_Returns']
+
+    df = df.dropna()
+    if df.empty:
+        return df
+
+    cumulative = np.concatenate(([state.rolling_max], df['Cumulative_Strategy'].to_numpy()))
+    # As in calculate_metrics: new columns on dropna's new frame, not a chained assignment
+    with pd.option_context('mode.chained_assignment', None):
+        df['Cumulative_Strategy_Rolling_Max'] = np.maximum.accumulate(cumulative)[1:]
+        df['Drawdown'] = df['Cumulative_Strategy'] / df['Cumulative_Strategy_Rolling_Max'] - 1
+    state.rolling_max = df['Cumulative_Strategy_Rolling_Max'].iloc[-1]
+    state.min_drawdown = min(state.min_drawdown, df['Drawdown'].min())
+
+    strategy_returns = df['Strategy_Returns'].to_numpy()
+    downside = strategy_returns[strategy_returns < 0]
+    state.totals['strategy'] = _add_totals(state.totals['strategy'], strategy_returns)
+    state.totals['market'] = _add_totals(state.totals['market'], df['Market_Returns'].to_numpy())
+    state.totals['downside'] = _add_totals(state.totals['downside'], downside)
+    state.gains += float(strategy_returns[strategy_returns > 0].sum())
+    state.losses += float(downside.sum())
+    state.last = df.iloc[-1]
+    return df
+
+
+@profiled()
+def chunked_backtest(series, strategy, params=None, start_date=None, end_date=None, history_start=None,
+                     chunk_rows=CHUNK_ROWS, on_chunk=None):
+    """
+    Out-of-core run_strategy over a memory-mapped series (utils.store.StoredSeries).
+
+    The series is read chunk_rows bars at a time. Each chunk is handed to the
+    strategy's generate_signals together with the last HALO_BARS + warmup bars
+    before it, so every rolling window is complete, and with an IndicatorCache
+    seeded with the previous chunk's EWMA values and rolling mean/std window
+    state. Positions, cumulative products, the drawdown's running max and the
+    running statistics behind each metric are carried from chunk to chunk, so
+    only one chunk is ever in memory.
+
+    Signals, positions, every indicator column, cumulative returns, drawdowns
+    and the metrics table match an in-memory run_strategy over the same bars.
+    pandas' rolling means and standard deviations depend on every bar since
+    the series started, so those are replayed bar by bar from the carried
+    state (strategies.streaming), the slowest step of a chunk.
+
+    Args:
+        series (StoredSeries): prices, opened from a utils.store.ColumnStore.
+        strategy (str): key of strategies.STRATEGIES.
+        params (dict): generate_signals keyword arguments.
+        start_date (datetime): first date kept for metrics (default=from history_start).
+        end_date (datetime): last date included (default=end of the series).
+        history_start (datetime): first bar read, as the first row of an in-memory frame (default=start of the series).
+        chunk_rows (int): bars per chunk.
+        on_chunk (callable): called with each chunk's finished backtest frame (the rows
+            run_strategy would return, indexed by store row), e.g. to write it to disk.
+
+    Returns:
+        DataFrame: the metrics table, as calculate_metrics'.
+    """
+    params = params or {}
+    generate_signals = STRATEGIES[strategy]
+    first, stop = series.locate(history_start, end_date)
+    first_row = first if start_date is None else max(first, series.locate(start_date)[0])
+    halo = grid_warmup(strategy, [params]) + HALO_BARS
+    state = _ChunkState()
+
+    for lo in range(first, stop, chunk_rows):
+        hi = min(lo + chunk_rows, stop)
+        frame_lo = max(first, lo - halo)
+        with stage('chunked_backtest.chunk', rows=hi - frame_lo):
+            df = series.frame(frame_lo, hi)
+            indicators = IndicatorCache(df, seeds=state.seeds, carry_windows=True)
+            df, _ = generate_signals(df, **params, indicators=indicators)
+
+            # Halo bars can miss signals whose windows start before the frame, so positions are
+            # filled from this chunk's own signals, continuing the position carried in
+            signal = df['Signal'].to_numpy()
+            own = lo - frame_lo
+            position = np.full_like(signal, state.position)
+            position[own:] = ffill_position(signal[own:])
+            position[own:][np.cumsum(signal[own:] != 0) == 0] = state.position
+            df['Position'] = position
+            state.position = position[-1]
+
+            # Seeds for the next chunk: EWMA values on the bar just before its frame, and each rolling
+            # window's state after this chunk with its values on the next frame's bars up to here
+            next_lo = max(first, hi - halo)
+            state.seeds = {key: float(values.iloc[next_lo - 1 - frame_lo]) for key, values
+                           in indicators.values.items() if key[0] == 'ema' and next_lo > first}
+            state.seeds.update({key: (window_state, indicators.values[key].to_numpy()[next_lo - frame_lo:])
+                                for key, window_state in indicators.states.items()})
+
+            keep_from = max(lo, first_row)
+            if keep_from >= hi:
+                continue
+            # Past the first chunk, also pass the bar before it: pct_change and the position lag need it
+            df = df.loc[keep_from - 1 if keep_from > first_row else keep_from:].copy()
+            kept = _chunk_metrics(df, state)
+            kept = kept.loc[kept.index >= keep_from]
+        if on_chunk is not None and not kept.empty:
+            on_chunk(kept)
+
+    if state.last is None:
+        raise ValueError(f'No bars to backtest between {start_date} and {end_date}')
+    return state.metrics()
@@ -0,0 +1,189 @@
+import contextlib
+import os
+import threading
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# Optional Numba versions of the sequential kernels in utils.kernels. Each one
+# loops over time once per series with the same arithmetic as the NumPy/pandas
+# path, so both backends give bit-identical results.
+
+NUMBA_AVAILABLE = numba is not None
+BACKENDS = ['numpy', 'numba']
+
+# 'auto' uses Numba when it is installed; override with BACKTESTER_KERNELS=numpy|numba
+_default = os.environ.get('BACKTESTER_KERNELS', 'auto')
+_local = threading.local()
+
+
+def available_backends():
+    return [name for name in BACKENDS if name != 'numba' or NUMBA_AVAILABLE]
+
+
+def _check(name):
+    if name not in ['auto'] + BACKENDS:
+        raise ValueError(f'Unknown kernel backend {name!r}, expected one of {["auto"] + BACKENDS}')
+
+
+def set_backend(name):
+    """
+    Default kernel backend: 'auto', 'numpy' or 'numba' ('numba' falls back to
+    'numpy' when Numba is not installed).
+    """
+    global _default
+    _check(name)
+    _default = name
+
+
+def get_backend():
+    # Backend in effect for this thread, after the fallback
+    name = getattr(_local, 'backend', None) or _default
+    if name == 'auto' or name == 'numba':
+        return 'numba' if NUMBA_AVAILABLE else 'numpy'
+    return name
+
+
+def enabled():
+    return get_backend() == 'numba'
+
+
+@contextlib.contextmanager
+def use_backend(name=None):
+    """
+    Run a block with another kernel backend on this thread (None keeps the current one):
+
+        with use_backend('numpy'):
+            run_strategy(...)
+    """
+    if name is None:
+        yield
+        return
+    _check(name)
+    previous = getattr(_local, 'backend', None)
+    _local.backend = name
+    try:
+        yield
+    finally:
+        _local.backend = previous
+
+
+def _by_row(kernel, *arrays):
+    # Kernels take (series, time) arrays; any leading shape is flattened into rows
+    shape = arrays[0].shape
+    rows = [np.ascontiguousarray(a).reshape(-1, shape[-1]) for a in arrays]
+    return kernel(*rows).reshape(shape)
+
+
+if NUMBA_AVAILABLE:
+    @numba.njit(cache=True)
+    def _ffill_position(signal):
+        out = np.empty_like(signal)
+        for r in range(signal.shape[0]):
+            current = signal[r, 0] * 0
+            for t in range(signal.shape[1]):
+                if signal[r, t] != 0:
+                    current = signal[r, t]
+                out[r, t] = current
+        return out
+
+    @numba.njit(cache=True)
+    def _ewma(x, alpha):
+        # pandas' ewm(adjust=False).mean() recursion, including its handling of missing bars
+        out = np.empty_like(x)
+        for r in range(x.shape[0]):
+            new_wt = alpha[r]
+            old_wt_factor = 1.0 - new_wt
+            weighted = np.nan
+            old_wt = 1.0
+            for t in range(x.shape[1]):
+                cur = x[r, t]
+                if weighted == weighted:
+                    old_wt *= old_wt_factor
+                    if cur == cur:
+                        if weighted != cur:
+                            weighted = (old_wt * weighted + new_wt * cur) / (old_wt + new_wt)
+                        old_wt = 1.0
+                elif cur == cur:
+                    weighted = cur
+                out[r, t] = weighted
+        return out
+
+    @numba.njit(cache=True)
+    def _rolling_extreme(x, window, is_max):
+        # Monotonic deque of bar indices: the window's extreme is always at its head
+        out = np.full(x.shape, np.nan)
+        queue = np.empty(x.shape[1], dtype=np.int64)
+        for r in range(x.shape[0]):
+            head = 0
+            tail = 0
+            last_nan = -window
+            for t in range(x.shape[1]):
+                cur = x[r, t]
+                if cur != cur:
+                    last_nan = t
+                else:
+                    while tail > head and (x[r, queue[tail - 1]] <= cur if is_max else x[r, queue[tail - 1]] >= cur):
+                        tail -= 1
+                    queue[tail] = t
+                    tail += 1
+                while head < tail and queue[head] <= t - window:
+                    head += 1
+                # A NaN bar anywhere in the window gives NaN, as pandas with min_periods=window
+                if t >= window - 1 and last_nan <= t - window:
+                    out[r, t] = x[r, queue[head]]
+        return out
+
+    @numba.njit(cache=True)
+    def _transition_signals(buy, sell):
+        out = np.zeros(buy.shape, dtype=np.int8)
+        for r in range(buy.shape[0]):
+            prev_buy = False
+            prev_sell = False
+            for t in range(buy.shape[1]):
+                if sell[r, t] and not prev_sell:
+                    out[r, t] = -1
+                elif buy[r, t] and not prev_buy:
+                    out[r, t] = 1
+                prev_buy = buy[r, t]
+                prev_sell = sell[r, t]
+        return out
+
+    @numba.njit(cache=True)
+    def _breakout_signals(close, upper, lower):
+        out = np.zeros(close.shape, dtype=np.int8)
+        for r in range(close.shape[0]):
+            for t in range(2, close.shape[1]):
+                if close[r, t] < lower[r, t - 1] and close[r, t - 1] >= lower[r, t - 2]:
+                    out[r, t] = -1
+                elif close[r, t] > upper[r, t - 1] and close[r, t - 1] <= upper[r, t - 2]:
+                    out[r, t] = 1
+        return out
+
+
+def ffill_position(signal):
+    return _by_row(_ffill_position, signal)
+
+
+def ewma(x, alpha):
+    # alpha: one smoothing factor per series, broadcastable to x.shape[:-1]
+    alpha = np.ascontiguousarray(np.broadcast_to(alpha, x.shape[:-1]), dtype=np.float64).reshape(-1)
+    rows = np.ascontiguousarray(x, dtype=np.float64).reshape(-1, x.shape[-1])
+    return _ewma(rows, alpha).reshape(x.shape)
+
+
+def rolling_extreme(x, window, is_max):
+    rows = np.ascontiguousarray(x, dtype=np.float64).reshape(-1, x.shape[-1])
+    return _rolling_extreme(rows, window, is_max).reshape(x.shape)
+
+
+def transition_signals(buy, sell):
+    return _by_row(_transition_signals, buy, sell)
+
+
+def breakout_signals(close, upper, lower):
+    return _by_row(_breakout_signals, close, upper, lower)
@@ -1,17 +1,144 @@
-import yfinance as yf
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import pandas as pd
 
-def load_price_data(ticker, start_date, end_date):
-    df = yf.download(ticker, start=start_date, end=end_date, group_by="ticker")
+from utils.cache import cached_load, read_cache
+from utils.providers import provider_from_env
+from utils.profiling import carry, profiled
+
+# Set BACKTESTER_OFFLINE=1 to serve everything from the local cache
+OFFLINE = os.environ.get('BACKTESTER_OFFLINE', '0') == '1'
+
+# Upper bound on concurrent provider requests in load_many
+MAX_WORKERS = 8
+
+# Weekday market holidays per trading day (about 10 a year), as slack when estimating how far back to load
+HOLIDAY_SLACK = 10 / 252
+# Data starting this long after the requested date means there is no older history to fetch
+HISTORY_GAP = pd.Timedelta(days=7)
+
+_default_provider = None
+
+def get_default_provider():
+    global _default_provider
+    if _default_provider is None:
+        _default_provider = provider_from_env()
+    return _default_provider
+
+def set_default_provider(provider):
+    global _default_provider
+    _default_provider = provider
+
+@profiled()
+def load_price_data(ticker, start_date, end_date, provider=None, use_cache=None, offline=None, cache_dir=None):
+    """
+    Load High/Low/Close prices for [start_date, end_date).
+
+    Args:
+        provider (PriceProvider): data source (default=get_default_provider()).
+        use_cache (bool): serve from the on-disk cache and only fetch missing segments
+            (default=provider.cacheable).
+        offline (bool): never call the provider, serve whatever is cached (default=OFFLINE).
+        cache_dir (str): override the cache location (default=utils.cache.CACHE_DIR).
+    """
+    provider = provider or get_default_provider()
+    if offline is None:
+        offline = OFFLINE
+    if use_cache is None:
+        use_cache = provider.cacheable
+
+    if not use_cache:
+        return provider.fetch(ticker, start_date, end_date)
+
+    return cached_load(ticker, start_date, end_date, provider.fetch,
+                       cache_dir=cache_dir, offline=offline)
+
+def load_many(tickers, start_date, end_date, max_workers=MAX_WORKERS, **kwargs):
+    """
+    Load several tickers concurrently on a bounded thread pool.
+
+    Args:
+        tickers (list): ticker symbols, duplicates are loaded once.
+        max_workers (int): maximum concurrent provider requests (default=MAX_WORKERS).
+        **kwargs: forwarded to load_price_data.
+
+    Returns:
+        dict: ticker -> DataFrame, in the order given.
+    """
+    tickers = list(dict.fromkeys(tickers))
+    if not tickers:
+        return {}
+
+    workers = max(1, min(max_workers, len(tickers)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # carry: workers record into the caller's trace
+        frames = pool.map(carry(lambda t: load_price_data(t, start_date, end_date, **kwargs)), tickers)
+        return dict(zip(tickers, frames))
+
+def _bars_back(date, bars):
+    # Business days covering `bars` trading bars before date, with slack for market holidays
+    return pd.Timestamp(date).normalize() - pd.offsets.BDay(int(np.ceil(bars * (1 + HOLIDAY_SLACK))) + 1)
+
+def warmup_start(ticker, start_date, warmup_bars, cache_dir=None):
+    """
+    Date to load from so that warmup_bars trading bars precede start_date.
+
+    Counted on the trading dates already in the ticker's price cache when they
+    reach back far enough, estimated on business days otherwise.
+    """
+    start = pd.Timestamp(start_date)
+    if warmup_bars <= 0:
+        return start
+
+    cached, coverage = read_cache(ticker, cache_dir)
+    if cached is None or cached.empty:
+        return _bars_back(start, warmup_bars)
+
+    dates = cached['Date']
+    before = int(dates.searchsorted(start))
+    if before >= warmup_bars:
+        return dates.iloc[before - warmup_bars]
+    if before and dates.iloc[0] - coverage[0] > HISTORY_GAP:
+        # Already asked for older bars and got none: the history starts here
+        return dates.iloc[0]
+    return _bars_back(dates.iloc[0] if before else start, warmup_bars - before)
+
+def load_with_warmup(ticker, start_date, end_date, warmup_bars, load=None, max_attempts=3, **kwargs):
+    """
+    Load [start_date, end_date) plus exactly warmup_bars trading bars before
+    start_date (fewer only when the ticker's history is shorter).
+
+    The first request starts at warmup_start(); if holidays leave it short, the
+    missing bars are requested further back, up to max_attempts requests.
 
-    # If MultiIndex columns exist, extract the relevant ticker data
-    if isinstance(df.columns, pd.MultiIndex):
-        df = df[ticker]
+    Args:
+        load (callable): (ticker, start, end) -> price DataFrame (default=load_price_data with **kwargs).
 
-    df = df.copy()
-    df.reset_index(inplace=True)  # Promote index to 'Date'
-    df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+    Returns:
+        DataFrame: prices with a fresh RangeIndex, warmup rows first.
+    """
+    if load is None:
+        load = lambda t, start, end: load_price_data(t, start, end, **kwargs)
+    start = pd.Timestamp(start_date)
+    load_from = warmup_start(ticker, start, warmup_bars, kwargs.get('cache_dir'))
 
-    df = df[['Date', 'High', 'Low', 'Close']].dropna()
+    for _ in range(max_attempts):
+        df = load(ticker, load_from, end_date)
+        before = int(df['Date'].searchsorted(start)) if len(df) else 0
+        missing = warmup_bars - before
+        if missing <= 0 or df.empty or df['Date'].iloc[0] - load_from > HISTORY_GAP:
+            break
+        load_from = _bars_back(df['Date'].iloc[0], missing)
+    return df.iloc[max(0, before - warmup_bars):].reset_index(drop=True)
 
-    return df
\ No newline at end of file
+def frame_loader(df):
+    """
+    A load(ticker, start, end) serving prices already in memory, so
+    load_with_warmup / run_backtest can run on a frame loaded once.
+    """
+    def load(ticker, start_date, end_date):
+        dates = df['Date']
+        return df.loc[(dates >= pd.Timestamp(start_date)) & (dates < pd.Timestamp(end_date))].reset_index(drop=True)
+    return load
@@ -0,0 +1,94 @@
+import os
+import shutil
+import tempfile
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from utils.backtest import run_strategy
+
+# One unit of work: strategy name, generate_signals kwargs, ticker
+BacktestJob = namedtuple('BacktestJob', ['strategy', 'params', 'ticker'])
+
+SHARED_COLUMNS = ['Date', 'High', 'Low', 'Close']
+
+# Per-process cache of opened memory maps: (directory, ticker) -> dict of arrays
+_worker_arrays = {}
+
+
+def _shared_root():
+    # /dev/shm is RAM-backed on Linux, so the maps below are plain shared memory there
+    return '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+
+def export_prices(prices, directory):
+    """
+    Write each ticker's columns as .npy files that workers memory-map read-only.
+
+    Args:
+        prices (dict): ticker -> DataFrame with 'Date', 'High', 'Low', 'Close'.
+        directory (str): destination, one sub-directory per ticker.
+    """
+    for i, (ticker, df) in enumerate(prices.items()):
+        ticker_dir = os.path.join(directory, str(i))
+        os.makedirs(ticker_dir, exist_ok=True)
+        for column in SHARED_COLUMNS:
+            np.save(os.path.join(ticker_dir, f'{column}.npy'), df[column].to_numpy())
+    return {ticker: os.path.join(directory, str(i)) for i, ticker in enumerate(prices)}
+
+
+def _open_prices(ticker_dir):
+    arrays = _worker_arrays.get(ticker_dir)
+    if arrays is None:
+        arrays = {column: np.load(os.path.join(ticker_dir, f'{column}.npy'), mmap_mode='r')
+                  for column in SHARED_COLUMNS}
+        _worker_arrays[ticker_dir] = arrays
+    return arrays
+
+
+def _run_job(ticker_dir, job, start_date, return_frame):
+    arrays = _open_prices(ticker_dir)
+    # The frame's price columns are the read-only maps themselves, not copies: strategies only add
+    # columns, which live in the job's own memory. A write into a price column would raise, not
+    # leak into other jobs.
+    df = pd.DataFrame({column: arrays[column] for column in SHARED_COLUMNS}, copy=False)
+    df, metrics_df = run_strategy(df, job.strategy, job.params, start_date)
+    return job, metrics_df, (df if return_frame else None)
+
+
+def run_jobs(jobs, prices, start_date=None, max_workers=None, return_frames=False):
+    """
+    Fan (strategy, params, ticker) jobs out over a process pool and yield results
+    as they finish.
+
+    Price data is exported once to memory-mapped arrays that every worker maps
+    read-only, so jobs only pickle their (strategy, params, ticker) description.
+
+    Args:
+        jobs (list): BacktestJob or (strategy, params, ticker) tuples.
+        prices (dict): ticker -> DataFrame, e.g. from utils.data.load_many.
+        start_date (datetime): first date kept for metrics (default=keep everything).
+        max_workers (int): pool size (default=os.cpu_count()).
+        return_frames (bool): also send back the full backtest frame of each job.
+
+    Yields:
+        (BacktestJob, DataFrame, DataFrame or None): job, metrics table, backtest frame.
+    """
+    jobs = [BacktestJob(*job) for job in jobs]
+    directory = tempfile.mkdtemp(prefix='backtest-', dir=_shared_root())
+    pool = None
+    try:
+        tickers = dict.fromkeys(job.ticker for job in jobs)
+        ticker_dirs = export_prices({ticker: prices[ticker] for ticker in tickers}, directory)
+        pool = ProcessPoolExecutor(max_workers=max_workers)
+        futures = [pool.submit(_run_job, ticker_dirs[job.ticker], job, start_date, return_frames)
+                   for job in jobs]
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        # Also reached when the caller stops iterating early: drop queued jobs
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        shutil.rmtree(directory, ignore_errors=True)
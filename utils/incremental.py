@@ -0,0 +1,197 @@
+import pickle
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from strategies.streaming import STREAMS, replay
+from utils.backtest import run_strategy
+from utils.metrics import metrics_table
+
+
+# Running mean and variance are Welford state: count, mean and sum of squared deviations (m2).
+# Unlike sum and sum of squares, they keep the precision of metrics_kernel's two-pass variance.
+
+def _return_totals(returns):
+    if len(returns) == 0:
+        return {'n': 0, 'mean': 0.0, 'm2': 0.0}
+    mean = float(returns.mean())
+    return {'n': len(returns), 'mean': mean, 'm2': float(((returns - mean) ** 2).sum())}
+
+
+def _add_return(totals, value):
+    totals['n'] += 1
+    delta = value - totals['mean']
+    totals['mean'] += delta / totals['n']
+    totals['m2'] += delta * (value - totals['mean'])
+
+
+def _merge_totals(totals, other):
+    # Chan et al.'s pairwise combination of two sets of Welford state
+    n = totals['n'] + other['n']
+    if n == 0:
+        return dict(totals)
+    delta = other['mean'] - totals['mean']
+    return {'n': n, 'mean': totals['mean'] + delta * other['n'] / n,
+            'm2': totals['m2'] + other['m2'] + delta * delta * totals['n'] * other['n'] / n}
+
+
+def _mean_std(totals):
+    if totals['n'] == 0:
+        return np.nan, np.nan
+    return totals['mean'], np.sqrt(totals['m2'] / totals['n'])
+
+
+class ExtendableBacktest:
+    """
+    A backtest that can be extended with new bars without recomputing history.
+
+    Keeps the strategy's streaming state (strategies.streaming), the last
+    cumulative products and running max, and running mean/variance state
+    behind each summary metric, so extend() only touches the appended bars.
+    Appended rows are buffered and joined to the frame once it is next read,
+    so a run of extensions never copies the history.
+    """
+
+    def __init__(self, strategy, params, frame, stream, state, ticker=None):
+        self.strategy = strategy
+        self.params = params
+        self._frame = frame
+        self._pending = []
+        self.stream = stream
+        self.state = state
+        self.ticker = ticker
+        self.metrics = self._metrics()
+
+    @classmethod
+    def run(cls, df, strategy, params=None, start_date=None, ticker=None):
+        """
+        Full backtest of df (including warmup history), as utils.backtest.run_strategy.
+        """
+        params = params or {}
+        stream = STREAMS[strategy](**params)
+        replay(df, stream)
+        frame, _ = run_strategy(df.copy(), strategy, params, start_date)
+
+        strategy_returns = frame['Strategy_Returns'].to_numpy()
+        downside = strategy_returns[strategy_returns < 0]
+        state = {
+            'strategy': _return_totals(strategy_returns),
+            'market': _return_totals(frame['Market_Returns'].to_numpy()),
+            'downside': _return_totals(downside),
+            'gains': float(strategy_returns[strategy_returns > 0].sum()),
+            'losses': float(downside.sum()),
+            'min_drawdown': float(frame['Drawdown'].min()),
+            'last_date': frame['Date'].iloc[-1],
+            'prev_close': float(df['Close'].iloc[-1]),
+            'prev_position': float(frame['Position'].iloc[-1]),
+            'cumulative_market': float(frame['Cumulative_Market'].iloc[-1]),
+            'cumulative_strategy': float(frame['Cumulative_Strategy'].iloc[-1]),
+            'rolling_max': float(frame['Cumulative_Strategy_Rolling_Max'].iloc[-1]),
+        }
+        return cls(strategy, params, frame, stream, state, ticker)
+
+    @property
+    def last_date(self):
+        return self.state['last_date']
+
+    @property
+    def frame(self):
+        # Buffered rows are joined in one concat, however many extensions they came from
+        if self._pending:
+            tail = pd.DataFrame(self._pending, columns=self._frame.columns)
+            start = self._frame.index[-1] + 1
+            tail.index = pd.RangeIndex(start, start + len(tail))
+            self._frame = pd.concat([self._frame, tail.astype(self._frame.dtypes.to_dict())])
+            self._pending = []
+        return self._frame
+
+    def extend(self, new_bars):
+        """
+        Append bars dated after last_date and update every column and metric in place.
+
+        Args:
+            new_bars (DataFrame): 'Date', 'High', 'Low', 'Close'; earlier dates are ignored.
+        """
+        new_bars = new_bars[new_bars['Date'] > self.last_date]
+        if new_bars.empty:
+            return self
+
+        state = self.state
+        for date, high, low, close in new_bars[['Date', 'High', 'Low', 'Close']].itertuples(index=False):
+            signal, position = self.stream.update(float(high), float(low), float(close))
+
+            market_return = close / state['prev_close'] - 1
+            strategy_return = market_return * state['prev_position']
+            state['cumulative_market'] *= 1 + market_return
+            state['cumulative_strategy'] *= 1 + strategy_return
+            state['rolling_max'] = max(state['rolling_max'], state['cumulative_strategy'])
+            drawdown = state['cumulative_strategy'] / state['rolling_max'] - 1
+
+            _add_return(state['market'], market_return)
+            _add_return(state['strategy'], strategy_return)
+            if strategy_return < 0:
+                _add_return(state['downside'], strategy_return)
+                state['losses'] += strategy_return
+            elif strategy_return > 0:
+                state['gains'] += strategy_return
+            state['min_drawdown'] = min(state['min_drawdown'], drawdown)
+            state['prev_close'], state['prev_position'] = close, position
+            state['last_date'] = date
+
+            self._pending.append({
+                'Date': date, 'High': high, 'Low': low, 'Close': close,
+                **self.stream.indicators,
+                'Signal': signal, 'Position': position,
+                'Market_Returns': market_return,
+                'Strategy_Returns': strategy_return,
+                'Cumulative_Market': state['cumulative_market'],
+                'Cumulative_Strategy': state['cumulative_strategy'],
+                'Cumulative_Market_Percent': (state['cumulative_market'] - 1.0) * 100,
+                'Cumulative_Strategy_Percent': (state['cumulative_strategy'] - 1.0) * 100,
+                'Outperformance': state['cumulative_strategy'] - state['cumulative_market'],
+                'Daily_Outperformance': strategy_return - market_return,
+                'Cumulative_Strategy_Rolling_Max': state['rolling_max'],
+                'Drawdown': drawdown,
+            })
+
+        self.metrics = self._metrics()
+        return self
+
+    def update(self, end_date, **load_kwargs):
+        """
+        Load bars from the day after last_date up to end_date and extend with them.
+        """
+        from utils.data import load_price_data
+
+        new_bars = load_price_data(self.ticker, self.last_date + timedelta(days=1), end_date, **load_kwargs)
+        return self.extend(new_bars)
+
+    def _metrics(self):
+        state = self.state
+        strategy_mean, strategy_std = _mean_std(state['strategy'])
+        market_mean, market_std = _mean_std(state['market'])
+        _, downside_std = _mean_std(state['downside'])
+        losses = state['losses']
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return metrics_table([
+                (state['cumulative_strategy'] - 1) * 100,
+                (state['cumulative_market'] - 1) * 100,
+                strategy_std * np.sqrt(252) * 100,
+                market_std * np.sqrt(252) * 100,
+                abs(state['min_drawdown'] * 100),
+                np.float64(strategy_mean) / strategy_std * np.sqrt(252),
+                np.float64(market_mean) / market_std * np.sqrt(252),
+                np.float64(strategy_mean) / downside_std * np.sqrt(252),
+                state['gains'] / abs(losses) if losses != 0 else np.inf,
+            ])
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load(path):
+        with open(path, 'rb') as f:
+            return pickle.load(f)
@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+
+from utils.kernels import ewma
+
+
+def _sma(cache, source, window, min_periods=None):
+    return cache.series(source).rolling(window=window, min_periods=min_periods).mean()
+
+
+def _std(cache, source, window):
+    return cache.series(source).rolling(window=window).std()
+
+
+def _ema(cache, source, span):
+    series = cache.series(source)
+    values = series.to_numpy(dtype=np.float64)
+    seed = cache.seeds.get(cache.key('ema', source, span=span))
+    if seed is not None and not np.isnan(seed):
+        # Continue the EWMA from the bar before this frame: the recursion starts from its first value
+        values = np.concatenate(([seed], values))
+    return pd.Series(ewma(values, span)[len(values) - len(series):], index=series.index)
+
+
+def _rolling_max(cache, source, window):
+    return cache.series(source).rolling(window=window).max()
+
+
+def _rolling_min(cache, source, window):
+    return cache.series(source).rolling(window=window).min()
+
+
+def _gain(cache, source):
+    return cache.series(source).diff().clip(lower=0)
+
+
+def _loss(cache, source):
+    return -cache.series(source).diff().clip(upper=0)
+
+
+def _macd(cache, source, short_span, long_span):
+    return cache.get('ema', source, span=short_span) - cache.get('ema', source, span=long_span)
+
+
+def _true_range(cache, source=None):
+    df = cache.df
+    prev_close = df['Close'].shift(1)
+    ranges = pd.concat([df['High'] - df['Low'],
+                        np.abs(df['High'] - prev_close),
+                        np.abs(df['Low'] - prev_close)], axis=1)
+    return ranges.max(axis=1)
+
+
+def _window_state(indicator, window, min_periods=None):
+    # Bar-at-a-time state with pandas' exact rolling arithmetic, for indicators whose value
+    # depends on every bar since the series started (running sums), not just the window
+    from strategies.streaming import RollingMean, RollingStd
+
+    return RollingMean(window, min_periods) if indicator == 'sma' else RollingStd(window)
+
+
+# Indicator name -> function(cache, source, **params) returning a Series aligned with the prices
+INDICATORS = {
+    'sma': _sma,
+    'std': _std,
+    'ema': _ema,
+    'rolling_max': _rolling_max,
+    'rolling_min': _rolling_min,
+    'gain': _gain,
+    'loss': _loss,
+    'macd': _macd,
+    'true_range': _true_range,
+}
+
+
+class IndicatorCache:
+    """
+    Memoized indicator graph over one price series.
+
+    Each node is keyed by (indicator, source, params), where source is a price
+    column or another node's key, and is computed at most once. Strategies that
+    are handed the same cache share every indicator they have in common, e.g. the
+    12/26 EWMAs of the EWMA crossover and MACD strategies.
+
+    seeds maps 'ema' node keys to that EWMA's value on the bar before df
+    starts, so a series processed in chunks continues each EWMA exactly.
+    With carry_windows, 'sma' and 'std' nodes are computed bar by bar with
+    pandas' running window state, left in states; a seed (state, values)
+    supplies the node's values for df's first len(values) bars and the state
+    after them, so the next chunk continues each window exactly too.
+    """
+
+    def __init__(self, df, seeds=None, carry_windows=False):
+        self.df = df
+        self.seeds = seeds or {}
+        self.carry_windows = carry_windows
+        self.states = {}
+        self.values = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(indicator, source='Close', **params):
+        return (indicator, source, tuple(sorted(params.items())))
+
+    def series(self, source):
+        # A price column, or the values of another node
+        if isinstance(source, tuple):
+            indicator, node_source, params = source
+            return self.get(indicator, node_source, **dict(params))
+        return self.df[source]
+
+    def get(self, indicator, source='Close', **params):
+        key = self.key(indicator, source, **params)
+        if key in self.values:
+            self.hits += 1
+        else:
+            self.misses += 1
+            if self.carry_windows and indicator in ('sma', 'std'):
+                self.values[key] = self._carried_window(key, indicator, source, params)
+            else:
+                self.values[key] = INDICATORS[indicator](self, source, **params)
+        return self.values[key]
+
+    def _carried_window(self, key, indicator, source, params):
+        series = self.series(source)
+        seed = self.seeds.get(key)
+        state, head = (_window_state(indicator, **params), []) if seed is None else seed
+        tail = [state.update(value) for value in series.to_numpy(dtype=np.float64)[len(head):].tolist()]
+        self.states[key] = state
+        return pd.Series(np.concatenate((head, tail)), index=series.index)
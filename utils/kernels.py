@@ -0,0 +1,275 @@
+import numpy as np
+import pandas as pd
+
+from utils import compiled
+
+# NumPy kernels shared by the strategies and the batched paths (sweeps,
+# universe runs). Time runs along the last axis; leading axes are independent
+# series (parameter sets or tickers). NaN marks a missing bar, as in pandas.
+# The sequential ones (ewma, rolling extremes, transition/breakout signals,
+# ffill_position) run
+# compiled when utils.compiled has Numba enabled, with identical results.
+
+
+def lag(x, fill=np.nan):
+    # x shifted one bar later along the last axis, like Series.shift(1)
+    out = np.empty_like(x)
+    out[..., 0] = fill
+    out[..., 1:] = x[..., :-1]
+    return out
+
+
+def rolling_means(x, windows):
+    """
+    Simple moving averages of a 1D series for many windows from a single cumulative sum.
+
+    Args:
+        x (ndarray): 1D price series.
+        windows (list): window lengths.
+
+    Returns:
+        ndarray: shape (len(windows), len(x)), NaN until each window is full,
+        matching pandas rolling(window).mean().
+    """
+    x = np.asarray(x, dtype=np.float64)
+    cumulative = _cumsums(x)
+    out = np.empty((len(windows), x.shape[-1]))
+    for i, window in enumerate(windows):
+        out[i] = rolling_mean(x, window, _cumulative=cumulative)
+    return out
+
+
+def _cumsums(x):
+    valid = np.isfinite(x)
+    pad = [(0, 0)] * (x.ndim - 1) + [(1, 0)]
+    csum = np.pad(np.cumsum(np.where(valid, x, 0.0), axis=-1), pad)
+    ccount = np.pad(np.cumsum(valid, axis=-1), pad)
+    return csum, ccount
+
+
+def rolling_mean(x, window, min_periods=None, _cumulative=None):
+    """
+    pandas rolling(window, min_periods).mean() along the last axis, ignoring NaN bars.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    min_periods = window if min_periods is None else min_periods
+    csum, ccount = _cumulative if _cumulative is not None else _cumsums(x)
+
+    n = x.shape[-1]
+    out = np.full(x.shape, np.nan)
+    # Partial windows at the start cover bars [0, t], full ones [t - window + 1, t]
+    lo = np.maximum(np.arange(1, n + 1) - window, 0)
+    hi = np.arange(1, n + 1)
+    sums = csum[..., hi] - csum[..., lo]
+    counts = ccount[..., hi] - ccount[..., lo]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(sums, counts, out=out, where=(counts >= max(min_periods, 1)))
+    return out
+
+
+def rolling_std(x, window, ddof=1):
+    """
+    pandas rolling(window).std() along the last axis (full windows only).
+
+    Uses running sums of the demeaned series, so it is linear in the series length.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    # Center each series first to keep the running sums small
+    centered = x - np.nanmean(x, axis=-1, keepdims=True)
+    mean = rolling_mean(centered, window)
+    mean_sq = rolling_mean(centered * centered, window)
+    with np.errstate(invalid='ignore'):
+        var = (mean_sq - mean * mean) * window / (window - ddof)
+    return np.sqrt(np.maximum(var, 0.0))
+
+
+def _rolling_extreme(x, window, reduce):
+    """
+    pandas rolling(window).max() / .min() along the last axis (reduce=np.maximum /
+    np.minimum): NaN until the window is full, and wherever it holds a NaN bar.
+
+    Van Herk/Gil-Werman: the series is cut into blocks of window bars and each
+    block gets a running extreme from its start and one from its end. A window
+    covers the end of one block and the start of the next, so its extreme is the
+    pair of those two, and the cost does not grow with the window.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    n = x.shape[-1]
+    if window > n:
+        return np.full(x.shape, np.nan)
+    if compiled.enabled() and x.size:
+        return compiled.rolling_extreme(x, window, reduce is np.maximum)
+
+    blocks = -(-n // window)
+    padded = np.full(x.shape[:-1] + (blocks * window,), np.nan)
+    padded[..., :n] = x
+    padded = padded.reshape(x.shape[:-1] + (blocks, window))
+    # NaN propagates through both running extremes, so a window holding one gives NaN
+    from_start = reduce.accumulate(padded, axis=-1).reshape(x.shape[:-1] + (-1,))
+    from_end = reduce.accumulate(padded[..., ::-1], axis=-1)[..., ::-1].reshape(x.shape[:-1] + (-1,))
+
+    out = np.full(x.shape, np.nan)
+    out[..., window - 1:] = reduce(from_end[..., :n - window + 1], from_start[..., window - 1:n])
+    return out
+
+
+def rolling_max(x, window):
+    return _rolling_extreme(x, window, np.maximum)
+
+
+def rolling_min(x, window):
+    return _rolling_extreme(x, window, np.minimum)
+
+
+def span_to_alpha(span):
+    # Same arithmetic as pandas: span -> center of mass -> alpha
+    com = (np.asarray(span, dtype=np.float64) - 1) / 2.0
+    return 1.0 / (1.0 + com)
+
+
+def ewma(x, span):
+    """
+    pandas ewm(span=span, adjust=False).mean() along the last axis.
+
+    The recursion runs once over time with every series (and span) updated
+    together, using pandas' update and its handling of missing bars.
+
+    Args:
+        x (ndarray): series with time on the last axis.
+        span: scalar, or array broadcastable to x.shape[:-1] for per-series spans.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    if compiled.enabled() and x.size:
+        return compiled.ewma(x, span_to_alpha(span))
+    if x.ndim == 1:
+        # One series: pandas' own compiled recursion beats a Python loop over time
+        return pd.Series(x).ewm(span=float(span), adjust=False).mean().to_numpy()
+
+    alpha = np.broadcast_to(span_to_alpha(span), x.shape[:-1])
+    old_wt_factor = 1.0 - alpha
+
+    out = np.empty(x.shape)
+    weighted = np.full(x.shape[:-1], np.nan)
+    old_wt = np.ones(x.shape[:-1])
+    for t in range(x.shape[-1]):
+        cur = x[..., t]
+        observed = cur == cur
+        started = weighted == weighted
+
+        # Bars since the last observation keep decaying the old weight
+        old_wt = np.where(started, old_wt * old_wt_factor, old_wt)
+        update = started & observed
+        # pandas leaves the average untouched when the new value equals it
+        blended = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+        weighted = np.where(update & (weighted != cur), blended, weighted)
+        old_wt = np.where(update, 1.0, old_wt)
+        weighted = np.where(~started & observed, cur, weighted)
+        out[..., t] = weighted
+    return out
+
+
+def ewma_many(x, spans):
+    """
+    Batched EWMA (adjust=False) of a 1D series for many spans.
+
+    Returns:
+        ndarray: shape (len(spans), len(x)).
+    """
+    x = np.asarray(x, dtype=np.float64)
+    return ewma(np.broadcast_to(x, (len(spans), x.shape[-1])), np.asarray(spans))
+
+
+def transition_signals(buy, sell):
+    """
+    +1 where buy becomes true, -1 where sell becomes true (sell wins a tie), 0 otherwise.
+
+    Mirrors the strategies: a condition on a missing previous bar counts as false.
+    """
+    if compiled.enabled() and buy.size:
+        return compiled.transition_signals(buy, sell)
+    signal = np.zeros(buy.shape, dtype=np.int8)
+    signal[buy & ~lag(buy, False)] = 1
+    signal[sell & ~lag(sell, False)] = -1
+    return signal
+
+
+def crossover_signals(fast, slow):
+    """
+    +1 where fast crosses above slow, -1 where it crosses below, 0 otherwise.
+    """
+    return transition_signals(fast > slow, fast < slow)
+
+
+def breakout_signals(close, upper, lower):
+    """
+    ATR breakout entries: +1 where close breaks above the previous bar's upper
+    level after closing at or below the one before it, -1 for the mirror image
+    on the lower level (sell wins a tie), 0 otherwise. Missing levels never trigger.
+    """
+    if compiled.enabled() and close.size:
+        return compiled.breakout_signals(close, upper, lower)
+    prev_close, upper_1, lower_1 = lag(close), lag(upper), lag(lower)
+    signal = np.zeros(close.shape, dtype=np.int8)
+    with np.errstate(invalid='ignore'):
+        signal[(close > upper_1) & (prev_close <= lag(upper_1))] = 1
+        signal[(close < lower_1) & (prev_close >= lag(lower_1))] = -1
+    return signal
+
+
+def ffill_position(signal):
+    """
+    Carry the last non-zero signal forward along the last axis (0 before the first signal).
+    """
+    signal = np.asarray(signal)
+    if compiled.enabled() and signal.size:
+        return compiled.ffill_position(signal)
+    idx = np.where(signal != 0, np.arange(signal.shape[-1]), 0)
+    np.maximum.accumulate(idx, axis=-1, out=idx)
+    return np.take_along_axis(signal, idx, axis=-1)
+
+
+def rolling_max_drop(x, window):
+    """
+    Largest fall max(x[i] - x[j]) over i <= j inside each trailing window, along the last axis.
+
+    Linear in the series length for any window (van Herk / Gil-Werman): the
+    series is cut into blocks of `window` bars, each block is scanned forward
+    and backward once, and every window is the backward scan of one block
+    joined with the forward scan of the next. Two segments join as
+    drop = max(drop_a, drop_b, max_a - min_b).
+
+    Returns:
+        ndarray: same shape as x, NaN until the first window is full.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    n = x.shape[-1]
+    out = np.full(x.shape, np.nan)
+    if window > n:
+        return out
+
+    n_blocks = -(-n // window)
+    pad = [(0, 0)] * (x.ndim - 1) + [(0, n_blocks * window - n)]
+    blocks = np.pad(x, pad, mode='edge').reshape(x.shape[:-1] + (n_blocks, window))
+
+    def forward(ufunc, values):
+        return ufunc.accumulate(values, axis=-1)
+
+    def backward(ufunc, values):
+        return ufunc.accumulate(values[..., ::-1], axis=-1)[..., ::-1]
+
+    # Scans forward from each block's first bar and backward from its last bar
+    prefix_min = forward(np.minimum, blocks)
+    prefix_drop = forward(np.maximum, forward(np.maximum, blocks) - blocks)
+    suffix_max = backward(np.maximum, blocks)
+    suffix_min = backward(np.minimum, blocks)
+    suffix_drop = backward(np.maximum, blocks - suffix_min)
+    prefix_min, prefix_drop, suffix_max, suffix_drop = (
+        a.reshape(x.shape[:-1] + (-1,)) for a in (prefix_min, prefix_drop, suffix_max, suffix_drop))
+
+    end = np.arange(window - 1, n)
+    start = end - window + 1
+    joined = np.maximum(np.maximum(suffix_drop[..., start], prefix_drop[..., end]),
+                        suffix_max[..., start] - prefix_min[..., end])
+    # A window that is exactly one block is just that block's forward scan
+    out[..., window - 1:] = np.where(start % window == 0, prefix_drop[..., end], joined)
+    return out
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+
+from utils.kernels import ffill_position, lag
+from utils.metrics import metrics_kernel, metrics_table
+from utils.profiling import profiled
+from utils.universe import UNIVERSE_SIGNALS
+
+# Columns the lean frame keeps: what the charts, rolling metrics, trade ledger and CLI read
+LEAN_COLUMNS = ['Date', 'High', 'Low', 'Close', 'Signal', 'Position', 'Market_Returns', 'Strategy_Returns',
+                'Cumulative_Market', 'Cumulative_Strategy', 'Drawdown']
+
+
+def _cumprod_skipna(returns):
+    # (1 + returns).cumprod() as pandas does it: NaN bars stay NaN and do not break the product
+    missing = np.isnan(returns)
+    cumulative = np.cumprod(np.where(missing, 0.0, returns) + 1)
+    cumulative[missing] = np.nan
+    return cumulative
+
+
+@profiled()
+def run_lean(df, strategy, params=None, start_date=None, dtype=np.float32, keep_indicators=True):
+    """
+    Memory-lean equivalent of utils.backtest.run_strategy.
+
+    Indicators and intermediates live in temporary NumPy arrays rather than
+    DataFrame columns, the input frame is only read (never copied or written),
+    and the result holds LEAN_COLUMNS (plus the strategy's chart indicators)
+    stored as dtype. Metrics are computed in float64 before the downcast, so
+    the metrics table matches run_strategy's.
+
+    Args:
+        df (DataFrame): 'Date', 'High', 'Low', 'Close', including warmup history. Left untouched.
+        strategy (str): key of strategies.STRATEGIES.
+        params (dict): generate_signals keyword arguments.
+        start_date (datetime): first date kept for metrics (default=keep everything).
+        dtype: storage type of the float columns (np.float32 halves them; np.float64 keeps full precision).
+        keep_indicators (bool): also keep the indicator columns the strategy dashboards plot.
+
+    Returns:
+        (DataFrame, DataFrame): lean backtest frame and the metrics table.
+    """
+    close, high, low = (df[column].to_numpy(dtype=np.float64) for column in ('Close', 'High', 'Low'))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        signal, indicators = UNIVERSE_SIGNALS[strategy](close, high, low, **(params or {}))
+    position = ffill_position(signal)
+
+    dates = df['Date'].to_numpy()
+    start = 0 if start_date is None else int(np.searchsorted(dates, np.datetime64(pd.Timestamp(start_date))))
+    # Views from the start date on; nothing below copies the price history
+    close, high, low, signal, position = (a[start:] for a in (close, high, low, signal, position))
+    indicators = {name: values[start:] for name, values in indicators.items()}
+
+    market_returns = close / lag(close) - 1
+    strategy_returns = market_returns * lag(position.astype(np.float64))
+    cumulative_market = _cumprod_skipna(market_returns)
+    cumulative_strategy = _cumprod_skipna(strategy_returns)
+
+    # Rows calculate_metrics' dropna would keep
+    keep = ~(np.isnan(market_returns) | np.isnan(strategy_returns) | np.isnan(high) | np.isnan(low))
+    for values in indicators.values():
+        keep &= ~np.isnan(values)
+
+    strategy_returns, market_returns = strategy_returns[keep], market_returns[keep]
+    cumulative_strategy, cumulative_market = cumulative_strategy[keep], cumulative_market[keep]
+    drawdown = cumulative_strategy / np.maximum.accumulate(cumulative_strategy) - 1
+
+    values = metrics_kernel(strategy_returns, market_returns)
+    values[0] = (cumulative_strategy[-1] - 1) * 100
+    values[1] = (cumulative_market[-1] - 1) * 100
+    values[4] = abs(drawdown.min() * 100)
+
+    columns = {
+        'Date': dates[start:][keep],
+        'High': high[keep].astype(dtype),
+        'Low': low[keep].astype(dtype),
+        'Close': close[keep].astype(dtype),
+        'Signal': signal[keep].astype(np.int8),
+        'Position': position[keep].astype(np.int8),
+        'Market_Returns': market_returns.astype(dtype),
+        'Strategy_Returns': strategy_returns.astype(dtype),
+        'Cumulative_Market': cumulative_market.astype(dtype),
+        'Cumulative_Strategy': cumulative_strategy.astype(dtype),
+        'Drawdown': drawdown.astype(dtype),
+    }
+    if keep_indicators:
+        columns.update({name: values_[keep].astype(dtype) for name, values_ in indicators.items()})
+    return pd.DataFrame(columns), metrics_table(values)
+
+
+def memory_report(lean_frame, df, strategy, params=None, sample_bars=None):
+    """
+    Memory of a lean frame against the standard run_strategy frame with the same rows.
+
+    The standard footprint is measured on a short run over the head of df
+    (its bytes per row do not depend on length) instead of a full run.
+
+    Returns:
+        dict: 'Rows', 'Lean (MB)', 'Standard (MB)', 'Saved (MB)', 'Saved (%)'.
+    """
+    from utils.backtest import run_strategy
+    from utils.sweep import grid_warmup
+
+    sample_bars = sample_bars or 2 * grid_warmup(strategy, [params or {}]) + 100
+    sample, _ = run_strategy(df.iloc[:sample_bars].copy(), strategy, params)
+    standard_per_row = sample.memory_usage(index=True).sum() / max(len(sample), 1)
+
+    rows = len(lean_frame)
+    lean_bytes = lean_frame.memory_usage(index=True).sum()
+    standard_bytes = standard_per_row * rows
+    return {
+        'Rows': rows,
+        'Lean (MB)': lean_bytes / 2 ** 20,
+        'Standard (MB)': standard_bytes / 2 ** 20,
+        'Saved (MB)': (standard_bytes - lean_bytes) / 2 ** 20,
+        'Saved (%)': 100 * (1 - lean_bytes / standard_bytes) if standard_bytes else 0.0,
+    }
@@ -1,6 +1,26 @@
 import numpy as np
 import pandas as pd
 
+from utils.kernels import rolling_mean, rolling_max_drop
+from utils.profiling import profiled
+
+METRIC_NAMES = [
+    'Final Strategy Return (%)',
+    'Final Market Return (%)',
+    'Strategy Volatility (%)',
+    'Market Volatility (%)',
+    'Max Drawdown (%)',
+    'Strategy Sharpe Ratio',
+    'Market Sharpe Ratio',
+    'Sortino Ratio',
+    'Profit Factor'
+]
+
+def metrics_table(values):
+    # Metric/Value table shown in the app, values in METRIC_NAMES order
+    return pd.DataFrame({'Metric': METRIC_NAMES, 'Value': [round(value, 2) for value in values]})
+
+@profiled()
 def calculate_metrics(df):
     # --- Basic Return Calculations ---
     df['Market_Returns'] = df['Close'].pct_change()
@@ -18,50 +38,163 @@ def calculate_metrics(df):
     df = df.dropna()
 
     # --- Final Metrics ---
-    final_strategy_return = (df['Cumulative_Strategy'].iloc[-1] - 1) * 100
-    final_market_return = (df['Cumulative_Market'].iloc[-1] - 1) * 100
-
-    strategy_volatility = np.std(df['Strategy_Returns']) * np.sqrt(252) * 100
-    market_volatility = np.std(df['Market_Returns']) * np.sqrt(252) * 100
-
-    strategy_sharpe = (np.mean(df['Strategy_Returns']) / np.std(df['Strategy_Returns'])) * np.sqrt(252)
-    market_sharpe = (np.mean(df['Market_Returns']) / np.std(df['Market_Returns'])) * np.sqrt(252)
-
-    df['Cumulative_Strategy_Rolling_Max'] = df['Cumulative_Strategy'].cummax()
-    df['Drawdown'] = df['Cumulative_Strategy'] / df['Cumulative_Strategy_Rolling_Max'] - 1
-    max_drawdown = abs(df['Drawdown'].min() * 100)
-
-    downside_returns = df[df['Strategy_Returns'] < 0]['Strategy_Returns']
-    sortino_ratio = (np.mean(df['Strategy_Returns']) / np.std(downside_returns)) * np.sqrt(252)
-
-    gains = df[df['Strategy_Returns'] > 0]['Strategy_Returns'].sum()
-    losses = df[df['Strategy_Returns'] < 0]['Strategy_Returns'].sum()
-    profit_factor = gains / abs(losses) if losses != 0 else np.inf
-
-    metrics = {
-        'Metric': [
-            'Final Strategy Return (%)',
-            'Final Market Return (%)',
-            'Strategy Volatility (%)',
-            'Market Volatility (%)',
-            'Max Drawdown (%)',
-            'Strategy Sharpe Ratio',
-            'Market Sharpe Ratio',
-            'Sortino Ratio',
-            'Profit Factor'
-        ],
-        'Value': [
-            round(final_strategy_return, 2),
-            round(final_market_return, 2),
-            round(strategy_volatility, 2),
-            round(market_volatility, 2),
-            round(max_drawdown, 2),
-            round(strategy_sharpe, 2),
-            round(market_sharpe, 2),
-            round(sortino_ratio, 2),
-            round(profit_factor, 2)
-        ]
+    values = metrics_kernel(df['Strategy_Returns'].to_numpy(), df['Market_Returns'].to_numpy())
+
+    # dropna returned a new frame, so these only add columns to it; pandas still flags it as a
+    # possible copy of the input, and warns about chained assignment without this
+    with pd.option_context('mode.chained_assignment', None):
+        df['Cumulative_Strategy_Rolling_Max'] = df['Cumulative_Strategy'].cummax()
+        df['Drawdown'] = df['Cumulative_Strategy'] / df['Cumulative_Strategy_Rolling_Max'] - 1
+
+    # Returns and drawdown are read off the charted curves, which start before any dropped warmup rows
+    values[0] = (df['Cumulative_Strategy'].iloc[-1] - 1) * 100
+    values[1] = (df['Cumulative_Market'].iloc[-1] - 1) * 100
+    values[4] = abs(df['Drawdown'].min() * 100)
+
+    metrics_df = metrics_table(values)
+    return df, metrics_df
+
+def metrics_kernel(strategy_returns, market_returns=None, periods_per_year=252):
+    """
+    All reported statistics straight from return arrays, without building columns.
+
+    Means, gains and losses are sums over each series; standard deviations take
+    a second pass over the deviations from the mean, which stays accurate when
+    the mean is large next to the spread. The drawdown needs the cumulative
+    product and its running maximum. Each of these (deviations, downside part,
+    equity, drawdown) is a temporary the size of the input, so peak memory is a
+    few copies of the returns. NaN bars are skipped.
+
+    Args:
+        strategy_returns (ndarray): 1D series or 2D array with one series per row.
+        market_returns (ndarray): matching market returns (default=market metrics left NaN).
+
+    Returns:
+        ndarray: shape (..., len(METRIC_NAMES)), values in METRIC_NAMES order.
+    """
+    strategy = _return_stats(np.asarray(strategy_returns, dtype=np.float64), periods_per_year, True)
+    out = np.full(strategy['mean'].shape + (len(METRIC_NAMES),), np.nan)
+
+    out[..., 0] = strategy['total']
+    out[..., 2] = strategy['volatility']
+    out[..., 4] = strategy['max_drawdown']
+    out[..., 5] = strategy['sharpe']
+    out[..., 7] = strategy['sortino']
+    out[..., 8] = strategy['profit_factor']
+
+    if market_returns is not None:
+        market = _return_stats(np.asarray(market_returns, dtype=np.float64), periods_per_year, False)
+        out[..., 1] = market['total']
+        out[..., 3] = market['volatility']
+        out[..., 6] = market['sharpe']
+    return out
+
+def _return_stats(returns, periods_per_year, full):
+    valid = ~np.isnan(returns)
+    gaps = not valid.all()
+    if gaps:
+        returns = np.where(valid, returns, 0.0)
+    count = valid.sum(axis=-1) if gaps else returns.shape[-1]
+
+    total = returns.sum(axis=-1)
+    annualizer = np.sqrt(periods_per_year)
+
+    # An all-NaN series has count 0: its statistics are NaN, without warnings
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = total / count
+        deviation = returns - mean[..., None]
+        if gaps:
+            deviation[~valid] = 0.0
+        std = np.sqrt(np.einsum('...i,...i->...', deviation, deviation) / count)
+        stats = {
+            'mean': mean,
+            'volatility': std * annualizer * 100,
+            'sharpe': mean / std * annualizer,
+        }
+        if not full:
+            stats['total'] = (np.prod(1 + returns, axis=-1) - 1) * 100
+            return stats
+
+        cumulative = np.cumprod(1 + returns, axis=-1)
+        stats['total'] = (cumulative[..., -1] - 1) * 100
+        drawdown = cumulative / np.maximum.accumulate(cumulative, axis=-1) - 1
+        stats['max_drawdown'] = np.abs(drawdown.min(axis=-1)) * 100
+
+        downside = np.minimum(returns, 0.0)
+        downside_count = (downside < 0).sum(axis=-1)
+        losses = downside.sum(axis=-1)
+        downside_mean = losses / downside_count
+        deviation = np.where(downside < 0, downside - downside_mean[..., None], 0.0)
+        downside_std = np.sqrt(np.einsum('...i,...i->...', deviation, deviation) / downside_count)
+        stats['sortino'] = mean / downside_std * annualizer
+
+        gains = total - losses
+        stats['profit_factor'] = np.where(losses != 0, gains / np.abs(losses), np.inf)
+    return stats
+
+def summarize_returns(returns, periods_per_year=252):
+    """
+    Headline metrics for one or many return series (time on the last axis), from metrics_kernel.
+
+    Returns:
+        dict: 'Return' (%), 'Volatility' (%), 'Sharpe', 'Sortino', 'Max Drawdown' (%),
+        'Profit Factor' as arrays over the leading axes.
+    """
+    values = metrics_kernel(returns, periods_per_year=periods_per_year)
+    return {
+        'Return': values[..., 0],
+        'Volatility': values[..., 2],
+        'Sharpe': values[..., 5],
+        'Sortino': values[..., 7],
+        'Max Drawdown': values[..., 4],
+        'Profit Factor': values[..., 8],
     }
 
-    metrics_df = pd.DataFrame(metrics)
-    return df, metrics_df
\ No newline at end of file
+@profiled()
+def rolling_metrics(df, window, periods_per_year=252):
+    """
+    Trailing-window Sharpe, Sortino, volatility, beta and max drawdown, with the
+    same definitions as the metrics table applied to each window.
+
+    Means and (co)variances come from running sums and the drawdown from a
+    block-scan kernel on log equity, so the cost is linear in the series length
+    whatever the window.
+
+    Args:
+        df (DataFrame): frame returned by calculate_metrics.
+        window (int): window length in bars.
+        periods_per_year (int): bars per year for annualizing (252 for daily data).
+
+    Returns:
+        DataFrame: 'Date', 'Rolling_Sharpe', 'Rolling_Sortino', 'Rolling_Volatility' (%),
+        'Rolling_Beta', 'Rolling_Max_Drawdown' (%), NaN until the first window is full.
+    """
+    strategy = df['Strategy_Returns'].to_numpy(dtype=np.float64)
+    market = df['Market_Returns'].to_numpy(dtype=np.float64)
+    annualizer = np.sqrt(periods_per_year)
+
+    mean = rolling_mean(strategy, window)
+    market_mean = rolling_mean(market, window)
+    downside = np.minimum(strategy, 0.0)
+    downside_count = rolling_mean((downside < 0).astype(np.float64), window) * window
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        std = np.sqrt(np.maximum(rolling_mean(strategy * strategy, window) - mean * mean, 0.0))
+        market_var = rolling_mean(market * market, window) - market_mean * market_mean
+        covariance = rolling_mean(strategy * market, window) - mean * market_mean
+
+        downside_mean = rolling_mean(downside, window) * window / downside_count
+        downside_std = np.sqrt(np.maximum(
+            rolling_mean(downside * downside, window) * window / downside_count - downside_mean * downside_mean, 0.0))
+
+        log_equity = np.cumsum(np.log1p(strategy))
+        max_drawdown = -np.expm1(-rolling_max_drop(log_equity, window)) * 100
+
+        return pd.DataFrame({
+            'Date': df['Date'].to_numpy(),
+            'Rolling_Sharpe': mean / std * annualizer,
+            'Rolling_Sortino': mean / downside_std * annualizer,
+            'Rolling_Volatility': std * annualizer * 100,
+            'Rolling_Beta': covariance / market_var,
+            'Rolling_Max_Drawdown': max_drawdown,
+        })
@@ -0,0 +1,94 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from strategies import PARAM_GRIDS
+from utils.metrics import summarize_returns
+from utils.sweep import expand_grid, grid_warmup, position_matrix
+
+# Metrics where a lower value is better
+MINIMIZE = {'Max Drawdown'}
+
+
+def _score(df, strategy, candidates, n_bars, warmup, metric):
+    # Score each candidate on the most recent n_bars, with warmup history loaded ahead of them
+    window = df.iloc[max(0, len(df) - n_bars - warmup):].reset_index(drop=True)
+    positions, _ = position_matrix(window, strategy, candidates)
+
+    close = window['Close'].to_numpy(dtype=np.float64)
+    lo = len(window) - n_bars
+    market_returns = close[lo + 1:] / close[lo:-1] - 1
+    scores = summarize_returns(market_returns * positions[:, lo:-1])[metric]
+
+    worst = np.inf if metric in MINIMIZE else -np.inf
+    return np.where(np.isnan(scores), worst, scores), len(window) * len(candidates)
+
+
+def successive_halving(df, strategy, param_grid=None, metric='Sharpe', eta=3, min_bars=126,
+                       n_candidates=None, budget=None, seed=0):
+    """
+    Successive-halving parameter search: score many candidates on a short recent
+    slice of history, keep the best 1/eta, and re-score the survivors on an eta
+    times longer slice until one candidate has seen the full history.
+
+    Args:
+        df (DataFrame): 'Date', 'High', 'Low', 'Close'.
+        strategy (str): key of strategies.STRATEGIES.
+        param_grid (dict): param -> candidate values (default=strategies.PARAM_GRIDS[strategy]).
+        metric (str): 'Sharpe', 'Return' or 'Max Drawdown'.
+        eta (int): keep 1/eta of the candidates per round and grow the slice by eta (default=3).
+        min_bars (int): bars scored in the first round (default=126, ~6 months).
+        n_candidates (int): candidates sampled from the grid in the first round (default=all).
+        budget (int): approximate bar-evaluation budget, sets n_candidates when given.
+        seed (int): seed for candidate sampling.
+
+    Returns:
+        (dict, DataFrame, dict): best parameters, one row per (round, candidate)
+        evaluation, and a report comparing bar-evaluations against the full grid.
+    """
+    grid = expand_grid(param_grid or PARAM_GRIDS[strategy])
+    df = df.reset_index(drop=True)
+
+    warmup = grid_warmup(strategy, grid)
+    n_bars = len(df) - warmup
+    if n_bars <= min_bars:
+        raise ValueError('Not enough history after warmup for the first round')
+
+    n_rounds = int(math.ceil(math.log(n_bars / min_bars, eta))) + 1
+    if budget is not None:
+        # Each round costs about n_candidates * min_bars, since candidates shrink as slices grow
+        n_candidates = max(1, int(budget // ((min_bars + warmup) * n_rounds)))
+
+    rng = np.random.default_rng(seed)
+    if n_candidates is not None and n_candidates < len(grid):
+        candidates = [grid[i] for i in sorted(rng.choice(len(grid), size=n_candidates, replace=False))]
+    else:
+        candidates = grid
+
+    n_sampled = len(candidates)
+    rows = []
+    bar_evaluations = 0
+    for round_number in range(n_rounds):
+        round_bars = n_bars if round_number == n_rounds - 1 else min(n_bars, min_bars * eta ** round_number)
+        scores, cost = _score(df, strategy, candidates, round_bars, warmup, metric)
+        bar_evaluations += cost
+        rows += [{'Round': round_number, 'Bars': round_bars, 'Params': params, metric: score}
+                 for params, score in zip(candidates, scores)]
+
+        order = np.argsort(scores if metric in MINIMIZE else -scores, kind='stable')
+        keep = max(1, len(candidates) // eta)
+        candidates = [candidates[i] for i in order[:keep]]
+        if round_bars == n_bars:
+            break
+
+    full_grid_evaluations = len(grid) * len(df)
+    report = {
+        'grid_size': len(grid),
+        'candidates_sampled': n_sampled,
+        'rounds': rows[-1]['Round'] + 1,
+        'bar_evaluations': bar_evaluations,
+        'full_grid_bar_evaluations': full_grid_evaluations,
+        'saved_pct': round(100 * (1 - bar_evaluations / full_grid_evaluations), 2),
+    }
+    return candidates[0], pd.DataFrame(rows), report
@@ -0,0 +1,216 @@
+import numpy as np
+import pandas as pd
+
+from utils.kernels import ffill_position, lag, rolling_std
+from utils.metrics import metrics_kernel, metrics_table
+from utils.profiling import profiled
+from utils.universe import UNIVERSE_SIGNALS, align_prices
+
+WEIGHTINGS = ['equal', 'inverse_vol', 'signal']
+
+# Rebalance calendars: first bar of each new day, week, month, quarter or year
+REBALANCE_FREQUENCIES = ['D', 'W', 'M', 'Q', 'Y']
+
+# Bars of daily returns behind the inverse-volatility weights
+VOL_WINDOW = 60
+
+PORTFOLIO_METRIC_NAMES = ['Annual Turnover (%)', 'Total Costs (%)', 'Rebalances']
+
+# Strategy name -> (close, indicators) -> signal strength, the size of the weight given to an open
+# position under 'signal' weighting. Indicators are UNIVERSE_SIGNALS' arrays, (tickers, dates).
+SIGNAL_STRENGTH = {
+    # Spread between the fast and slow average, as a fraction of the slow one
+    'SMA': lambda close, ind: np.abs(ind['SMA_Short'] / ind['SMA_Long'] - 1),
+    'EWMA': lambda close, ind: np.abs(ind['EWMA_Short'] / ind['EWMA_Long'] - 1),
+    # MACD histogram relative to price
+    'MACD': lambda close, ind: np.abs(ind['MACD'] - ind['Signal_Line']) / close,
+    # Distance of RSI from neutral
+    'RSI': lambda close, ind: np.abs(ind['RSI'] - 50) / 50,
+    # Distance from the middle of the breakout channel, in channel widths
+    'ATR': lambda close, ind: np.abs(close - (ind['Upper_Breakout'] + ind['Lower_Breakout']) / 2)
+                              / (ind['Upper_Breakout'] - ind['Lower_Breakout']),
+}
+
+
+def rebalance_bars(dates, rebalance='M', start_idx=0):
+    """
+    Bar indices where the book is rebalanced: start_idx, then the first bar of
+    every new period after it. The last bar is never one, nothing is held after it.
+
+    Args:
+        dates (DatetimeIndex): bar dates.
+        rebalance (str or int): one of REBALANCE_FREQUENCIES, or a fixed number of bars.
+
+    Returns:
+        ndarray: increasing bar indices, starting with start_idx.
+    """
+    n = len(dates)
+    if isinstance(rebalance, (int, np.integer)):
+        if rebalance < 1:
+            raise ValueError(f'Rebalance interval must be at least one bar, got {rebalance}')
+        return np.arange(start_idx, n - 1, rebalance)
+    if rebalance not in REBALANCE_FREQUENCIES:
+        raise ValueError(f'Unknown rebalance frequency {rebalance!r}, expected one of {REBALANCE_FREQUENCIES} '
+                         'or a number of bars')
+
+    periods = pd.DatetimeIndex(dates).to_period(rebalance).asi8
+    new_period = np.flatnonzero(periods[1:] != periods[:-1]) + 1
+    later = new_period[(new_period > start_idx) & (new_period < n - 1)]
+    return np.concatenate(([start_idx], later)) if start_idx < n - 1 else later
+
+
+def target_weights(position, weighting='equal', returns=None, strength=None, vol_window=VOL_WINDOW):
+    """
+    Weights each bar's positions would be rebalanced to.
+
+    Open positions get the sign of their position and a size by weighting:
+    'equal' the same for all, 'inverse_vol' proportional to 1 / trailing
+    volatility of returns, 'signal' proportional to strength. Sizes are scaled
+    so the absolute weights sum to 1 on every bar with an open position; a
+    position whose size is undefined (e.g. no full volatility window yet) gets 0.
+
+    Args:
+        position (ndarray): (tickers, dates) positions, -1/0/1.
+        returns (ndarray): (tickers, dates) returns, for 'inverse_vol'.
+        strength (ndarray): (tickers, dates) non-negative signal strength, for 'signal'.
+
+    Returns:
+        ndarray: (tickers, dates) weights.
+    """
+    if weighting == 'equal':
+        raw = position.astype(np.float64)
+    elif weighting == 'inverse_vol':
+        vol = rolling_std(returns, vol_window)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            raw = np.where(vol > 0, position / vol, 0.0)
+    elif weighting == 'signal':
+        raw = position * strength
+    else:
+        raise ValueError(f'Unknown weighting {weighting!r}, expected one of {WEIGHTINGS}')
+
+    raw = np.where(np.isfinite(raw), raw, 0.0)
+    gross = np.abs(raw).sum(axis=0, keepdims=True)
+    return np.divide(raw, gross, out=np.zeros_like(raw), where=gross > 0)
+
+
+@profiled()
+def portfolio_backtest(prices, strategy, params=None, start_date=None, weighting='equal', rebalance='M',
+                       cost_bps=0.0, long_only=False, vol_window=VOL_WINDOW, periods_per_year=252):
+    """
+    Combine one strategy's per-ticker signals into a single rebalanced book.
+
+    Signals come from the universe pass (utils.universe) on a dates x tickers
+    matrix. On each rebalance bar the book is traded at the close to the
+    target weights, then held as fixed quantities, so weights drift with
+    prices until the next rebalance. Each segment's value is a closed form in
+    the price ratios since its rebalance bar, so every bar of every segment is
+    computed in one set of array operations, without a loop over rebalances.
+
+    Turnover on a rebalance bar is the sum of absolute changes from the drifted
+    weights to the new targets. It costs cost_bps of the book, taken from the
+    first bar it is held. Unallocated weight is held as cash earning nothing.
+    The benchmark ('Market') is an equal-weight, daily-rebalanced book of every
+    ticker with a price.
+
+    Args:
+        prices (dict): ticker -> DataFrame (e.g. from utils.data.load_many), including warmup history.
+        strategy (str): key of strategies.STRATEGIES.
+        params (dict): generate_signals keyword arguments.
+        start_date (datetime): first rebalance; returns start on the bar after (default=first date).
+        weighting (str): one of WEIGHTINGS, see target_weights.
+        rebalance (str or int): one of REBALANCE_FREQUENCIES, or a fixed number of bars.
+        cost_bps (float): transaction cost per unit of turnover, in basis points.
+        long_only (bool): treat short positions as flat.
+        vol_window (int): bars of returns behind 'inverse_vol' weights.
+
+    Returns:
+        (DataFrame, DataFrame, DataFrame): the portfolio frame (calculate_metrics'
+        'Strategy_Returns', 'Market_Returns', cumulative and 'Drawdown' columns, plus
+        'Gross_Returns', 'Turnover', 'Costs', 'Gross_Exposure', 'Net_Exposure'), the
+        metrics table with PORTFOLIO_METRIC_NAMES appended, and the target weights
+        on each rebalance date (rebalance dates x tickers).
+    """
+    dates, tickers, matrices = align_prices(prices)
+    # Kernels run along the last axis, so work on (tickers, dates)
+    close, high, low = (matrices[column].T for column in ('Close', 'High', 'Low'))
+
+    with np.errstate(invalid='ignore'):
+        signal, indicators = UNIVERSE_SIGNALS[strategy](close, high, low, **(params or {}))
+    position = ffill_position(signal)
+    if long_only:
+        position = np.maximum(position, 0)
+
+    # Prices carried over missing bars, as in universe_backtest; NaN before a ticker's first bar
+    last_seen = np.where(np.isnan(close), 0, np.arange(close.shape[-1]))
+    np.maximum.accumulate(last_seen, axis=-1, out=last_seen)
+    carried = np.take_along_axis(close, last_seen, axis=-1)
+
+    start_idx = 0 if start_date is None else int(dates.searchsorted(pd.Timestamp(start_date)))
+    bars = rebalance_bars(dates, rebalance, start_idx)
+    if len(bars) == 0:
+        raise ValueError(f'No bars to hold between {start_date} and the last date')
+
+    # Targets on rebalance bars only; a ticker without a price yet cannot be bought
+    with np.errstate(invalid='ignore', divide='ignore'):
+        returns = carried / lag(carried) - 1
+        strength = SIGNAL_STRENGTH[strategy](close, indicators) if weighting == 'signal' else None
+        weights = target_weights(position, weighting, returns, strength, vol_window)[:, bars]
+    weights[np.isnan(carried[:, bars])] = 0.0
+
+    # Every held bar t (start_idx + 1 onward) and the rebalance whose book it holds
+    held = np.arange(bars[0] + 1, len(dates))
+    segment = np.searchsorted(bars, held - 1, side='right') - 1
+    book = weights[:, segment]
+    base = carried[:, bars[segment]]
+
+    # Book value relative to its rebalance bar, at the close of t and of t - 1
+    with np.errstate(invalid='ignore', divide='ignore'):
+        growth = np.where(book != 0, book * carried[:, held] / base, 0.0)
+        prev_growth = np.where(book != 0, book * carried[:, held - 1] / base, 0.0)
+    value = 1 + (growth - book).sum(axis=0)
+    prev_value = 1 + (prev_growth - book).sum(axis=0)
+    gross_returns = value / prev_value - 1
+
+    # Drifted weights just before each rebalance (none before the first) and the turnover to the targets
+    ends = np.searchsorted(held, bars[1:])
+    drifted = np.zeros_like(weights)
+    drifted[:, 1:] = growth[:, ends] / value[ends]
+    turnover = np.abs(weights - drifted).sum(axis=0)
+    bar_turnover = np.zeros(len(held))
+    bar_turnover[np.searchsorted(held, bars + 1)] = turnover
+    costs = bar_turnover * cost_bps / 10_000
+    net_returns = (1 + gross_returns) * (1 - costs) - 1
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ticker_returns = carried[:, held] / carried[:, held - 1] - 1
+        priced = ~np.isnan(ticker_returns)
+        market_returns = np.where(priced, ticker_returns, 0.0).sum(axis=0) / priced.sum(axis=0)
+
+    df = pd.DataFrame({
+        'Date': dates[held],
+        'Strategy_Returns': net_returns,
+        'Market_Returns': market_returns,
+        'Gross_Returns': gross_returns,
+        'Turnover': bar_turnover,
+        'Costs': costs,
+        'Gross_Exposure': np.abs(growth).sum(axis=0) / value,
+        'Net_Exposure': growth.sum(axis=0) / value,
+    })
+    df['Cumulative_Market'] = np.nancumprod(1 + market_returns)
+    df['Cumulative_Strategy'] = np.cumprod(1 + net_returns)
+    df['Cumulative_Market_Percent'] = (df['Cumulative_Market'] - 1.0) * 100
+    df['Cumulative_Strategy_Percent'] = (df['Cumulative_Strategy'] - 1.0) * 100
+    df['Outperformance'] = df['Cumulative_Strategy'] - df['Cumulative_Market']
+    df['Daily_Outperformance'] = df['Strategy_Returns'] - df['Market_Returns']
+    df['Cumulative_Strategy_Rolling_Max'] = df['Cumulative_Strategy'].cummax()
+    df['Drawdown'] = df['Cumulative_Strategy'] / df['Cumulative_Strategy_Rolling_Max'] - 1
+
+    values = metrics_kernel(net_returns, market_returns, periods_per_year)
+    years = len(held) / periods_per_year
+    metrics_df = pd.concat([metrics_table(values), pd.DataFrame({
+        'Metric': PORTFOLIO_METRIC_NAMES,
+        'Value': [round(turnover.sum() / years * 100, 2), round((1 - np.prod(1 - costs)) * 100, 2), len(bars)],
+    })], ignore_index=True)
+
+    target = pd.DataFrame(weights.T, index=pd.Index(dates[bars], name='Date'), columns=tickers)
+    return df, metrics_df, target
@@ -0,0 +1,242 @@
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+import weakref
+
+import pandas as pd
+
+# The active trace belongs to the current context (each Streamlit session's script thread, or a
+# with-block), so one session enabling or disabling profiling never affects another. Where no
+# context has chosen, BACKTESTER_PROFILE=1 gives a process-wide default trace (BACKTESTER_PROFILE=memory
+# also tracks peak memory). While off, stage() and @profiled cost one context lookup.
+_active = contextvars.ContextVar('backtester_trace')
+_lock = threading.Lock()
+_local = threading.local()
+_memory_users = 0
+
+TRACE_COLUMNS = ['Stage', 'Depth', 'Thread', 'Wall (ms)', 'Rows', 'Peak Memory (MB)', 'Frame Memory (MB)']
+
+
+class Trace:
+    """
+    Stage records of one run, in the order the stages finished.
+    """
+
+    def __init__(self, track_memory=False):
+        self.records = []
+        self.track_memory = track_memory
+        if track_memory:
+            _start_memory()
+            # tracemalloc is process-wide: it runs while any memory-tracking trace is alive
+            self.release = weakref.finalize(self, _stop_memory)
+
+    def add(self, record):
+        with _lock:
+            self.records.append(record)
+
+    def to_frame(self):
+        return pd.DataFrame(self.records, columns=TRACE_COLUMNS)
+
+    def summary(self):
+        # Total wall time and calls per stage name, slowest first
+        frame = self.to_frame()
+        grouped = frame.groupby('Stage').agg(Calls=('Stage', 'size'), **{
+            'Wall (ms)': ('Wall (ms)', 'sum'),
+            'Rows': ('Rows', 'sum'),
+            'Peak Memory (MB)': ('Peak Memory (MB)', 'max'),
+        })
+        return grouped.sort_values('Wall (ms)', ascending=False).reset_index()
+
+    def to_json(self, path=None):
+        text = json.dumps(self.records, indent=2, default=float)
+        if path is not None:
+            with open(path, 'w') as f:
+                f.write(text)
+        return text
+
+    def to_csv(self, path=None):
+        return self.to_frame().to_csv(path, index=False)
+
+    def save(self, path):
+        # Format from the extension: .json or .csv
+        return self.to_json(path) if path.endswith('.json') else self.to_csv(path)
+
+
+def _start_memory():
+    global _memory_users
+    with _lock:
+        _memory_users += 1
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+
+def _stop_memory():
+    global _memory_users
+    with _lock:
+        _memory_users -= 1
+        if _memory_users == 0 and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+_env_trace = (Trace(track_memory=os.environ.get('BACKTESTER_PROFILE') == 'memory')
+              if os.environ.get('BACKTESTER_PROFILE', '0') in ('1', 'memory') else None)
+
+
+def enable(track_memory=False):
+    """
+    Turn instrumentation on for the current context and start a new trace.
+    track_memory also records peak Python memory per stage with tracemalloc,
+    which slows the run down (and, while it runs, every other thread too).
+
+    Returns:
+        Trace: the trace new records are added to.
+    """
+    trace = Trace(track_memory)
+    _active.set(trace)
+    return trace
+
+
+def disable():
+    # Off for the current context only, including over a BACKTESTER_PROFILE default
+    trace = _active.get(_env_trace)
+    if trace is not None and trace.track_memory and trace is not _env_trace:
+        trace.release()
+    _active.set(None)
+
+
+def is_enabled():
+    return _active.get(_env_trace) is not None
+
+
+def current_trace():
+    # The current context's trace, None while profiling is off
+    return _active.get(_env_trace)
+
+
+def carry(func):
+    """
+    Wrap func to run in a copy of the caller's context, for executor workers:
+    thread pool threads start with an empty context, so without it their stages
+    would not reach the caller's trace.
+    """
+    context = contextvars.copy_context()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return context.copy().run(func, *args, **kwargs)
+    return wrapper
+
+
+def _result_frame(value):
+    # A DataFrame result, or the first DataFrame in a tuple result
+    if isinstance(value, tuple):
+        return next((item for item in value if isinstance(item, pd.DataFrame)), None)
+    return value if isinstance(value, pd.DataFrame) else None
+
+
+class _Stage:
+    def __init__(self, trace, name, rows=None):
+        self.trace = trace
+        self.name = name
+        self.rows = rows
+        self.result = None
+
+    def __enter__(self):
+        stack = getattr(_local, 'stack', None)
+        if stack is None:
+            stack = _local.stack = []
+        self.depth = len(stack)
+        stack.append(self)
+        self.child_peak = 0
+        self.start_memory = 0
+        if self.trace.track_memory:
+            # Nested stages reset the peak, so each stage also keeps the highest peak of its children
+            self.start_memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        wall = (time.perf_counter() - self.start) * 1000
+        peak = None
+        if self.trace.track_memory:
+            absolute_peak = max(tracemalloc.get_traced_memory()[1], self.child_peak)
+            peak = (absolute_peak - self.start_memory) / 2 ** 20
+        _local.stack.pop()
+        if _local.stack and self.trace.track_memory:
+            parent = _local.stack[-1]
+            parent.child_peak = max(parent.child_peak, absolute_peak)
+
+        frame = _result_frame(self.result)
+        rows = self.rows if self.rows is not None or frame is None else len(frame)
+        self.trace.add({
+            'Stage': self.name,
+            'Depth': self.depth,
+            'Thread': threading.current_thread().name,
+            'Wall (ms)': wall,
+            'Rows': rows,
+            'Peak Memory (MB)': peak,
+            'Frame Memory (MB)': None if frame is None else int(frame.memory_usage(index=True).sum()) / 2 ** 20,
+        })
+        return False
+
+
+class _NullStage:
+    # Shared by every disabled stage, so assigning a result must not keep it alive
+    @property
+    def result(self):
+        return None
+
+    @result.setter
+    def result(self, value):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(name, rows=None):
+    """
+    Time a block of code as one stage:
+
+        with stage('load', rows=len(df)) as s:
+            ...
+            s.result = df   # optional, records the frame's memory footprint
+    """
+    trace = _active.get(_env_trace)
+    if trace is None:
+        return _NULL_STAGE
+    return _Stage(trace, name, rows)
+
+
+def profiled(name=None):
+    """
+    Decorator recording every call as a stage (default name: the function's name).
+
+    Rows are taken from the first DataFrame argument (or a DataFrame result), the
+    footprint from the DataFrame the function returns.
+    """
+    def decorate(func):
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            trace = _active.get(_env_trace)
+            if trace is None:
+                return func(*args, **kwargs)
+            frame = next((arg for arg in args if isinstance(arg, pd.DataFrame)), None)
+            with _Stage(trace, stage_name, None if frame is None else len(frame)) as s:
+                s.result = func(*args, **kwargs)
+            return s.result
+        return wrapper
+    return decorate
@@ -0,0 +1,105 @@
+import os
+
+import pandas as pd
+
+from utils.cache import PRICE_COLUMNS
+
+
+class PriceProvider:
+    """
+    Source of daily High/Low/Close bars.
+
+    Subclasses implement fetch(ticker, start_date, end_date) returning a DataFrame
+    with 'Date', 'High', 'Low', 'Close' for start_date <= Date < end_date.
+    """
+
+    name = 'base'
+    # Whether results should go through the on-disk cache in utils.cache
+    cacheable = True
+
+    def fetch(self, ticker, start_date, end_date):
+        raise NotImplementedError
+
+
+class YFinanceProvider(PriceProvider):
+    name = 'yfinance'
+    cacheable = True
+
+    def fetch(self, ticker, start_date, end_date):
+        import yfinance as yf
+
+        df = yf.download(ticker, start=start_date, end=end_date, group_by="ticker", progress=False)
+
+        if df.empty:
+            return pd.DataFrame(columns=PRICE_COLUMNS)
+
+        # If MultiIndex columns exist, extract the relevant ticker data
+        if isinstance(df.columns, pd.MultiIndex):
+            df = df[ticker]
+
+        df = df.reset_index()  # Promote index to 'Date'
+        df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+
+        return df[PRICE_COLUMNS].dropna()
+
+
+class LocalFileProvider(PriceProvider):
+    """
+    Reads one file per ticker from a directory: <TICKER>.parquet or <TICKER>.csv.
+
+    Column names are matched case-insensitively, and the date may be either a
+    column ('Date'/'Datetime'/'Timestamp') or the first CSV column.
+    """
+
+    name = 'local'
+    # Files are already on local disk, caching them again only costs I/O
+    cacheable = False
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _find_file(self, ticker):
+        for name in (ticker, ticker.upper(), ticker.lower()):
+            for extension in ('parquet', 'csv'):
+                path = os.path.join(self.directory, f'{name}.{extension}')
+                if os.path.exists(path):
+                    return path
+        raise FileNotFoundError(f'No price file for {ticker} in {self.directory}')
+
+    def fetch(self, ticker, start_date, end_date):
+        path = self._find_file(ticker)
+        if path.endswith('.parquet'):
+            df = pd.read_parquet(path)
+        else:
+            df = pd.read_csv(path)
+
+        if not isinstance(df.index, pd.RangeIndex):
+            df = df.reset_index()
+
+        rename = {}
+        for column in df.columns:
+            key = str(column).strip().lower()
+            if key in ('date', 'datetime', 'timestamp', 'index') and 'Date' not in rename.values():
+                rename[column] = 'Date'
+            elif key in ('high', 'low', 'close'):
+                rename[column] = key.capitalize()
+        df = df.rename(columns=rename)
+        if 'Date' not in df.columns:
+            df = df.rename(columns={df.columns[0]: 'Date'})
+
+        df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+        df = df[PRICE_COLUMNS].dropna()
+
+        start = pd.Timestamp(start_date)
+        end = pd.Timestamp(end_date)
+        df = df[(df['Date'] >= start) & (df['Date'] < end)]
+
+        return df.sort_values('Date').reset_index(drop=True)
+
+
+def provider_from_env():
+    # BACKTESTER_DATA_DIR points the app and batch tools at a local data dump
+    data_dir = os.environ.get('BACKTESTER_DATA_DIR')
+    if data_dir:
+        return LocalFileProvider(data_dir)
+    return YFinanceProvider()
@@ -0,0 +1,352 @@
+import contextlib
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import time
+
+import pandas as pd
+
+from strategies.registry import signal_defaults, warmup_bars
+from utils.backtest import run_backtest
+from utils.cache import CACHE_DIR, CACHE_FORMAT, PRICE_COLUMNS
+from utils.data import frame_loader, load_with_warmup
+from utils.metrics import METRIC_NAMES, metrics_table
+
+# Stored runs live next to the price cache unless overridden
+RESULTS_DIR = os.environ.get('BACKTESTER_RESULTS_DIR', os.path.join(CACHE_DIR, 'results'))
+
+# Metric -> runs table column
+METRIC_COLUMNS = {
+    'Final Strategy Return (%)': 'strategy_return',
+    'Final Market Return (%)': 'market_return',
+    'Strategy Volatility (%)': 'strategy_volatility',
+    'Market Volatility (%)': 'market_volatility',
+    'Max Drawdown (%)': 'max_drawdown',
+    'Strategy Sharpe Ratio': 'sharpe',
+    'Market Sharpe Ratio': 'market_sharpe',
+    'Sortino Ratio': 'sortino',
+    'Profit Factor': 'profit_factor',
+}
+
+# utils.metrics.summarize_returns names (as in sweeps and the app's metric pickers) -> metric
+SUMMARY_METRICS = {
+    'Return': 'Final Strategy Return (%)',
+    'Volatility': 'Strategy Volatility (%)',
+    'Sharpe': 'Strategy Sharpe Ratio',
+    'Sortino': 'Sortino Ratio',
+    'Max Drawdown': 'Max Drawdown (%)',
+    'Profit Factor': 'Profit Factor',
+}
+
+# Ranked by query() through a (strategy, metric) index; lower is better for the drawdown
+INDEXED_METRICS = ['sharpe', 'sortino', 'strategy_return', 'strategy_volatility', 'max_drawdown', 'profit_factor']
+
+# Source trees whose code decides a run's result
+_CODE_DIRS = ('strategies', 'utils')
+_code_version = None
+
+
+def code_version():
+    """
+    Hash of the strategy and backtest sources, part of every run key so a code
+    change never serves results computed by older code.
+    """
+    global _code_version
+    if _code_version is None:
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        digest = hashlib.sha256()
+        for directory in _CODE_DIRS:
+            for name in sorted(os.listdir(os.path.join(root, directory))):
+                if name.endswith('.py'):
+                    digest.update(f'{directory}/{name}'.encode())
+                    with open(os.path.join(root, directory, name), 'rb') as f:
+                        digest.update(f.read())
+        _code_version = digest.hexdigest()[:16]
+    return _code_version
+
+
+def _timestamp(date):
+    return None if date is None else pd.Timestamp(date).isoformat()
+
+
+def _json(value):
+    # NumPy scalars from sliders and grids hash the same as plain Python numbers
+    return json.dumps(value, sort_keys=True, default=lambda v: v.item())
+
+
+def price_fingerprint(df, start_date=None):
+    """
+    Hash of the prices traded from start_date on, part of every run key so a
+    provider switch or revised history never serves a run computed on other
+    data. Warmup bars are left out, so a sweep (loaded with its longest
+    warmup) and a single run of the same pair share a key.
+    """
+    if start_date is not None:
+        df = df.loc[df['Date'] >= pd.Timestamp(start_date)]
+    hashed = pd.util.hash_pandas_object(df[PRICE_COLUMNS], index=False)
+    return hashlib.sha256(hashed.values.tobytes()).hexdigest()[:16]
+
+
+def is_closed(end_date):
+    """
+    Whether every bar of a range ending at end_date (exclusive) has closed.
+    Today's bar may still be forming, as in utils.cache, so later ranges are never stored.
+    """
+    return pd.Timestamp(end_date) <= pd.Timestamp.today().normalize()
+
+
+def run_key(ticker, strategy, params, start_date, end_date, fingerprint, version=None):
+    """
+    Hex key of one backtest: ticker, traded range, strategy, parameters (with
+    defaults filled in, so {} and the explicit defaults match), price
+    fingerprint and code version.
+    """
+    params = {**signal_defaults(strategy), **(params or {})}
+    payload = _json([ticker.upper(), strategy, params, _timestamp(start_date), _timestamp(end_date),
+                     fingerprint, version or code_version()])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResultStore:
+    """
+    Persistent, indexed store of backtest runs.
+
+    Run metadata and the metrics table sit in one SQLite table (runs.db), one
+    column per metric with an index on (strategy, metric) for the ranked
+    queries, so "top 50 Sharpe for MACD on these tickers" reads a few pages.
+    Runs are keyed by their inputs, a fingerprint of the prices they traded
+    and the code version; only ranges whose bars have all closed are stored.
+    Each run's backtest frame (equity curve, positions and indicators) is a
+    columnar file under frames/, in the price cache's format. Sweeps can add
+    metrics-only rows, which are queryable but never served as full runs.
+    """
+
+    def __init__(self, root=None):
+        self.root = root or RESULTS_DIR
+        self.path = os.path.join(self.root, 'runs.db')
+        os.makedirs(os.path.join(self.root, 'frames'), exist_ok=True)
+        with self._connect() as conn:
+            self._create(conn)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        # One short-lived connection per call keeps the store safe to share across threads
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _create(self, conn):
+        conn.execute('PRAGMA journal_mode=WAL')
+        metric_columns = ', '.join(f'{column} REAL' for column in METRIC_COLUMNS.values())
+        conn.execute(f'''CREATE TABLE IF NOT EXISTS runs (
+            key TEXT PRIMARY KEY, ticker TEXT NOT NULL, strategy TEXT NOT NULL, params TEXT NOT NULL,
+            start_date TEXT, end_date TEXT, fingerprint TEXT, code_version TEXT NOT NULL, created REAL NOT NULL,
+            source TEXT NOT NULL, has_frame INTEGER NOT NULL, bars INTEGER, incomplete_bars INTEGER,
+            {metric_columns})''')
+        # Stores created before price fingerprints; their rows' keys never match again
+        if 'fingerprint' not in [row[1] for row in conn.execute('PRAGMA table_info(runs)')]:
+            conn.execute('ALTER TABLE runs ADD COLUMN fingerprint TEXT')
+        for column in INDEXED_METRICS:
+            conn.execute(f'CREATE INDEX IF NOT EXISTS runs_strategy_{column} ON runs (strategy, {column})')
+        conn.execute('CREATE INDEX IF NOT EXISTS runs_ticker ON runs (ticker, strategy)')
+        conn.execute('CREATE INDEX IF NOT EXISTS runs_dates ON runs (start_date, end_date)')
+
+    def _frame_path(self, key):
+        extension = 'parquet' if CACHE_FORMAT == 'parquet' else 'pkl'
+        return os.path.join(self.root, 'frames', f'{key}.{extension}')
+
+    def __len__(self):
+        with self._connect() as conn:
+            return conn.execute('SELECT COUNT(*) FROM runs').fetchone()[0]
+
+    def __contains__(self, key):
+        with self._connect() as conn:
+            return conn.execute('SELECT 1 FROM runs WHERE key = ? AND has_frame', (key,)).fetchone() is not None
+
+    def get(self, key):
+        """
+        A stored full run.
+
+        Returns:
+            (DataFrame, DataFrame): backtest frame and metrics table, or None if
+            the key has no stored frame.
+        """
+        columns = ', '.join(METRIC_COLUMNS.values())
+        with self._connect() as conn:
+            row = conn.execute(f'SELECT incomplete_bars, {columns} FROM runs WHERE key = ? AND has_frame',
+                               (key,)).fetchone()
+        path = self._frame_path(key)
+        if row is None or not os.path.exists(path):
+            return None
+
+        df = pd.read_parquet(path) if CACHE_FORMAT == 'parquet' else pd.read_pickle(path)
+        if row[0]:
+            df.attrs['incomplete_bars'] = row[0]
+        return df, metrics_table(row[1:])
+
+    def put(self, ticker, strategy, params, start_date, end_date, fingerprint, df, metrics, version=None):
+        """
+        Store one run (as returned by run_backtest) on prices with this
+        price_fingerprint and return its key.
+        """
+        key = run_key(ticker, strategy, params, start_date, end_date, fingerprint, version)
+        path = self._frame_path(key)
+        # Frame first, swapped in whole, so a row with has_frame always has a complete file. Each writer
+        # gets its own temp file: sessions and batch runs storing the same key never share one.
+        fd, tmp = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(path))
+        os.close(fd)
+        try:
+            if CACHE_FORMAT == 'parquet':
+                df.to_parquet(tmp, index=False)
+            else:
+                df.to_pickle(tmp)
+            os.replace(tmp, path)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(tmp)
+            raise
+
+        values = dict(zip(metrics['Metric'], metrics['Value']))
+        self._insert('INSERT OR REPLACE', [self._row(key, ticker, strategy, params, start_date, end_date, fingerprint,
+                                                     version, 'run', True, len(df), df.attrs.get('incomplete_bars', 0),
+                                                     [values.get(name) for name in METRIC_COLUMNS])])
+        return key
+
+    def put_sweep(self, ticker, strategy, start_date, end_date, fingerprint, sweep, version=None):
+        """
+        Store every parameter pair of a sweep_crossover result as a metrics-only
+        row. Pairs that already have a full run keep it.
+
+        Args:
+            fingerprint (str): price_fingerprint of the prices swept.
+            sweep (dict): summarize_returns metric name -> short x long window grid.
+
+        Returns:
+            int: rows stored.
+        """
+        grids = {SUMMARY_METRICS[name]: grid.stack() for name, grid in sweep.items() if name in SUMMARY_METRICS}
+        pairs = next(iter(grids.values())).index
+        rows = []
+        for short_window, long_window in pairs:
+            params = {'short_window': int(short_window), 'long_window': int(long_window)}
+            key = run_key(ticker, strategy, params, start_date, end_date, fingerprint, version)
+            values = [float(grids[name].loc[(short_window, long_window)]) if name in grids else None
+                      for name in METRIC_COLUMNS]
+            rows.append(self._row(key, ticker, strategy, params, start_date, end_date, fingerprint, version,
+                                  'sweep', False, None, None, values))
+        self._insert('INSERT OR IGNORE', rows)
+        return len(rows)
+
+    def _row(self, key, ticker, strategy, params, start_date, end_date, fingerprint, version, source, has_frame,
+             bars, incomplete_bars, values):
+        params = {**signal_defaults(strategy), **(params or {})}
+        return [key, ticker.upper(), strategy, _json(params), _timestamp(start_date), _timestamp(end_date),
+                fingerprint, version or code_version(), time.time(), source, int(has_frame), bars, incomplete_bars,
+                *[None if value is None else float(value) for value in values]]
+
+    def _insert(self, verb, rows):
+        columns = ['key', 'ticker', 'strategy', 'params', 'start_date', 'end_date', 'fingerprint', 'code_version',
+                   'created', 'source', 'has_frame', 'bars', 'incomplete_bars'] + list(METRIC_COLUMNS.values())
+        with self._connect() as conn:
+            conn.executemany(f'{verb} INTO runs ({", ".join(columns)}) VALUES ({", ".join("?" * len(columns))})',
+                             rows)
+
+    def get_or_run(self, ticker, strategy, params, start_date, end_date, load=None, backend=None, **kwargs):
+        """
+        The stored run for these inputs, prices and the current code, or run it
+        with utils.backtest.run_backtest and store it. Prices are loaded first,
+        with the strategy's warmup, to fingerprint them; a range ending after
+        today is run but not stored.
+
+        Args:
+            load (callable): (ticker, start, end) -> price DataFrame, as in run_backtest.
+            backend (str): kernel backend, as in run_strategy.
+
+        Returns:
+            (DataFrame, DataFrame): backtest frame and metrics table.
+        """
+        prices = load_with_warmup(ticker, start_date, end_date, warmup_bars(strategy, params), load=load, **kwargs)
+        fingerprint = price_fingerprint(prices, start_date)
+        stored = self.get(run_key(ticker, strategy, params, start_date, end_date, fingerprint))
+        if stored is not None:
+            return stored
+        df, metrics = run_backtest(ticker, strategy, params, start_date, end_date, load=frame_loader(prices),
+                                   backend=backend)
+        if is_closed(end_date):
+            self.put(ticker, strategy, params, start_date, end_date, fingerprint, df, metrics)
+        return df, metrics
+
+    def query(self, strategy=None, tickers=None, start_date=None, end_date=None, order_by='Sharpe', limit=50,
+              version=None, include_sweeps=True):
+        """
+        Ranked stored runs, e.g. the top 50 Sharpe for MACD on a list of tickers in 2022:
+
+            store.query('MACD', tech_tickers, '2022-01-01', '2023-01-01', 'Sharpe', 50)
+
+        Args:
+            strategy (str): only this strategy (default=all).
+            tickers (list): only these tickers (default=all).
+            start_date, end_date (datetime): only runs traded inside [start_date, end_date].
+            order_by (str): metric, by table name or summarize_returns name ('Sharpe', 'Return',
+                'Max Drawdown', ...); best first, so Max Drawdown ascends and the rest descend.
+            version (str): code version, 'all' for every version (default=the current code).
+            include_sweeps (bool): include metrics-only rows stored from sweeps.
+
+        Returns:
+            DataFrame: 'Key', 'Ticker', 'Strategy', 'Params', 'Start Date', 'End Date',
+            'Source', then one column per metric.
+        """
+        metric = SUMMARY_METRICS.get(order_by, order_by)
+        if metric not in METRIC_COLUMNS:
+            raise ValueError(f'Unknown metric {order_by!r}, expected one of {list(SUMMARY_METRICS)} or '
+                             f'{list(METRIC_COLUMNS)}')
+        column = METRIC_COLUMNS[metric]
+
+        where, args = [f'{column} IS NOT NULL'], []
+        if strategy is not None:
+            where.append('strategy = ?')
+            args.append(strategy)
+        if tickers:
+            tickers = [ticker.upper() for ticker in tickers]
+            where.append(f'ticker IN ({", ".join("?" * len(tickers))})')
+            args += tickers
+        if start_date is not None:
+            where.append('start_date >= ?')
+            args.append(_timestamp(start_date))
+        if end_date is not None:
+            where.append('end_date <= ?')
+            args.append(_timestamp(end_date))
+        if version != 'all':
+            where.append('code_version = ?')
+            args.append(version or code_version())
+        if not include_sweeps:
+            where.append('has_frame')
+
+        columns = ', '.join(METRIC_COLUMNS.values())
+        sql = (f'SELECT key, ticker, strategy, params, start_date, end_date, source, {columns} FROM runs '
+               f'WHERE {" AND ".join(where)} ORDER BY {column} {"ASC" if column == "max_drawdown" else "DESC"} '
+               f'LIMIT ?')
+        with self._connect() as conn:
+            rows = conn.execute(sql, args + [int(limit)]).fetchall()
+        return pd.DataFrame(rows, columns=['Key', 'Ticker', 'Strategy', 'Params', 'Start Date', 'End Date',
+                                           'Source'] + METRIC_NAMES)
+
+    def prune(self, version=None):
+        """
+        Delete runs from other code versions than version (default=the current
+        code), with their frames. Returns the number of runs deleted.
+        """
+        version = version or code_version()
+        with self._connect() as conn:
+            keys = [row[0] for row in conn.execute('SELECT key FROM runs WHERE code_version != ? AND has_frame',
+                                                   (version,))]
+            deleted = conn.execute('DELETE FROM runs WHERE code_version != ?', (version,)).rowcount
+        for key in keys:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(self._frame_path(key))
+        return deleted
@@ -0,0 +1,204 @@
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from utils.cache import CACHE_DIR
+
+# Column stores live next to the price cache unless overridden
+STORE_DIR = os.environ.get('BACKTESTER_STORE_DIR', os.path.join(CACHE_DIR, 'store'))
+
+# Stored column -> on-disk dtype ('Date' is kept as int64 nanoseconds)
+STORE_COLUMNS = {'Date': '<i8', 'High': '<f8', 'Low': '<f8', 'Close': '<f8'}
+
+# Bars per chunk when reading a stored series back (about 32 MB of columns)
+CHUNK_ROWS = 1_000_000
+
+
+def _ticker_dir(root, ticker):
+    return os.path.join(root, ticker.upper().replace('/', '_').replace('^', '_'))
+
+
+class StoredSeries:
+    """
+    Read-only, memory-mapped view of one ticker's columns.
+
+    Each column is a flat binary file opened with np.memmap, so slicing only
+    pages in the bars that are touched. The day index maps every calendar day
+    to the offset of its first bar, which lets locate() find a date range
+    without scanning the Date column.
+    """
+
+    def __init__(self, path):
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        self.path = path
+        self.rows = meta['rows']
+        self.columns = {column: self._map(column, dtype, self.rows) for column, dtype in meta['columns'].items()}
+        self.days = self._map('days', '<i8', meta['days'])
+        self.offsets = self._map('offsets', '<i8', meta['days'])
+
+    def _map(self, name, dtype, rows):
+        if rows == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(os.path.join(self.path, f'{name}.bin'), dtype=dtype, mode='r', shape=(rows,))
+
+    def __len__(self):
+        return self.rows
+
+    @property
+    def first_date(self):
+        return pd.Timestamp(int(self.columns['Date'][0])) if self.rows else None
+
+    @property
+    def last_date(self):
+        return pd.Timestamp(int(self.columns['Date'][-1])) if self.rows else None
+
+    def _row(self, date):
+        # First row dated at or after date: day index first, then a search inside that day only
+        value = pd.Timestamp(date).value
+        day = np.searchsorted(self.days, value - value % 86_400_000_000_000)
+        if day == len(self.days):
+            return self.rows
+        lo = int(self.offsets[day])
+        hi = int(self.offsets[day + 1]) if day + 1 < len(self.offsets) else self.rows
+        return lo + int(np.searchsorted(self.columns['Date'][lo:hi], value))
+
+    def locate(self, start=None, end=None):
+        """
+        Row range [lo, hi) of the bars dated in [start, end] (None = open-ended).
+        """
+        lo = 0 if start is None else self._row(start)
+        hi = self.rows if end is None else self._row(pd.Timestamp(end) + pd.Timedelta(1, 'ns'))
+        return lo, max(lo, hi)
+
+    def frame(self, lo=0, hi=None):
+        """
+        Rows [lo, hi) as a price DataFrame, indexed by their row offsets in the store.
+        """
+        hi = self.rows if hi is None else hi
+        data = {column: np.array(values[lo:hi]) for column, values in self.columns.items()}
+        data['Date'] = data['Date'].view('datetime64[ns]')
+        return pd.DataFrame(data, index=pd.RangeIndex(lo, hi))
+
+    def iter_frames(self, start=None, end=None, chunk_rows=CHUNK_ROWS):
+        # Consecutive frames of at most chunk_rows bars covering [start, end]
+        lo, hi = self.locate(start, end)
+        for chunk_lo in range(lo, hi, chunk_rows):
+            yield self.frame(chunk_lo, min(chunk_lo + chunk_rows, hi))
+
+
+class ColumnStore:
+    """
+    On-disk columnar price store for series too long to hold in memory.
+
+    Every ticker is a directory with one raw binary file per column
+    (STORE_COLUMNS), a day -> first-row offset index and a meta.json holding
+    the row count. Bars are only ever appended, so a long history can be
+    written a chunk at a time and read back through memory maps.
+    """
+
+    def __init__(self, root=None):
+        self.root = root or STORE_DIR
+
+    def tickers(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root)
+                      if os.path.exists(os.path.join(self.root, name, 'meta.json')))
+
+    def __contains__(self, ticker):
+        return os.path.exists(os.path.join(_ticker_dir(self.root, ticker), 'meta.json'))
+
+    def open(self, ticker):
+        if ticker not in self:
+            raise KeyError(f'{ticker} is not in the column store at {self.root}')
+        return StoredSeries(_ticker_dir(self.root, ticker))
+
+    def delete(self, ticker):
+        shutil.rmtree(_ticker_dir(self.root, ticker), ignore_errors=True)
+
+    def append(self, ticker, df):
+        """
+        Append bars to a ticker's columns, creating the ticker on first use.
+
+        Args:
+            df (DataFrame): 'Date', 'High', 'Low', 'Close', sorted by date and
+                dated after the last stored bar.
+
+        Returns:
+            int: total rows stored for the ticker.
+        """
+        path = _ticker_dir(self.root, ticker)
+        os.makedirs(path, exist_ok=True)
+        meta_path = os.path.join(path, 'meta.json')
+        meta = {'rows': 0, 'days': 0, 'columns': STORE_COLUMNS, 'last': None}
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+        if df.empty:
+            return meta['rows']
+
+        dates = pd.to_datetime(df['Date']).to_numpy(dtype='datetime64[ns]').view('<i8')
+        if (np.diff(dates) <= 0).any() or (meta['last'] is not None and dates[0] <= meta['last']):
+            raise ValueError(f'{ticker}: appended bars must be in increasing date order after the stored bars')
+
+        # New days start where the day changes, or on the first bar if it opens a day the store has not seen
+        day = dates - dates % 86_400_000_000_000
+        new_day = np.concatenate(([True], day[1:] != day[:-1]))
+        if meta['last'] is not None and day[0] == meta['last'] - meta['last'] % 86_400_000_000_000:
+            new_day[0] = False
+
+        columns = {column: df[column].to_numpy(dtype=dtype) for column, dtype in STORE_COLUMNS.items()
+                   if column != 'Date'}
+        columns.update({'Date': dates, 'days': day[new_day], 'offsets': meta['rows'] + np.flatnonzero(new_day)})
+        stored = {name: meta['rows'] for name in STORE_COLUMNS}
+        stored.update({'days': meta['days'], 'offsets': meta['days']})
+
+        for name, values in columns.items():
+            # Drop anything past the recorded length, left behind by an interrupted append
+            with open(os.path.join(path, f'{name}.bin'), 'ab') as f:
+                f.truncate(stored[name] * values.dtype.itemsize)
+                f.write(np.ascontiguousarray(values).tobytes())
+
+        # meta.json is replaced last, so readers never see rows that are not fully written
+        meta.update({'rows': meta['rows'] + len(dates), 'days': meta['days'] + int(new_day.sum()),
+                     'last': int(dates[-1])})
+        with open(meta_path + '.tmp', 'w') as f:
+            json.dump(meta, f)
+        os.replace(meta_path + '.tmp', meta_path)
+        return meta['rows']
+
+    def ingest(self, ticker, start_date, end_date, loader=None, chunk_days=365):
+        """
+        Fill a ticker from a price loader one date window at a time, so the full
+        history is never in memory. Windows already stored are skipped.
+
+        Args:
+            loader (callable): (ticker, start, end) -> price DataFrame (default=utils.data.load_price_data).
+            chunk_days (int): calendar days requested per call.
+
+        Returns:
+            int: total rows stored for the ticker.
+        """
+        if loader is None:
+            from utils.data import load_price_data
+            loader = load_price_data
+
+        start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+        rows = 0
+        if ticker in self:
+            series = self.open(ticker)
+            rows = series.rows
+            if series.last_date is not None:
+                start = max(start, series.last_date + pd.Timedelta(1, 'ns'))
+        while start < end:
+            window_end = min(start + pd.Timedelta(days=chunk_days), end)
+            df = loader(ticker, start, window_end)
+            if df is not None and not df.empty:
+                df = df.loc[(df['Date'] >= start) & (df['Date'] < window_end)]
+                rows = self.append(ticker, df)
+            start = window_end
+        return rows
@@ -0,0 +1,124 @@
+from itertools import product
+
+import numpy as np
+import pandas as pd
+
+from strategies import STRATEGIES, warmup_bars
+from utils.kernels import rolling_means, ewma_many, crossover_signals, ffill_position
+from utils.metrics import summarize_returns
+
+# Upper bound on (combos x bars) evaluated per batch, keeps peak memory around a few hundred MB
+MAX_BATCH_ELEMENTS = 20_000_000
+
+
+def _moving_averages(close, windows, kind):
+    if kind == 'SMA':
+        return rolling_means(close, windows)
+    elif kind == 'EWMA':
+        return ewma_many(close, windows)
+    raise ValueError(f'Unsupported sweep kind: {kind}')
+
+
+def sweep_crossover(df, kind, short_windows, long_windows, start_date=None):
+    """
+    Evaluate every (short_window, long_window) pair of the SMA or EWMA crossover
+    strategy in batched NumPy passes.
+
+    Signals follow the strategies' generate_signals exactly. Returns are scored
+    from the first bar on/after start_date, so df should already include the
+    warmup history (as the app loads it).
+
+    Args:
+        df (DataFrame): must contain 'Date' and 'Close'.
+        kind (str): 'SMA' or 'EWMA'.
+        short_windows (list): candidate short windows.
+        long_windows (list): candidate long windows.
+        start_date (datetime): first date to score (default=first row).
+
+    Returns:
+        dict: metric name -> DataFrame indexed by short window with long windows as columns.
+    """
+    short_windows = [int(w) for w in short_windows]
+    long_windows = [int(w) for w in long_windows]
+    close = df['Close'].to_numpy(dtype=np.float64)
+    n = len(close)
+
+    # Every distinct window is computed once, from one cumsum (SMA) or one recursion (EWMA)
+    windows = sorted(set(short_windows) | set(long_windows))
+    averages = _moving_averages(close, windows, kind)
+    row = {w: i for i, w in enumerate(windows)}
+    short_rows = np.array([row[w] for w in short_windows])
+    long_rows = np.array([row[w] for w in long_windows])
+
+    start_idx = 0
+    if start_date is not None:
+        start_idx = int(np.searchsorted(df['Date'].to_numpy(), np.datetime64(pd.Timestamp(start_date))))
+
+    market_returns = np.empty(n)
+    market_returns[0] = np.nan
+    market_returns[1:] = close[1:] / close[:-1] - 1
+    # calculate_metrics drops the first trimmed row (no return), so scoring starts one bar later
+    scored = market_returns[start_idx + 1:]
+
+    pairs_s, pairs_l = np.meshgrid(np.arange(len(short_windows)), np.arange(len(long_windows)), indexing='ij')
+    pairs_s, pairs_l = pairs_s.ravel(), pairs_l.ravel()
+
+    results = {}
+    batch = max(1, MAX_BATCH_ELEMENTS // max(n, 1))
+    for lo in range(0, len(pairs_s), batch):
+        s_idx, l_idx = pairs_s[lo:lo + batch], pairs_l[lo:lo + batch]
+        signal = crossover_signals(averages[short_rows[s_idx]], averages[long_rows[l_idx]])
+        position = ffill_position(signal)
+        strategy_returns = scored * position[:, start_idx:n - 1]
+        for name, values in summarize_returns(strategy_returns).items():
+            results.setdefault(name, []).append(values)
+
+    shape = (len(short_windows), len(long_windows))
+    return {
+        name: pd.DataFrame(np.concatenate(parts).reshape(shape),
+                           index=pd.Index(short_windows, name='Short Window'),
+                           columns=pd.Index(long_windows, name='Long Window'))
+        for name, parts in results.items()
+    }
+
+
+def expand_grid(param_grid):
+    # {'a': [1, 2], 'b': [3]} -> [{'a': 1, 'b': 3}, {'a': 2, 'b': 3}]
+    names = list(param_grid)
+    return [dict(zip(names, values)) for values in product(*(param_grid[name] for name in names))]
+
+
+def grid_warmup(strategy, param_list):
+    # Most warmup bars any parameter set needs (strategies.warmup_bars, counting generate_signals defaults)
+    return max(warmup_bars(strategy, params) for params in param_list)
+
+
+def position_matrix(df, strategy, param_list):
+    """
+    Position series of one strategy for many parameter sets, computed once over
+    the full price history.
+
+    SMA/EWMA use the batched kernels, other strategies call generate_signals
+    once per parameter set.
+
+    Returns:
+        (ndarray, list): int8 positions of shape (len(param_list), len(df)) and each set's warmup window.
+    """
+    if strategy in ('SMA', 'EWMA') and all(set(p) == {'short_window', 'long_window'} for p in param_list):
+        windows = sorted({p['short_window'] for p in param_list} | {p['long_window'] for p in param_list})
+        averages = _moving_averages(df['Close'].to_numpy(dtype=np.float64), windows, strategy)
+        row = {w: i for i, w in enumerate(windows)}
+        fast = averages[[row[p['short_window']] for p in param_list]]
+        slow = averages[[row[p['long_window']] for p in param_list]]
+        positions = ffill_position(crossover_signals(fast, slow))
+        warmups = [max(p['short_window'], p['long_window']) for p in param_list]
+        return positions, warmups
+
+    prices = df[['Date', 'High', 'Low', 'Close']]
+    positions = np.zeros((len(param_list), len(df)), dtype=np.int8)
+    warmups = []
+    for i, params in enumerate(param_list):
+        signals_df, warmup = STRATEGIES[strategy](prices.copy(), **params)
+        positions[i] = signals_df['Position'].to_numpy()
+        warmups.append(warmup)
+    return positions, warmups
@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+
+EXPORT_CHUNK_ROWS = 100_000
+
+LEDGER_COLUMNS = ['Entry Date', 'Exit Date', 'Side', 'Entry Price', 'Exit Price', 'Bars Held',
+                  'Days Held', 'Return (%)', 'MAE (%)', 'MFE (%)', 'Open']
+
+
+def trade_ledger(df):
+    """
+    One row per trade, derived from the Position column in a single vectorized pass.
+
+    A trade is a run of bars holding the same non-zero position. It enters at the
+    close of its first bar and exits at the close of the bar where the position
+    changes (or the last bar, for a trade still open). Its return is read off
+    Cumulative_Strategy, so the ledger compounds to the equity curve. MAE/MFE are
+    the worst/best High/Low excursion from the entry price while the trade was on,
+    in the trade's direction.
+
+    Args:
+        df (DataFrame): frame returned by calculate_metrics.
+
+    Returns:
+        DataFrame: LEDGER_COLUMNS, one row per trade.
+    """
+    position = df['Position'].to_numpy()
+    close = df['Close'].to_numpy(dtype=np.float64)
+    n = len(position)
+    if n == 0:
+        return pd.DataFrame(columns=LEDGER_COLUMNS)
+
+    changes = np.flatnonzero(position[1:] != position[:-1]) + 1
+    run_starts = np.concatenate(([0], changes))
+    run_ends = np.concatenate((changes, [n - 1]))
+    held = position[run_starts] != 0
+    entries, exits = run_starts[held], run_ends[held]
+    side = position[entries].astype(np.float64)
+
+    dates = df['Date'].to_numpy()
+    equity = df['Cumulative_Strategy'].to_numpy(dtype=np.float64)
+
+    # Bars [entry + 1, exit] are the ones the trade earns on. reduceat over the
+    # interleaved boundaries reduces each of those segments in one call.
+    high = np.append(df['High'].to_numpy(dtype=np.float64), np.nan)
+    low = np.append(df['Low'].to_numpy(dtype=np.float64), np.nan)
+    bounds = np.column_stack((entries + 1, exits + 1)).ravel()
+    highest = np.maximum.reduceat(high, bounds)[::2]
+    lowest = np.minimum.reduceat(low, bounds)[::2]
+
+    entry_price = close[entries]
+    up = (highest / entry_price - 1) * 100
+    down = (lowest / entry_price - 1) * 100
+    long = side > 0
+
+    return pd.DataFrame({
+        'Entry Date': dates[entries],
+        'Exit Date': dates[exits],
+        'Side': np.where(long, 'Long', 'Short'),
+        'Entry Price': entry_price,
+        'Exit Price': close[exits],
+        'Bars Held': exits - entries,
+        'Days Held': (pd.to_datetime(dates[exits]) - pd.to_datetime(dates[entries])).days,
+        'Return (%)': (equity[exits] / equity[entries] - 1) * 100,
+        'MAE (%)': np.where(long, down, -up),
+        'MFE (%)': np.where(long, up, -down),
+        'Open': (exits == n - 1) & (position[exits] == position[entries]),
+    }, columns=LEDGER_COLUMNS)
+
+
+def trade_stats(ledger):
+    """
+    Trade-level statistics as a Metric/Value table (returns in %).
+
+    Flat trades (a return of exactly 0) are neither wins nor losses: they are
+    counted separately and left out of the win rate and the average win/loss.
+    Expectancy is the average return per trade, flat trades included.
+    """
+    returns = ledger['Return (%)'].to_numpy(dtype=np.float64)
+    wins, losses = returns[returns > 0], returns[returns < 0]
+    decided = len(wins) + len(losses)
+    win_rate = len(wins) / decided if decided else np.nan
+    avg_win = wins.mean() if len(wins) else 0.0
+    avg_loss = losses.mean() if len(losses) else 0.0
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        stats = {
+            'Trades': len(returns),
+            'Flat Trades': len(returns) - decided,
+            'Win Rate (%)': win_rate * 100,
+            'Average Win (%)': avg_win,
+            'Average Loss (%)': avg_loss,
+            'Expectancy (%)': returns.mean() if len(returns) else np.nan,
+            'Trade Profit Factor': wins.sum() / abs(losses.sum()) if losses.sum() else np.inf,
+            'Best Trade (%)': returns.max() if len(returns) else np.nan,
+            'Worst Trade (%)': returns.min() if len(returns) else np.nan,
+            'Average Bars Held': ledger['Bars Held'].mean(),
+        }
+    return pd.DataFrame({'Metric': list(stats), 'Value': list(stats.values())})
+
+
+def export_ledger(ledger, target, fmt='csv', chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Write the ledger to a path or binary file object in chunks of chunk_rows,
+    so large ledgers never need a second full in-memory copy.
+
+    Args:
+        ledger (DataFrame): output of trade_ledger.
+        target: file path or writable binary file object (e.g. io.BytesIO).
+        fmt (str): 'csv' or 'parquet' (requires pyarrow).
+        chunk_rows (int): rows written per chunk.
+    """
+    chunks = (ledger.iloc[lo:lo + chunk_rows] for lo in range(0, max(len(ledger), 1), chunk_rows))
+
+    if fmt == 'csv':
+        handle = open(target, 'wb') if isinstance(target, str) else target
+        try:
+            for i, chunk in enumerate(chunks):
+                handle.write(chunk.to_csv(index=False, header=(i == 0)).encode())
+        finally:
+            if handle is not target:
+                handle.close()
+    elif fmt == 'parquet':
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.Schema.from_pandas(ledger, preserve_index=False)
+        with pq.ParquetWriter(target, schema) as writer:
+            for chunk in chunks:
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+    else:
+        raise ValueError(f"Unknown export format '{fmt}', expected 'csv' or 'parquet'")
+    return target
@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+
+from utils.kernels import (rolling_mean, rolling_std, rolling_max, rolling_min, ewma, lag,
+                           transition_signals, crossover_signals, breakout_signals, ffill_position)
+from utils.metrics import summarize_returns
+
+
+def align_prices(prices):
+    """
+    Align per-ticker frames on the union of their dates.
+
+    Args:
+        prices (dict): ticker -> DataFrame with 'Date', 'High', 'Low', 'Close'.
+
+    Returns:
+        (DatetimeIndex, list, dict): dates, tickers, and 'High'/'Low'/'Close'
+        matrices of shape (dates, tickers) with NaN where a ticker has no bar.
+    """
+    tickers = [ticker for ticker, df in prices.items() if not df.empty]
+    stacked = pd.concat({ticker: prices[ticker].set_index('Date')[['High', 'Low', 'Close']] for ticker in tickers},
+                        names=['Ticker', 'Date'])
+    wide = stacked.unstack('Ticker').sort_index()
+    matrices = {column: wide[column].reindex(columns=tickers).to_numpy(dtype=np.float64)
+                for column in ('High', 'Low', 'Close')}
+    return wide.index, tickers, matrices
+
+
+def _sma_signals(close, high, low, short_window=20, long_window=50):
+    short, long = rolling_mean(close, short_window), rolling_mean(close, long_window)
+    return crossover_signals(short, long), {'SMA_Short': short, 'SMA_Long': long}
+
+
+def _ewma_signals(close, high, low, short_window=12, long_window=26):
+    short, long = ewma(close, short_window), ewma(close, long_window)
+    return crossover_signals(short, long), {'EWMA_Short': short, 'EWMA_Long': long}
+
+
+def _macd_signals(close, high, low, short_window=12, long_window=26, signal_window=9):
+    macd = ewma(close, short_window) - ewma(close, long_window)
+    signal_line = ewma(macd, signal_window)
+    prev_macd, prev_signal_line = lag(macd), lag(signal_line)
+    signal = np.zeros(close.shape, dtype=np.int8)
+    signal[(macd > signal_line) & (prev_macd <= prev_signal_line)] = 1
+    signal[(macd < signal_line) & (prev_macd >= prev_signal_line)] = -1
+    return signal, {'MACD': macd, 'Signal_Line': signal_line}
+
+
+def _rsi_signals(close, high, low, rsi_window=14, bollinger_window=20, num_std_dev=2):
+    sma = rolling_mean(close, bollinger_window)
+    std = rolling_std(close, bollinger_window)
+    upper_band = sma + num_std_dev * std
+    lower_band = sma - num_std_dev * std
+
+    delta = close - lag(close)
+    gain = np.where(delta < 0, 0.0, delta)
+    loss = np.where(delta > 0, 0.0, -delta)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = rolling_mean(gain, rsi_window) / rolling_mean(loss, rsi_window)
+        rsi = 100 - (100 / (1 + rs))
+
+        buy = (rsi < 30) & (close <= lower_band)
+        sell = (rsi > 70) & (close >= upper_band)
+    return transition_signals(buy, sell), {'RSI': rsi, 'Upper_Band': upper_band, 'Lower_Band': lower_band}
+
+
+def _atr_signals(close, high, low, scale_factor=0.5, atr_window=14, breakout_window=20):
+    prev_close = lag(close)
+    with np.errstate(invalid='ignore'):
+        true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    atr = rolling_mean(true_range, atr_window)
+    upper = rolling_max(close, breakout_window) + scale_factor * atr
+    lower = rolling_min(close, breakout_window) - scale_factor * atr
+
+    return breakout_signals(close, upper, lower), {'Upper_Breakout': upper, 'Lower_Breakout': lower}
+
+
+# Strategy name -> (signals, indicators) from (tickers, dates) Close/High/Low matrices, same kwargs as
+# generate_signals. indicators holds the arrays behind the strategy's chart columns, under the same names.
+UNIVERSE_SIGNALS = {
+    'SMA': _sma_signals,
+    'EWMA': _ewma_signals,
+    'MACD': _macd_signals,
+    'RSI': _rsi_signals,
+    'ATR': _atr_signals,
+}
+
+
+def universe_backtest(prices, strategy, params=None, start_date=None, rank_by='Sharpe'):
+    """
+    Run one strategy over a whole universe as column-wise NumPy passes on a
+    dates x tickers matrix, instead of one pandas pipeline per ticker.
+
+    Args:
+        prices (dict): ticker -> DataFrame (e.g. from utils.data.load_many), including warmup history.
+        strategy (str): key of strategies.STRATEGIES.
+        params (dict): generate_signals keyword arguments.
+        start_date (datetime): first date to score (default=first date).
+        rank_by (str): metric column used to sort the table (Max Drawdown ascending, others descending).
+
+    Returns:
+        (DataFrame, DataFrame): per-ticker metrics ranked by rank_by, and the
+        dates x tickers Position matrix.
+    """
+    dates, tickers, matrices = align_prices(prices)
+    # Kernels run along the last axis, so work on (tickers, dates)
+    close, high, low = (matrices[column].T for column in ('Close', 'High', 'Low'))
+
+    with np.errstate(invalid='ignore'):
+        signal, _ = UNIVERSE_SIGNALS[strategy](close, high, low, **(params or {}))
+    position = ffill_position(signal)
+
+    start_idx = 0 if start_date is None else int(dates.searchsorted(pd.Timestamp(start_date)))
+    # Return on bar t is earned by the position held at t - 1. Prices are carried over
+    # missing bars so a gap's move lands on the next bar the ticker trades.
+    last_seen = np.where(np.isnan(close), 0, np.arange(close.shape[-1]))
+    np.maximum.accumulate(last_seen, axis=-1, out=last_seen)
+    carried = np.take_along_axis(close, last_seen, axis=-1)
+    market_returns = carried[:, start_idx + 1:] / carried[:, start_idx:-1] - 1
+    strategy_returns = market_returns * position[:, start_idx:-1]
+
+    strategy_metrics = summarize_returns(strategy_returns)
+    market_metrics = summarize_returns(market_returns)
+    with np.errstate(invalid='ignore'):
+        table = pd.DataFrame({
+            'Return': strategy_metrics['Return'],
+            'Sharpe': strategy_metrics['Sharpe'],
+            'Max Drawdown': strategy_metrics['Max Drawdown'],
+            'Market Return': market_metrics['Return'],
+            'Market Sharpe': market_metrics['Sharpe'],
+            'Trades': (signal[:, start_idx:] != 0).sum(axis=1),
+        }, index=pd.Index(tickers, name='Ticker'))
+
+    table = table.sort_values(rank_by, ascending=(rank_by == 'Max Drawdown'))
+    table.insert(0, 'Rank', np.arange(1, len(table) + 1))
+    positions = pd.DataFrame(position.T, index=dates, columns=tickers)
+    return table, positions
@@ -0,0 +1,95 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from strategies import PARAM_GRIDS
+from utils.metrics import calculate_metrics, summarize_returns
+from utils.sweep import expand_grid, position_matrix
+
+# Metrics where a lower value is better
+MINIMIZE = {'Max Drawdown'}
+
+
+def make_folds(n_bars, train_bars, test_bars, first_bar=0):
+    """
+    Rolling (train, test) windows as index ranges; each test window directly
+    follows its train window and the next fold starts test_bars later.
+    """
+    folds = []
+    start = first_bar
+    while start + train_bars + 1 < n_bars:
+        train = (start, start + train_bars)
+        test = (train[1], min(train[1] + test_bars, n_bars))
+        folds.append((train, test))
+        start += test_bars
+    return folds
+
+
+def _best_params(market_returns, positions, train, metric):
+    lo, hi = train
+    # Return on bar t is earned by the position held at t - 1
+    scores = summarize_returns(market_returns[lo + 1:hi] * positions[:, lo:hi - 1])[metric]
+    scores = np.where(np.isnan(scores), np.inf if metric in MINIMIZE else -np.inf, scores)
+    best = int(np.argmin(scores) if metric in MINIMIZE else np.argmax(scores))
+    return best, scores[best]
+
+
+def walk_forward(df, strategy, train_bars=504, test_bars=63, param_grid=None, metric='Sharpe', max_workers=None):
+    """
+    Walk-forward optimization: pick the best parameters on each rolling train
+    window, trade them on the following test window, and stitch the test windows
+    into one out-of-sample backtest.
+
+    Positions are computed once over the full history for every parameter set and
+    sliced per fold; folds are scored concurrently.
+
+    Args:
+        df (DataFrame): 'Date', 'High', 'Low', 'Close'.
+        strategy (str): key of strategies.STRATEGIES.
+        train_bars (int): bars per train window (default=504, ~2 years).
+        test_bars (int): bars per test window, also the roll step (default=63, ~1 quarter).
+        param_grid (dict): param -> candidate values (default=strategies.PARAM_GRIDS[strategy]).
+        metric (str): 'Sharpe', 'Return' or 'Max Drawdown'.
+        max_workers (int): threads used to score folds.
+
+    Returns:
+        (DataFrame, DataFrame, DataFrame): stitched out-of-sample backtest frame and
+        metrics table from calculate_metrics, plus one row per fold.
+    """
+    param_list = expand_grid(param_grid or PARAM_GRIDS[strategy])
+    df = df.reset_index(drop=True)
+    positions, warmups = position_matrix(df, strategy, param_list)
+
+    close = df['Close'].to_numpy(dtype=np.float64)
+    market_returns = np.empty(len(close))
+    market_returns[0] = np.nan
+    market_returns[1:] = close[1:] / close[:-1] - 1
+
+    # Start once every candidate's indicators are warm
+    folds = make_folds(len(df), train_bars, test_bars, first_bar=max(warmups))
+    if not folds:
+        raise ValueError('Not enough history for a single train/test fold')
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        choices = list(pool.map(lambda fold: _best_params(market_returns, positions, fold[0], metric), folds))
+
+    # Out-of-sample position: the chosen parameter set's position on each test bar
+    test_start, test_end = folds[0][1][0], folds[-1][1][1]
+    stitched_position = np.empty(test_end - test_start, dtype=np.int8)
+    rows = []
+    for (train, test), (best, score) in zip(folds, choices):
+        stitched_position[test[0] - test_start:test[1] - test_start] = positions[best, test[0]:test[1]]
+        rows.append({
+            'Train Start': df['Date'].iloc[train[0]],
+            'Train End': df['Date'].iloc[train[1] - 1],
+            'Test Start': df['Date'].iloc[test[0]],
+            'Test End': df['Date'].iloc[test[1] - 1],
+            'Params': param_list[best],
+            f'Train {metric}': score,
+        })
+
+    stitched = df[['Date', 'High', 'Low', 'Close']].iloc[test_start:test_end].reset_index(drop=True)
+    stitched['Position'] = stitched_position
+    stitched, metrics_df = calculate_metrics(stitched)
+    return stitched, metrics_df, pd.DataFrame(rows)